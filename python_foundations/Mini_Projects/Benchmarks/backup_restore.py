@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Backup and reset benchmark for the university database (db_backup.py).
+
+For the sample data and for generated databases of several sizes, measures:
+
+- snapshot: University.backup_to, a one-step online backup to a new file;
+- restore: University.restore_from, copying that snapshot back over the live
+  database in place (what the Streamlit reset does with the sample template);
+- rebuild: loading the same rows again (build_sample_database, or
+  db_generate.generate for the generated sizes), the cost of the old reset;
+- stepped backup: one BackupScheduler run while a writer thread keeps
+  enrolling students, with the number of restarts it went through.
+
+Backup and restore times should follow the file size (pages), rebuild times
+the number of rows. Prints the results as JSON.
+
+Example:
+    python backup_restore.py --sizes 10000,100000 --repeat 5
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Project2_v1"))
+
+from db_backup import BackupScheduler  # noqa: E402
+from db_generate import generate  # noqa: E402
+from db_logic import University, build_sample_database  # noqa: E402
+from run_benchmarks import SEED  # noqa: E402
+
+
+def median_ms(func, repeat):
+    """Median wall time of func() over repeat calls, in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def stepped_backup_under_writes(db_path, target, pages):
+    """One BackupScheduler run while another thread enrolls students; returns its stats."""
+    university = University(db_path)
+    students = [row[2] for row in university.get_people("student")]
+    courses = [row[1] for row in university.get_courses()]
+    stop = threading.Event()
+
+    def writer():
+        rng = random.Random(SEED)
+        while not stop.is_set():
+            university.enroll_student_in_course(rng.choice(students), rng.choice(courses))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        with BackupScheduler(db_path, target, pages=pages, start=False) as scheduler:
+            scheduler.run_once(force=True)
+            stats = scheduler.stats()
+    finally:
+        stop.set()
+        thread.join()
+        university.close()
+    return {"ms": stats["last_seconds"] * 1000, "restarts": stats["restarts"], "fallbacks": stats["fallbacks"]}
+
+
+def measure_size(tmp, label, build, repeat, pages):
+    path = os.path.join(tmp, f"{label}.db")
+    snapshot_path = os.path.join(tmp, f"{label}-snapshot.db")
+    rebuild_path = os.path.join(tmp, f"{label}-rebuild.db")
+    build(path)
+    university = University(path)
+    rows = sum(university.get_totals().values())
+    result = university.backup_to(snapshot_path)
+    row = {
+        "database": label,
+        "rows": rows,
+        "pages": result["pages"],
+        "mib": result["bytes"] / 2 ** 20,
+        "snapshot_ms": median_ms(lambda: university.backup_to(snapshot_path), repeat),
+        "restore_ms": median_ms(lambda: university.restore_from(snapshot_path), repeat),
+    }
+    university.close()
+    row["rebuild_ms"] = median_ms(lambda: build(rebuild_path), 1)
+    row["stepped_backup_under_writes"] = stepped_backup_under_writes(path, snapshot_path, pages)
+    for key in ("snapshot_ms", "restore_ms"):
+        row[key.replace("_ms", "_ms_per_mib")] = row[key] / row["mib"]
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure snapshot, restore and rebuild times of the university database.")
+    parser.add_argument("--sizes", default="10000,100000", help="comma separated student counts of the generated databases")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measure (the median is kept)")
+    parser.add_argument("--pages", type=int, default=64, help="pages per step of the stepped backup")
+    args = parser.parse_args(argv)
+
+    def build_generated(n_students):
+        def build(path):
+            if os.path.exists(path):
+                os.remove(path)
+            generate(path, n_students, max(1, n_students // 200), n_students * 4, replace=True)
+        return build
+
+    def build_sample(path):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        build_sample_database(path)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        results.append(measure_size(tmp, "sample", build_sample, args.repeat, args.pages))
+        for n_students in [int(n) for n in args.sizes.split(",") if n]:
+            results.append(measure_size(tmp, f"generated_{n_students}", build_generated(n_students),
+                                        args.repeat, args.pages))
+    print(json.dumps({"results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
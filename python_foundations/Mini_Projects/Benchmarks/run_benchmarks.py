@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Reproducible benchmark harness for the mini projects' hot paths.
+
+Covers the text analyzer (Project1_v1) and the university database
+(Project2_v1) on synthetic inputs generated from a fixed seed, and writes
+throughput, latency percentiles and peak memory as JSON.
+
+Examples:
+    python run_benchmarks.py                                   # default scales
+    python run_benchmarks.py --text-sizes 1KB,1MB,1GB --db-sizes 10,100000
+    python run_benchmarks.py --output new.json --compare baseline.json
+    python run_benchmarks.py --suite gen --gen-sizes 100000,1000000   # reads on generated databases
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Project1_v1"))
+sys.path.insert(0, os.path.join(HERE, "..", "Project2_v1"))
+
+from utils import nettoyer_texte, split_en_mots, split_en_phrases  # noqa: E402
+from analysis import mot_plus_frequent  # noqa: E402
+from db_logic import University  # noqa: E402
+from db_generate import generate  # noqa: E402
+
+SEED = 42
+DEFAULT_TEXT_SIZES = "1KB,100KB,10MB"
+DEFAULT_DB_SIZES = "10,1000"
+DEFAULT_GEN_SIZES = "10000"
+UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+VOCABULARY = ("le la les un une des et de du en est pas pour sur avec dans "
+              "python donnees analyse texte base cours etudiant professeur note "
+              "systeme requete index cache memoire fichier ligne mot phrase").split()
+GRADES = ["A", "A-", "B+", "B", "B-", "C+", "C", "D", "F"]
+
+
+def parse_size(value):
+    """Parses '1KB', '10MB', '1GB' or a plain byte count."""
+    value = value.strip().upper()
+    for unit, factor in UNITS.items():
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)]) * factor)
+    return int(value)
+
+
+def generate_text(size, seed=SEED):
+    """Generates about `size` characters of French-like text with punctuation and sentences."""
+    rng = random.Random(seed)
+    # Zipf-like weights so that a few words dominate, like real text
+    weights = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+    parts = []
+    length = 0
+    while length < size:
+        words = rng.choices(VOCABULARY, weights=weights, k=rng.randint(5, 15))
+        sentence = " ".join(words).capitalize() + rng.choice([". ", "! ", "? ", ", "])
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:size]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def measure(name, scale, func, args_list, work_units, unit, track_memory=True):
+    """
+    Calls func(*args) for every args in args_list and returns one result record.
+    work_units is the total amount of work (bytes or operations) used for throughput.
+    Peak memory is measured on a separate first call, since tracemalloc slows things down.
+    """
+    peak = None
+    if track_memory and args_list:
+        tracemalloc.start()
+        func(*args_list[0])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    latencies = []
+    start = time.perf_counter()
+    for args in args_list:
+        t0 = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "name": name,
+        "scale": scale,
+        "calls": len(args_list),
+        "total_seconds": total,
+        "throughput": work_units / total if total else None,
+        "throughput_unit": f"{unit}/s",
+        "latency_ms": {p: percentile(latencies, int(p[1:])) * 1000 for p in ("p50", "p95", "p99")},
+        "peak_memory_bytes": peak,
+    }
+
+
+def bench_text(sizes, repeat):
+    """Benchmarks the text cleaning, sentence splitting and word frequency functions."""
+    results = []
+    for size in sizes:
+        text = generate_text(size)
+        words = split_en_mots(nettoyer_texte(text))
+        calls = [(text,)] * repeat
+        results.append(measure("utils.nettoyer_texte", size, nettoyer_texte, calls, size * repeat, "bytes"))
+        results.append(measure("utils.split_en_phrases", size, split_en_phrases, calls, size * repeat, "bytes"))
+        results.append(measure("analysis.mot_plus_frequent", size, mot_plus_frequent,
+                               [(words,)] * repeat, len(words) * repeat, "words"))
+        del text, words
+    return results
+
+
+def build_university(n_students, seed=SEED):
+    """
+    Creates the workload for one scale: students, a course per 20 students,
+    and two enrollments per student, each with a grade.
+    """
+    rng = random.Random(seed)
+    students = [(f"Student {i}", rng.randint(18, 30), f"S{i:07d}") for i in range(n_students)]
+    n_courses = max(1, n_students // 20)
+    courses = [(f"Course {i}", f"C{i:05d}") for i in range(n_courses)]
+    enrollments = []
+    for _, _, student_id in students:
+        for code in rng.sample([c[1] for c in courses], min(2, n_courses)):
+            enrollments.append((student_id, code))
+    grades = [(student_id, code, rng.choice(GRADES)) for student_id, code in enrollments]
+    return students, courses, enrollments, grades
+
+
+def bench_university(sizes, repeat):
+    """Benchmarks the University write and read methods on a fresh database per scale."""
+    results = []
+    for n_students in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            university = University(os.path.join(tmp, "bench.db"))
+            students, courses, enrollments, grades = build_university(n_students)
+            for name, code in courses:
+                university.add_course(name, code)
+            results.append(measure("University.add_student", n_students, university.add_student,
+                                   students, len(students), "ops", track_memory=False))
+            results.append(measure("University.enroll_student_in_course", n_students,
+                                   university.enroll_student_in_course, enrollments, len(enrollments), "ops",
+                                   track_memory=False))
+            results.append(measure("University.assign_grade", n_students, university.assign_grade,
+                                   grades, len(grades), "ops", track_memory=False))
+            rng = random.Random(SEED)
+            course_calls = [(rng.choice(courses)[1],) for _ in range(repeat)]
+            student_calls = [(rng.choice(students)[2],) for _ in range(repeat)]
+            results.append(measure("University.get_course_summary", n_students, university.get_course_summary,
+                                   course_calls, repeat, "ops"))
+            results.append(measure("University.get_student_grades", n_students, university.get_student_grades,
+                                   student_calls, repeat, "ops"))
+            # the Streamlit pages call get_people with the same argument on every rerun
+            people_calls = [("student",)] * repeat
+            results.append(measure("University.get_people", n_students, university.get_people,
+                                   people_calls, repeat, "ops"))
+            results.append(measure("University.get_totals", n_students, university.get_totals,
+                                   [()] * repeat, repeat, "ops"))
+            # same reads with the query cache disabled, to see what the cache saves
+            uncached = University(os.path.join(tmp, "bench.db"), cache_size=0)
+            results.append(measure("University.get_people[nocache]", n_students,
+                                   uncached.get_people, people_calls, repeat, "ops"))
+            results.append(measure("University.get_course_summary[nocache]", n_students,
+                                   uncached.get_course_summary, course_calls, repeat, "ops"))
+            results.append(measure("University.get_student_grades[nocache]", n_students,
+                                   uncached.get_student_grades, student_calls, repeat, "ops"))
+            uncached.close()
+            university.close()
+    return results
+
+
+def bench_generated(sizes, repeat):
+    """
+    Times db_generate.generate (a course per 200 students, 4 enrollments per student),
+    then the read methods on the generated database, most popular courses included.
+    """
+    results = []
+    for n_students in sizes:
+        n_courses, n_enrollments = max(1, n_students // 200), 4 * n_students
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "generated.db")
+            results.append(measure("db_generate.generate", n_students,
+                                   lambda: generate(path, n_students, n_courses, n_enrollments, replace=True),
+                                   [()], n_students + n_enrollments, "rows", track_memory=False))
+            university = University(path)
+            rng = random.Random(SEED)
+            university.cursor.execute("SELECT code FROM courses")
+            codes = [row[0] for row in university.cursor.fetchall()]
+            course_calls = [(rng.choice(codes),) for _ in range(repeat)]
+            student_calls = []
+            for _ in range(repeat):
+                university.cursor.execute("SELECT university_id FROM persons WHERE id = ?",
+                                          (rng.randint(1, n_students),))
+                student_calls.append(university.cursor.fetchone())
+            results.append(measure("generated.get_course_summary_page", n_students,
+                                   university.get_course_summary_page, course_calls, repeat, "ops"))
+            results.append(measure("generated.get_course_stats", n_students,
+                                   university.get_course_stats, course_calls, repeat, "ops"))
+            results.append(measure("generated.get_student_grades", n_students,
+                                   university.get_student_grades, student_calls, repeat, "ops"))
+            results.append(measure("generated.get_totals", n_students,
+                                   university.get_totals, [()] * repeat, repeat, "ops"))
+            university.close()
+    return results
+
+
+def compare(current, baseline, threshold):
+    """
+    Compares two result files by (name, scale) on p50 latency.
+    Returns the list of regressions slower than baseline by more than `threshold` (0.2 = 20%).
+    """
+    previous = {(r["name"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get((result["name"], result["scale"]))
+        if not old or not old["latency_ms"]["p50"]:
+            continue
+        ratio = result["latency_ms"]["p50"] / old["latency_ms"]["p50"]
+        status = "REGRESSION" if ratio > 1 + threshold else "ok"
+        print(f"{status:>10}  {result['name']:<40} scale={result['scale']:<12} p50 x{ratio:.2f}")
+        if status != "ok":
+            regressions.append(result)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the text-analysis and university-DB hot paths.")
+    parser.add_argument("--suite", choices=["all", "text", "db", "gen"], default="all")
+    parser.add_argument("--text-sizes", default=DEFAULT_TEXT_SIZES, help="comma separated, e.g. 1KB,1MB,1GB")
+    parser.add_argument("--db-sizes", default=DEFAULT_DB_SIZES, help="comma separated student counts")
+    parser.add_argument("--gen-sizes", default=DEFAULT_GEN_SIZES,
+                        help="comma separated student counts for the generated databases")
+    parser.add_argument("--repeat", type=int, default=20, help="calls per read benchmark")
+    parser.add_argument("--output", help="write the JSON report to this file (default: stdout)")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50 slowdown before failing")
+    args = parser.parse_args(argv)
+
+    results = []
+    if args.suite in ("all", "text"):
+        results += bench_text([parse_size(s) for s in args.text_sizes.split(",")], args.repeat)
+    if args.suite in ("all", "db"):
+        results += bench_university([int(s) for s in args.db_sizes.split(",")], args.repeat)
+    if args.suite in ("all", "gen"):
+        results += bench_generated([int(s) for s in args.gen_sizes.split(",")], args.repeat)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": SEED,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
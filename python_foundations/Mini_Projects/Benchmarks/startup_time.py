@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Startup time of the apps: time to first render and the imports behind it.
+
+Each entry point runs in a fresh interpreter started with `python -X importtime`
+(in a temporary working directory, so the apps create their databases there):
+
+- the Streamlit scripts are run once from top to bottom with runpy, which is
+  what Streamlit does for the first render (bare mode: widgets return their
+  defaults and nothing is sent to a browser);
+- the Dash app is only imported: once the module is loaded the server can
+  serve the layout, the data arrive later from the background loader;
+- db_logic is imported alone as the baseline every Project2 entry point pays.
+
+For each entry point the script prints, as JSON, the median time to first
+render over --repeat runs, the median wall time of the whole process, and the
+top-level imports with the largest cumulative time in the last run. An entry
+point whose dependencies are not installed is reported with its error.
+
+Example:
+    python startup_time.py --repeat 5 --top 8
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT2 = os.path.abspath(os.path.join(HERE, "..", "Project2_v1"))
+DASHBOARD = os.path.abspath(os.path.join(HERE, "..", "Dashboard"))
+
+# name -> (directory put on sys.path, script run with runpy or None, run_name / module to import)
+ENTRY_POINTS = {
+    "db_logic": (PROJECT2, None, "db_logic"),
+    "project2_streamlit": (PROJECT2, "streamlit_app.py", "__main__"),
+    "dashboard_streamlit": (DASHBOARD, "streamlit_intro.py", "__main__"),
+    "dashboard_dash": (DASHBOARD, "app_dash_intro.py", "app_dash_intro"),
+}
+
+# the child prints how long the import / the first run took, after everything else it printed
+CHILD = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {directory!r})
+{body}
+print("FIRST_RENDER_MS", (time.perf_counter() - start) * 1000)
+"""
+RUN_SCRIPT = "import runpy; runpy.run_path({path!r}, run_name={run_name!r})"
+IMPORT_MODULE = "import {run_name}"
+
+
+def child_code(directory, script, run_name):
+    if script is None:
+        body = IMPORT_MODULE.format(run_name=run_name)
+    else:
+        body = RUN_SCRIPT.format(path=os.path.join(directory, script), run_name=run_name)
+    return CHILD.format(directory=directory, body=body)
+
+
+def parse_importtime(stderr):
+    """Returns [(cumulative_us, module)] for the top-level imports of an -X importtime report."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # nested imports are indented below the module that imported them
+        if name.startswith(" ") and not name[1:2].isspace() and cumulative.strip().isdigit():
+            imports.append((int(cumulative), name.strip()))
+    return imports
+
+
+def run_once(code, cwd):
+    """Runs code in a new interpreter; returns (first_render_ms, wall_ms, imports) or raises RuntimeError."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=cwd, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    marker = [line for line in proc.stdout.splitlines() if line.startswith("FIRST_RENDER_MS")]
+    if proc.returncode != 0 or not marker:
+        errors = [line for line in proc.stderr.splitlines() if line and not line.startswith("import time:")]
+        raise RuntimeError(errors[-1] if errors else f"exit code {proc.returncode}")
+    return float(marker[-1].split()[1]), wall_ms, parse_importtime(proc.stderr)
+
+
+def measure(name, repeat, top):
+    directory, script, run_name = ENTRY_POINTS[name]
+    code = child_code(directory, script, run_name)
+    renders, walls, imports = [], [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeat):
+            try:
+                render_ms, wall_ms, imports = run_once(code, tmp)
+            except RuntimeError as exc:
+                return {"entry_point": name, "error": str(exc)}
+            renders.append(render_ms)
+            walls.append(wall_ms)
+    imports.sort(reverse=True)
+    return {
+        "entry_point": name,
+        "first_render_ms": statistics.median(renders),
+        "process_ms": statistics.median(walls),
+        "import_ms": sum(us for us, _ in imports) / 1000,
+        "top_imports_ms": {module: us / 1000 for us, module in imports[:top]},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the apps' time to first render with -X importtime.")
+    parser.add_argument("--entry-points", default=",".join(ENTRY_POINTS),
+                        help="comma separated subset of: " + ", ".join(ENTRY_POINTS))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per entry point (the median is kept)")
+    parser.add_argument("--top", type=int, default=8, help="slowest top-level imports listed")
+    args = parser.parse_args(argv)
+
+    results = [measure(name, args.repeat, args.top) for name in args.entry_points.split(",")]
+    print(json.dumps({"python": sys.version.split()[0], "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
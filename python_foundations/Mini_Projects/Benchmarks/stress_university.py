@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrency stress test for University's pooled connections.
+
+Runs N reader threads (get_course_summary / get_student_grades) against one
+writer thread (enrollments and grades) for a fixed duration, for several
+values of N, and prints read throughput per thread count as JSON. With WAL
+and per-thread connections, read throughput should grow with the number of
+threads (up to the number of cores) and no call should fail.
+
+Example:
+    python stress_university.py --threads 1,2,4,8 --duration 5 --students 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Project2_v1"))
+
+from db_logic import University  # noqa: E402
+from run_benchmarks import build_university, SEED  # noqa: E402
+
+
+def run_round(university, students, courses, n_readers, duration):
+    """Runs one round with n_readers reader threads plus one writer; returns the counters."""
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def reader(seed):
+        rng = random.Random(seed)
+        done = 0
+        try:
+            while not stop.is_set():
+                if rng.random() < 0.5:
+                    university.get_course_summary(rng.choice(courses)[1])
+                else:
+                    university.get_student_grades(rng.choice(students)[2])
+                done += 1
+        except Exception:
+            with lock:
+                counts["errors"] += 1
+        with lock:
+            counts["reads"] += done
+
+    def writer():
+        rng = random.Random(SEED)
+        done = 0
+        try:
+            while not stop.is_set():
+                student_id, code = rng.choice(students)[2], rng.choice(courses)[1]
+                university.enroll_student_in_course(student_id, code)
+                university.assign_grade(student_id, code, rng.choice("ABCDF"))
+                done += 2
+        except Exception:
+            with lock:
+                counts["errors"] += 1
+        with lock:
+            counts["writes"] += done
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(n_readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress University with concurrent readers and one writer.")
+    parser.add_argument("--threads", default="1,2,4,8", help="comma separated reader thread counts")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per round")
+    parser.add_argument("--students", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    students, courses, enrollments, grades = build_university(args.students)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        university = University(os.path.join(tmp, "stress.db"))
+        university.add_students_bulk(students)
+        university.add_courses_bulk(courses)
+        university.enroll_students_bulk(enrollments)
+        university.assign_grades_bulk(grades)
+        for n_readers in [int(n) for n in args.threads.split(",")]:
+            counts = run_round(university, students, courses, n_readers, args.duration)
+            results.append({
+                "reader_threads": n_readers,
+                "reads_per_second": counts["reads"] / args.duration,
+                "writes_per_second": counts["writes"] / args.duration,
+                "errors": counts["errors"],
+            })
+        university.close()
+    print(json.dumps({"cpu_count": os.cpu_count(), "results": results}, indent=2))
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Registration peak benchmark: direct writes vs db_writer.WriteBatcher.
+
+N client threads each loop on "enroll a random student in a random course,
+then grade it" for a fixed duration, first calling University directly, then
+through a WriteBatcher (waiting on each future). Prints writes per second for
+both modes and the batcher's batch statistics as JSON. The messages of both
+modes are checked against the same rules (enrolled / already enrolled / graded).
+
+Example:
+    python write_peak.py --clients 1,16,64 --duration 5 --students 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Project2_v1"))
+
+from db_logic import University  # noqa: E402
+from db_writer import DEFAULT_MAX_DELAY, WriteBatcher  # noqa: E402
+from run_benchmarks import build_university, SEED  # noqa: E402
+
+EXPECTED_PREFIXES = ("Student '", "Error: Student '", "Grade '")
+
+
+def run_round(write, students, courses, n_clients, duration):
+    """Runs n_clients threads calling write(kind, args) -> message; returns the counters."""
+    stop = threading.Event()
+    counts = {"writes": 0, "errors": 0, "unexpected": 0}
+    lock = threading.Lock()
+
+    def client(seed):
+        rng = random.Random(seed)
+        done = unexpected = 0
+        try:
+            while not stop.is_set():
+                student_id, code = rng.choice(students)[2], rng.choice(courses)[1]
+                for kind, args in (("enroll", (student_id, code)), ("grade", (student_id, code, rng.choice("ABCDF")))):
+                    if not write(kind, args).startswith(EXPECTED_PREFIXES):
+                        unexpected += 1
+                    done += 1
+        except Exception:
+            with lock:
+                counts["errors"] += 1
+        with lock:
+            counts["writes"] += done
+            counts["unexpected"] += unexpected
+
+    threads = [threading.Thread(target=client, args=(SEED + i,)) for i in range(n_clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare direct and batched enrollment/grade writes.")
+    parser.add_argument("--clients", default="1,16,64", help="comma separated client thread counts")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per round")
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--max-delay", type=float, default=DEFAULT_MAX_DELAY, help="batcher time window in seconds")
+    args = parser.parse_args(argv)
+
+    students, courses, _, _ = build_university(args.students)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_clients in [int(n) for n in args.clients.split(",")]:
+            row = {"clients": n_clients}
+            for mode in ("direct", "batched"):
+                university = University(os.path.join(tmp, f"{mode}_{n_clients}.db"))
+                university.add_students_bulk(students)
+                university.add_courses_bulk(courses)
+                if mode == "direct":
+                    single = {"enroll": university.enroll_student_in_course, "grade": university.assign_grade}
+                    counts = run_round(lambda kind, a: single[kind](*a), students, courses, n_clients, args.duration)
+                else:
+                    with WriteBatcher(university, max_delay=args.max_delay) as writer:
+                        batched = {"enroll": writer.enroll_student_in_course, "grade": writer.assign_grade}
+                        counts = run_round(lambda kind, a: batched[kind](*a).result(), students, courses,
+                                           n_clients, args.duration)
+                        row["batcher"] = writer.stats()
+                university.close()
+                row[f"{mode}_writes_per_second"] = counts["writes"] / args.duration
+                row[f"{mode}_errors"] = counts["errors"] + counts["unexpected"]
+            results.append(row)
+    print(json.dumps({"cpu_count": os.cpu_count(), "results": results}, indent=2))
+    return 1 if any(r["direct_errors"] or r["batched_errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
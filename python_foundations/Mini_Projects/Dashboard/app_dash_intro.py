@@ -1,15 +1,121 @@
+import glob
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import dash
-from dash import dcc, html, Input, Output
-import plotly.express as px
-import pandas as pd
+from dash import dcc, html, Input, Output, State
+
+# pandas et plotly.express ne sont importés que par les fonctions qui s'en servent, et les données
+# se chargent en arrière-plan : la page s'affiche sans attendre ni les imports lourds ni les CSV
 
 # 1. PRÉPARATION DES DONNÉES (PANDAS)
-# Créons un petit DataFrame pour l'exemple
-df = pd.DataFrame({
-    "Fruit": ["Pommes", "Oranges", "Bananes", "Pommes", "Oranges", "Bananes"],
-    "Ville": ["Paris", "Paris", "Paris", "Lyon", "Lyon", "Lyon"],
-    "Ventes": [4, 1, 2, 2, 4, 5],
-})
+# Par défaut un petit DataFrame d'exemple ; avec DASH_DONNEES=ventes, les vraies ventes de csv_files
+# (lues par data_loader.py). Pour chaque source : (colonne du filtre, colonne des barres, colonne des valeurs)
+SOURCE = os.environ.get("DASH_DONNEES", "exemple")
+COLONNES = {
+    "exemple": ("Ville", "Fruit", "Ventes"),
+    "ventes": ("City", "Product", "Quantity Ordered"),
+}
+COL_FILTRE, COL_X, COL_Y = COLONNES[SOURCE]
+TAILLE_CACHE_FIGURES = 256        # nombre de figures gardées en mémoire
+INTERVALLE_VERIFICATION = 30_000  # ms entre deux vérifications des fichiers sources
+INTERVALLE_DEMARRAGE = 300        # ms entre deux vérifications tant que le premier chargement n'est pas fini
+
+
+def charger_donnees():
+    if SOURCE == "ventes":
+        from data_loader import charger_ventes
+        return charger_ventes()
+    # Créons un petit DataFrame pour l'exemple
+    import pandas as pd
+    return pd.DataFrame({
+        "Fruit": ["Pommes", "Oranges", "Bananes", "Pommes", "Oranges", "Bananes"],
+        "Ville": ["Paris", "Paris", "Paris", "Lyon", "Lyon", "Lyon"],
+        "Ventes": [4, 1, 2, 2, 4, 5],
+    })
+
+
+# Change dès qu'un fichier source est modifié (l'exemple, lui, ne change jamais)
+def signature_source():
+    if SOURCE != "ventes":
+        return None
+    from data_loader import DOSSIER_CSV
+    return tuple((chemin, os.stat(chemin).st_mtime_ns)
+                 for chemin in sorted(glob.glob(os.path.join(DOSSIER_CSV, "Sales_*.csv"))))
+
+
+# Au lieu de filtrer tout le DataFrame à chaque clic (df[df['Ville'] == ...] relit toutes les lignes),
+# on fait UN groupby au chargement : pour chaque valeur du filtre, le petit tableau déjà agrégé à afficher.
+# Un clic devient une simple lecture dans un dictionnaire, quelle que soit la taille des données.
+def construire_index(df):
+    agrege = df.groupby([COL_FILTRE, COL_X], observed=True, sort=False)[COL_Y].sum().reset_index()
+    return {
+        valeur: groupe.drop(columns=COL_FILTRE).reset_index(drop=True)
+        for valeur, groupe in agrege.groupby(COL_FILTRE, observed=True, sort=False)
+    }
+
+
+def preparer(df):
+    index = construire_index(df)
+    options = [{'label': valeur, 'value': valeur} for valeur in sorted(index)]
+    return index, options
+
+
+# État partagé entre les threads du serveur : la version augmente à chaque rechargement des données.
+# Au démarrage il est vide ; le premier chargement est lancé plus bas, en arrière-plan.
+verrou = threading.Lock()
+etat = {
+    "version": 0,
+    "index": {},
+    "options": [],
+    "signature": None,
+    "rechargement": None,   # futur du rechargement en cours
+}
+
+# Figures déjà construites (format JSON de Plotly), clé (valeur du filtre, version des données),
+# les moins récemment utilisées sont retirées en premier (LRU)
+figures = OrderedDict()
+
+# Les tâches lourdes (relire les CSV, reconstruire l'index, pré-calculer les figures) tournent ici,
+# jamais dans le thread qui répond au navigateur
+executeur = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dashboard")
+
+
+def figure_pour(valeur, version, index):
+    cle = (valeur, version)
+    with verrou:
+        if cle in figures:
+            figures.move_to_end(cle)
+            return figures[cle]
+    import plotly.express as px
+    groupe = index.get(valeur)
+    if groupe is None:
+        groupe = {COL_X: [], COL_Y: []}
+    fig = px.bar(groupe, x=COL_X, y=COL_Y, color=COL_X, barmode="group")
+    figure = fig.to_plotly_json()
+    with verrou:
+        if version == etat["version"]:   # pas de figure périmée dans le cache
+            figures[cle] = figure
+            while len(figures) > TAILLE_CACHE_FIGURES:
+                figures.popitem(last=False)
+    return figure
+
+
+def prechauffer(version, index):
+    for valeur in list(index)[:TAILLE_CACHE_FIGURES]:
+        figure_pour(valeur, version, index)
+
+
+def recharger():
+    signature = signature_source()
+    index, options = preparer(charger_donnees())
+    return signature, index, options
+
+
+etat["rechargement"] = executeur.submit(recharger)
+
 
 # 2. INITIALISATION DE L'APPLICATION (DASH)
 app = dash.Dash(__name__)
@@ -17,7 +123,7 @@ app = dash.Dash(__name__)
 # 3. DÉFINITION DE LA MISE EN PAGE (LAYOUT)
 # C'est ici qu'on dessine l'apparence de notre page web (HTML via Python)
 app.layout = html.Div(children=[
-    
+
     html.H1(children='Mon Premier Tableau de Bord'),
 
     html.Div(children='''
@@ -26,36 +132,85 @@ app.layout = html.Div(children=[
     '''),
 
     # L'élément interactif (Liste déroulante)
+    # (vide jusqu'à la fin du premier chargement, qui choisit la valeur par défaut)
     dcc.Dropdown(
         id='filtre-ville',
-        options=[{'label': ville, 'value': ville} for ville in df['Ville'].unique()],
-        value='Paris', # Valeur par défaut
+        options=[],
+        value=None,
         clearable=False
     ),
 
     # L'endroit où le graphique va s'afficher
     dcc.Graph(
         id='graphique-ventes'
-    )
+    ),
+
+    # Version des données affichées, et minuterie qui vérifie si les fichiers sources ont changé
+    dcc.Store(id='version-donnees', data=etat["version"]),
+    dcc.Interval(id='verification-donnees', interval=INTERVALLE_DEMARRAGE),
 ])
 
 # 4. LA LOGIQUE INTERACTIVE (CALLBACKS)
 # C'est la magie de Dash : connecter l'entrée (Dropdown) à la sortie (Graphique)
 @app.callback(
     Output('graphique-ventes', 'figure'),
-    Input('filtre-ville', 'value')
+    Input('filtre-ville', 'value'),
+    Input('version-donnees', 'data')
+)
+def update_graph(ville_selectionnee, _version):
+    # Données pas encore chargées : graphique vide, sans importer plotly.express
+    if ville_selectionnee is None:
+        return {}
+
+    # a. On lit l'index pré-calculé (pas de filtre sur tout le DataFrame)
+    with verrou:
+        version, index = etat["version"], etat["index"]
+
+    # b. La figure vient du cache si cette ville a déjà été affichée pour cette version des données
+    return figure_pour(ville_selectionnee, version, index)
+
+
+# Au démarrage puis quand les fichiers sources changent, les données sont lues en arrière-plan ; une fois
+# prêtes, on change de version (ce qui vide le cache des figures). Chaque page compare ensuite sa version
+# des données (version-donnees) à celle du serveur : si elle est en retard (page ouverte avant ou après le
+# rechargement, autre navigateur...), elle reçoit la liste déroulante, la sélection et la nouvelle version,
+# et repasse à une vérification toutes les 30 secondes
+@app.callback(
+    Output('filtre-ville', 'options'),
+    Output('filtre-ville', 'value'),
+    Output('version-donnees', 'data'),
+    Output('verification-donnees', 'interval'),
+    Input('verification-donnees', 'n_intervals'),
+    State('filtre-ville', 'value'),
+    State('version-donnees', 'data')
 )
-def update_graph(ville_selectionnee):
-    # a. On filtre les données Pandas en fonction du choix de l'utilisateur
-    filtered_df = df[df['Ville'] == ville_selectionnee]
+def verifier_donnees(_n, ville_selectionnee, version_page):
+    # lire les dates des fichiers hors du verrou (pendant un rechargement, rien à relire)
+    signature = signature_source() if etat["rechargement"] is None else etat["signature"]
+    prechauffage = None
+    with verrou:
+        futur = etat["rechargement"]
+        if futur is None:
+            if signature != etat["signature"]:
+                etat["rechargement"] = executeur.submit(recharger)
+        elif futur.done():
+            etat["rechargement"] = None
+            signature, index, options = futur.result()
+            etat.update(version=etat["version"] + 1, index=index, options=options, signature=signature)
+            figures.clear()
+            prechauffage = etat["version"], index
+        version, index, options = etat["version"], etat["index"], etat["options"]
+    if prechauffage is not None:
+        executeur.submit(prechauffer, *prechauffage)
+    if version == version_page:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
+    # la ville choisie reste sélectionnée si elle existe toujours
+    if ville_selectionnee not in index:
+        ville_selectionnee = options[0]['value'] if options else None
+    return options, ville_selectionnee, version, INTERVALLE_VERIFICATION
 
-    # b. On crée le graphique Plotly avec ces données filtrées
-    fig = px.bar(filtered_df, x="Fruit", y="Ventes", color="Fruit", barmode="group")
-    
-    # c. On retourne le graphique pour qu'il s'affiche
-    return fig
 
 # 5. LANCEMENT DU SERVEUR
 if __name__ == '__main__':
     print("L'application tourne ! Ouvrez ce lien dans votre navigateur : http://127.0.0.1:8050/")
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
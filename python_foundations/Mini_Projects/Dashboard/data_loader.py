@@ -0,0 +1,165 @@
+import concurrent.futures
+import csv
+import glob
+import hashlib
+import os
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+# Chargement rapide des fichiers de csv_files pour les tableaux de bord :
+# - les lignes de préambule avant l'en-tête sont sautées (olympics_1896_2004.csv)
+# - les lignes vides et les en-têtes répétés au milieu du fichier sont retirés (Sales_*.csv)
+# - chaque colonne reçoit un type explicite (catégorie, date, nombre) au lieu de l'inférence de pandas
+# - le résultat est mis en cache en Parquet, avec une clé qui change quand le CSV est modifié
+
+ICI = os.path.dirname(os.path.abspath(__file__))
+DOSSIER_CSV = os.path.join(ICI, "..", "..", "csv_files")
+DOSSIER_CACHE = os.path.join(ICI, ".cache")
+VERSION_CACHE = 1          # à incrémenter quand SCHEMAS change, pour invalider les anciens caches
+LIGNES_PREAMBULE_MAX = 50  # nombre de lignes examinées pour trouver l'en-tête
+
+# Types des colonnes par jeu de données : "int", "float", "category", "string" ou ("datetime", format)
+SCHEMAS = {
+    "ventes": {
+        "Order ID": "int",
+        "Product": "category",
+        "Quantity Ordered": "int",
+        "Price Each": "float",
+        "Order Date": ("datetime", "%m/%d/%y %H:%M"),
+        "Purchase Address": "string",
+    },
+    "olympiques": {
+        "Year": "int",
+        "City": "category",
+        "Sport": "category",
+        "Discipline": "category",
+        "Athlete Name": "string",
+        "NOC": "category",
+        "Gender": "category",
+        "Event": "category",
+        "Event Gender": "category",
+        "Medal": "category",
+        "Position": "int",
+    },
+}
+
+TYPES_ARROW = {"int": pa.int64(), "float": pa.float64(), "string": pa.string()}
+
+
+# Renvoie le numéro (à partir de 0) de la ligne d'en-tête : la première ligne qui contient
+# toutes les colonnes attendues
+def detecter_entete(chemin, colonnes):
+    with open(chemin, newline="", encoding="utf-8") as f:
+        for numero, ligne in enumerate(csv.reader(f)):
+            if numero >= LIGNES_PREAMBULE_MAX:
+                break
+            if set(colonnes) <= {champ.strip() for champ in ligne}:
+                return numero
+    raise ValueError(f"En-tête {colonnes} introuvable dans les {LIGNES_PREAMBULE_MAX} premières lignes de {chemin}")
+
+
+# Ventes : la ville est le deuxième élément de l'adresse ("917 1st St, Dallas, TX 75001")
+def _ajouter_ville(table):
+    villes = pc.list_element(pc.split_pattern(table.column("Purchase Address"), ", "), 1)
+    return table.append_column("City", pc.dictionary_encode(villes))
+
+
+COLONNES_DERIVEES = {"ventes": _ajouter_ville}
+
+
+def _convertir(colonne, type_colonne):
+    if type_colonne == "category":
+        return pc.dictionary_encode(colonne)
+    if isinstance(type_colonne, tuple):
+        return pc.strptime(colonne, format=type_colonne[1], unit="s")
+    return pc.cast(colonne, TYPES_ARROW[type_colonne])
+
+
+# Lit un CSV avec pyarrow (en C, multi-thread) et renvoie une table Arrow typée et nettoyée
+def lire_table(chemin, schema):
+    types = SCHEMAS[schema]
+    colonnes = list(types)
+    saut = detecter_entete(chemin, colonnes)
+    table = pacsv.read_csv(
+        chemin,
+        read_options=pacsv.ReadOptions(skip_rows=saut),
+        # tout est lu en texte d'abord : les lignes parasites empêcheraient la conversion
+        convert_options=pacsv.ConvertOptions(
+            column_types={nom: pa.string() for nom in colonnes},
+            include_columns=colonnes,
+            strings_can_be_null=True,
+        ),
+    )
+    # lignes vides (",,,,,") et en-têtes répétés
+    premiere = table.column(colonnes[0])
+    table = table.filter(pc.and_(pc.is_valid(premiere), pc.not_equal(premiere, colonnes[0])))
+    for position, nom in enumerate(colonnes):
+        table = table.set_column(position, nom, _convertir(table.column(nom), types[nom]))
+    if schema in COLONNES_DERIVEES:
+        table = COLONNES_DERIVEES[schema](table)
+    return table
+
+
+def _chemin_cache(chemin, schema, dossier_cache):
+    # la clé dépend du fichier (chemin, date de modification, taille) et de la version des schémas
+    infos = os.stat(chemin)
+    source = hashlib.sha1(os.path.abspath(chemin).encode()).hexdigest()[:12]
+    version = hashlib.sha1(f"{VERSION_CACHE}:{schema}:{infos.st_mtime_ns}:{infos.st_size}".encode()).hexdigest()[:12]
+    return os.path.join(dossier_cache, f"{schema}-{source}-{version}.parquet"), f"{schema}-{source}-"
+
+
+# Table Arrow du fichier, depuis le cache Parquet s'il est à jour, sinon depuis le CSV (et le cache est écrit)
+def charger_table(chemin, schema, cache=True, dossier_cache=DOSSIER_CACHE):
+    if not cache:
+        return lire_table(chemin, schema)
+    fichier_cache, prefixe = _chemin_cache(chemin, schema, dossier_cache)
+    if os.path.exists(fichier_cache):
+        return pq.read_table(fichier_cache)
+    table = lire_table(chemin, schema)
+    os.makedirs(dossier_cache, exist_ok=True)
+    # les anciennes versions du cache de ce fichier ne servent plus
+    for ancien in glob.glob(os.path.join(dossier_cache, glob.escape(prefixe) + "*.parquet")):
+        os.remove(ancien)
+    temporaire = f"{fichier_cache}.{os.getpid()}.tmp"
+    pq.write_table(table, temporaire)
+    os.replace(temporaire, fichier_cache)  # écriture atomique : pas de cache à moitié écrit
+    return table
+
+
+def charger_csv(chemin, schema, cache=True, dossier_cache=DOSSIER_CACHE):
+    return charger_table(chemin, schema, cache, dossier_cache).to_pandas()
+
+
+# Charge tous les fichiers d'un dossier en parallèle (un fichier par thread : pyarrow libère le GIL)
+# et les concatène ; chaque fichier a son propre cache, donc un nouveau mois ne relit que ce mois
+def charger_dossier(dossier, schema, motif="*.csv", nb_threads=None, cache=True, dossier_cache=DOSSIER_CACHE):
+    chemins = sorted(glob.glob(os.path.join(dossier, motif)))
+    if not chemins:
+        raise FileNotFoundError(f"Aucun fichier {motif} dans {dossier}")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=nb_threads) as executeur:
+        tables = list(executeur.map(lambda chemin: charger_table(chemin, schema, cache, dossier_cache), chemins))
+    # chaque fichier a ses propres dictionnaires de catégories : on les fusionne avant la conversion
+    table = pa.concat_tables(tables).unify_dictionaries().combine_chunks()
+    return table.to_pandas()
+
+
+def charger_ventes(dossier=DOSSIER_CSV, motif="Sales_*.csv", cache=True):
+    return charger_dossier(dossier, "ventes", motif, cache=cache)
+
+
+def charger_olympiques(chemin=os.path.join(DOSSIER_CSV, "olympics_1896_2004.csv"), cache=True):
+    return charger_csv(chemin, "olympiques", cache)
+
+
+if __name__ == "__main__":
+    import time
+
+    for nom, charger in [("ventes", charger_ventes), ("olympiques", charger_olympiques)]:
+        for essai in ("sans cache", "1er chargement", "2e chargement"):
+            debut = time.perf_counter()
+            df = charger(cache=essai != "sans cache")
+            print(f"{nom:<11} {essai:<15} {len(df):>6} lignes  {(time.perf_counter() - debut) * 1000:7.1f} ms")
+    print(df.dtypes)
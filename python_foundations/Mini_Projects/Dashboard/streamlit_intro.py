@@ -1,14 +1,40 @@
+import time
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+
+debut = time.perf_counter()
+
+# pandas et plotly sont lourds à importer : on les importe dans les fonctions qui s'en servent,
+# et le titre s'affiche avant le chargement des données (Streamlit envoie la page au fil du script)
 
 # 1. PRÉPARATION DES DONNÉES
-# Exactement comme avant
-df = pd.DataFrame({
-    "Fruit": ["Pommes", "Oranges", "Bananes", "Pommes", "Oranges", "Bananes"],
-    "Ville": ["Paris", "Paris", "Paris", "Lyon", "Lyon", "Lyon"],
-    "Ventes": [4, 1, 2, 2, 4, 5],
-})
+# Exactement comme avant, sauf que Streamlit relance TOUT le script à chaque clic :
+# sans cache, le DataFrame et le graphique seraient reconstruits à chaque fois.
+# @st.cache_data garde le résultat (partagé entre les utilisateurs, ici pendant 10 minutes).
+@st.cache_data(ttl=600)
+def charger_donnees():
+    import pandas as pd
+    return pd.DataFrame({
+        "Fruit": ["Pommes", "Oranges", "Bananes", "Pommes", "Oranges", "Bananes"],
+        "Ville": ["Paris", "Paris", "Paris", "Lyon", "Lyon", "Lyon"],
+        "Ventes": [4, 1, 2, 2, 4, 5],
+    })
+
+
+# Un seul groupby pour toutes les villes (au lieu de filtrer tout le DataFrame à chaque clic)
+@st.cache_data(ttl=600)
+def index_par_ville(df):
+    agrege = df.groupby(["Ville", "Fruit"], sort=False)["Ventes"].sum().reset_index()
+    return {ville: groupe.drop(columns="Ville") for ville, groupe in agrege.groupby("Ville", sort=False)}
+
+
+# Le graphique d'une ville n'est construit qu'une fois
+@st.cache_data(ttl=600)
+def graphique(ville):
+    import plotly.express as px
+    groupe = index_par_ville(charger_donnees())[ville]
+    return px.bar(groupe, x="Fruit", y="Ventes", color="Fruit", barmode="group")
+
 
 # 2. CONSTRUCTION DE L'APP
 # Pas de "app = ...", pas de "layout = ...". On écrit direct !
@@ -20,20 +46,27 @@ st.write('''
     Sélectionnez une ville pour filtrer le graphique :
 ''')
 
+df = charger_donnees()
+index = index_par_ville(df)
+
 # 3. INTERACTIVITÉ (WIDGETS)
 # En Dash, on devait créer le Dropdown puis faire un Callback.
 # Ici, on crée le widget et on récupère sa valeur en UNE SEULE ligne.
 ville_selectionnee = st.selectbox(
     'Quelle ville voulez-vous voir ?',
-    df['Ville'].unique()
+    list(index)
 )
 
 # 4. LOGIQUE & AFFICHAGE
-# On utilise directement la variable 'ville_selectionnee'
-filtered_df = df[df['Ville'] == ville_selectionnee]
-
-# Création du graphique Plotly (identique à Dash)
-fig = px.bar(filtered_df, x="Fruit", y="Ventes", color="Fruit", barmode="group")
+# On lit directement le graphique de 'ville_selectionnee' dans le cache
+fig = graphique(ville_selectionnee)
 
 # Affichage du graphique
-st.plotly_chart(fig)
\ No newline at end of file
+st.plotly_chart(fig)
+
+# 5. DÉBOGAGE : durée de cette exécution du script (quelques ms quand tout vient du cache)
+with st.expander("Débogage"):
+    st.caption(f"Exécution du script : {(time.perf_counter() - debut) * 1000:.1f} ms")
+    if st.button("Vider le cache"):
+        st.cache_data.clear()
+        st.rerun()
@@ -1,3 +1,5 @@
+from collections import Counter
+
 from utils import nettoyer_texte, split_en_mots, split_en_phrases
 def compter_mots(texte: str) -> int:
     # compte le nombre de mots
@@ -9,11 +11,13 @@ def compter_phrases(texte: str) -> int:
 
 def mot_plus_frequent(mots: list[str]) -> tuple[str, int]:
     # recupère le nombre de mots avec leurs frequences
-    frequences = {}
-    for mot in mots:
-        frequences[mot] = frequences.get(mot, 0) + 1
-    mot, freq = max(frequences.items(), key=lambda x: x[1], default=("", 0))
-    return mot, freq
+    plus_frequents = mots_plus_frequents(mots, 1)
+    return plus_frequents[0] if plus_frequents else ("", 0)
+
+def mots_plus_frequents(mots: list[str], n: int = 10) -> list[tuple[str, int]]:
+    # les n mots les plus fréquents (exact) ; Counter compte en C et most_common utilise un tas
+    # pour un flux trop gros pour la mémoire, voir frequences.SpaceSaving (approximatif)
+    return Counter(mots).most_common(n)
 
 def longueur_moyenne_mots(mots: list[str]) -> float:
     # calcule la longuer moyenne des mots
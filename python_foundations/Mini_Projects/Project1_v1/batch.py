@@ -0,0 +1,162 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils import PONCTUATIONS, SEPARATEURS_PHRASES
+
+# mêmes règles que utils / analysis, écrites comme opérations vectorisées sur toute la colonne
+# (pyarrow.compute, le moteur des chaînes de pandas, et NumPy) : aucune boucle Python par ligne,
+# ni par jeton distinct quand le texte est en ASCII
+TABLE_NETTOYAGE = str.maketrans("", "", PONCTUATIONS)
+MOTIF_PONCTUATIONS = f"[{re.escape(PONCTUATIONS)}]"
+MOTIF_SEPARATEURS = f"[{re.escape(''.join(SEPARATEURS_PHRASES))}]"
+
+
+def statistiques_lot(textes) -> pd.DataFrame:
+    # calcule les stats de chaque texte d'une Series (ou liste / tableau NumPy) d'un coup
+    # renvoie un DataFrame avec le même index : nb_mots, nb_phrases, longueur_moyenne, mot_plus_frequent, frequence
+    if not isinstance(textes, pd.Series):
+        textes = pd.Series(textes)
+    nb_lignes = len(textes)
+    # les chaînes de pandas sont déjà stockées en arrow : la conversion ne copie rien
+    colonne = pc.fill_null(pa.array(textes.astype("string"), from_pandas=True), "")
+    # sur un texte ASCII, les variantes ASCII des noyaux d'arrow donnent le même résultat, plus vite
+    ascii_seul = pc.all(pc.string_is_ascii(colonne)).as_py() is not False
+
+    # découpe toute la colonne en jetons (suites sans espace) ; chaque jeton distinct reçoit un numéro
+    listes = (pc.ascii_split_whitespace if ascii_seul else pc.utf8_split_whitespace)(colonne)
+    lignes = pc.list_parent_indices(listes).to_numpy()
+    dictionnaire = pc.dictionary_encode(pc.list_flatten(listes))
+    jetons = dictionnaire.indices.to_numpy()
+    jetons_distincts = dictionnaire.dictionary
+    # le découpage d'arrow garde des jetons vides autour des espaces de début et de fin de ligne
+    jetons, lignes = _sans_code_vide(jetons, lignes, pc.binary_length(jetons_distincts).to_numpy())
+    if not len(jetons):
+        return _sans_mots(textes, np.zeros(nb_lignes, dtype=np.int64))
+
+    nb_phrases = _compter_phrases(jetons, lignes, jetons_distincts, nb_lignes)
+
+    # nettoyer_texte n'est appliqué qu'une fois par jeton distinct, pas sur tout le texte :
+    # "Le" et "le," deviennent le même mot, et un jeton qui ne contient que de la ponctuation disparaît
+    if ascii_seul:
+        mots_distincts = pc.ascii_lower(pc.replace_substring_regex(jetons_distincts, MOTIF_PONCTUATIONS, ""))
+    else:
+        # str.lower et utf8_lower ne traitent pas tous les caractères Unicode de la même façon
+        mots_distincts = pa.array([jeton.translate(TABLE_NETTOYAGE).lower() for jeton in jetons_distincts.to_pylist()],
+                                  type=pa.string())
+    vocabulaire_encode = pc.dictionary_encode(mots_distincts)
+    vocabulaire = vocabulaire_encode.dictionary.to_numpy(zero_copy_only=False)
+    longueur_mot = pc.utf8_length(vocabulaire_encode.dictionary).to_numpy()
+    codes = vocabulaire_encode.indices.to_numpy()[jetons]
+    codes, lignes = _sans_code_vide(codes, lignes, longueur_mot)
+    if not len(codes):
+        # que de la ponctuation ("!!", "... ?") : des phrases peut-être, mais aucun mot
+        return _sans_mots(textes, nb_phrases)
+
+    # les mots d'une ligne se suivent : comptes et sommes par tranche, à partir du premier mot de chaque ligne
+    debuts = np.flatnonzero(np.r_[True, lignes[1:] != lignes[:-1]])
+    lignes_avec_mots = lignes[debuts]
+    nb_mots = np.zeros(nb_lignes, dtype=np.int64)
+    nb_mots[lignes_avec_mots] = np.diff(np.r_[debuts, len(lignes)])
+    longueur_moyenne = np.zeros(nb_lignes)
+    longueur_moyenne[lignes_avec_mots] = np.add.reduceat(longueur_mot[codes], debuts) / nb_mots[lignes_avec_mots]
+    mot, frequence = _mot_plus_frequent_par_ligne(codes, lignes, debuts, vocabulaire, nb_lignes)
+    return _resultat(textes, nb_mots, nb_phrases, longueur_moyenne, mot, frequence)
+
+
+def _resultat(textes, nb_mots, nb_phrases, longueur_moyenne, mot, frequence) -> pd.DataFrame:
+    return pd.DataFrame({
+        "nb_mots": nb_mots,
+        "nb_phrases": nb_phrases,
+        "longueur_moyenne": longueur_moyenne,
+        "mot_plus_frequent": mot,
+        "frequence": frequence,
+    }, index=textes.index)
+
+
+def _sans_mots(textes, nb_phrases: np.ndarray) -> pd.DataFrame:
+    # aucun mot dans tout le lot : le résultat de analyser_texte sur un texte sans mot, pour chaque ligne
+    nb_lignes = len(textes)
+    return _resultat(textes, np.zeros(nb_lignes, dtype=np.int64), nb_phrases, np.zeros(nb_lignes),
+                     np.full(nb_lignes, "", dtype=object), np.zeros(nb_lignes, dtype=np.int64))
+
+
+def _sans_code_vide(codes: np.ndarray, lignes: np.ndarray, longueurs: np.ndarray):
+    # retire les occurrences de la chaîne vide (au plus un code, les codes viennent d'un dictionnaire) ;
+    # rien à copier quand elle n'apparaît pas
+    vide = np.flatnonzero(longueurs == 0)
+    if not len(vide):
+        return codes, lignes
+    garder = codes != vide[0]
+    return codes[garder], lignes[garder]
+
+
+def _compter_phrases(jetons: np.ndarray, lignes: np.ndarray, jetons_distincts: pa.Array, nb_lignes: int) -> np.ndarray:
+    # une phrase commence à chaque caractère (hors séparateur) précédé d'un séparateur ou du début de ligne,
+    # espaces mis à part : c'est la même règle que split_en_phrases, calculée une fois par jeton distinct
+    texte_au_debut, ouvertures_internes, finit_par_separateur = _profils_phrases(jetons_distincts)
+    debut_de_ligne = np.empty(len(lignes), dtype=bool)
+    debut_de_ligne[0] = True
+    np.not_equal(lignes[1:], lignes[:-1], out=debut_de_ligne[1:])
+    ouvre = texte_au_debut[jetons]
+    ouvre[1:] &= debut_de_ligne[1:] | finit_par_separateur[jetons[:-1]]
+    ouvertures = ouvertures_internes[jetons] + ouvre
+    # les jetons d'une ligne se suivent : une somme par tranche, sans poids flottants comme bincount
+    debuts = np.flatnonzero(debut_de_ligne)
+    nb_phrases = np.zeros(nb_lignes, dtype=np.int64)
+    nb_phrases[lignes[debuts]] = np.add.reduceat(ouvertures, debuts)
+    return nb_phrases
+
+
+def _profils_phrases(jetons_distincts: pa.Array):
+    # pour chaque jeton distinct, d'après ses morceaux entre séparateurs : texte avant le premier séparateur,
+    # phrases ouvertes après un séparateur, finit par un séparateur (dernier morceau vide)
+    morceaux = pc.split_pattern_regex(jetons_distincts, MOTIF_SEPARATEURS)
+    debuts = morceaux.offsets.to_numpy()
+    non_vides = pc.binary_length(pc.list_flatten(morceaux)).to_numpy() > 0
+    texte_au_debut = non_vides[debuts[:-1]]
+    ouvertures_internes = (np.add.reduceat(non_vides.astype(np.int32), debuts[:-1]) - texte_au_debut).astype(np.int32)
+    finit_par_separateur = (np.diff(debuts) > 1) & ~non_vides[debuts[1:] - 1]
+    return texte_au_debut, ouvertures_internes, finit_par_separateur
+
+
+def _mot_plus_frequent_par_ligne(codes: np.ndarray, lignes: np.ndarray, debuts: np.ndarray, vocabulaire: np.ndarray,
+                                 nb_lignes: int):
+    # debuts : position du premier mot de chaque ligne qui en a
+    mot = np.full(nb_lignes, "", dtype=object)
+    frequence = np.zeros(nb_lignes, dtype=np.int64)
+    # dans une ligne sans mot répété, le premier mot gagne avec une fréquence de 1 (analysis.mot_plus_frequent
+    # garde le premier mot rencontré à fréquence égale) : c'est le cas de la plupart des lignes courtes
+    mot[lignes[debuts]] = vocabulaire[codes[debuts]]
+    frequence[lignes[debuts]] = 1
+    # une clé entière (ligne, mot) par mot : les clés répétées désignent les lignes à départager
+    taille_vocabulaire = len(vocabulaire)
+    cles = lignes.astype(np.int64) * taille_vocabulaire + codes
+    cles_triees = np.sort(cles)
+    repetees = cles_triees[1:][cles_triees[1:] == cles_triees[:-1]]
+    if not len(repetees):
+        return mot, frequence
+    a_repetition = np.zeros(nb_lignes, dtype=bool)
+    a_repetition[repetees // taille_vocabulaire] = True
+    cles = cles[a_repetition[lignes]]
+
+    # sur ces lignes seulement : les lignes se suivent déjà, donc le tri stable est presque gratuit
+    # et garde pour chaque clé sa première apparition en tête de groupe
+    ordre = np.argsort(cles, kind="stable")
+    cles_triees = cles[ordre]
+    debuts_cles = np.flatnonzero(np.r_[True, cles_triees[1:] != cles_triees[:-1]])
+    cles = cles_triees[debuts_cles]
+    comptes = np.diff(np.r_[debuts_cles, len(cles_triees)])
+    premiere_position = ordre[debuts_cles]
+    lignes_cles = cles // taille_vocabulaire
+    # score = fréquence, puis à fréquence égale le premier mot rencontré gagne
+    score = comptes * (len(cles_triees) + 1) - premiere_position
+    debuts_lignes = np.flatnonzero(np.r_[True, lignes_cles[1:] != lignes_cles[:-1]])
+    meilleur = np.maximum.reduceat(score, debuts_lignes)
+    gagnants = score == np.repeat(meilleur, np.diff(np.r_[debuts_lignes, len(cles)]))
+    mot[lignes_cles[gagnants]] = vocabulaire[cles[gagnants] % taille_vocabulaire]
+    frequence[lignes_cles[gagnants]] = comptes[gagnants]
+    return mot, frequence
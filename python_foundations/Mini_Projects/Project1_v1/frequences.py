@@ -0,0 +1,76 @@
+import heapq
+import math
+
+
+class SpaceSaving:
+    # compteur approximatif des mots les plus fréquents (algorithme Space-Saving)
+    # garde au plus `capacite` mots en mémoire, quel que soit le nombre de mots distincts du flux
+    # garantie : chaque compte est surestimé d'au plus total / capacite (voir erreur_max)
+    # et tout mot plus fréquent que total / capacite est forcément dans le tableau
+
+    def __init__(self, capacite: int | None = None, erreur: float | None = None):
+        # erreur = fraction du total tolérée, ex. 0.001 -> 1000 compteurs
+        if capacite is None:
+            if not erreur or erreur <= 0:
+                raise ValueError("Il faut donner une capacite ou une erreur > 0")
+            if erreur > 1:
+                raise ValueError(f"erreur est une fraction du total, elle doit être <= 1 (reçu {erreur})")
+            capacite = math.ceil(1 / erreur)
+        if capacite < 1:
+            raise ValueError(f"capacite doit être >= 1 (reçu {capacite})")
+        self.capacite = capacite
+        self.total = 0
+        self._compteurs = {}  # mot -> [compte, surestimation]
+        self._tas = []        # (compte, mot), les entrées périmées sont ignorées
+
+    def ajouter(self, mot: str, n: int = 1):
+        self.total += n
+        entree = self._compteurs.get(mot)
+        if entree is not None:
+            entree[0] += n
+        elif len(self._compteurs) < self.capacite:
+            entree = self._compteurs[mot] = [n, 0]
+        else:
+            # tableau plein : le mot remplace le moins fréquent et hérite de son compte
+            minimum = self._retirer_minimum()
+            entree = self._compteurs[mot] = [minimum + n, minimum]
+        heapq.heappush(self._tas, (entree[0], mot))
+        if len(self._tas) > 4 * self.capacite:
+            self._tas = [(compte, m) for m, (compte, _) in self._compteurs.items()]
+            heapq.heapify(self._tas)
+
+    def _retirer_minimum(self) -> int:
+        while True:
+            compte, mot = heapq.heappop(self._tas)
+            entree = self._compteurs.get(mot)
+            if entree is not None and entree[0] == compte:
+                del self._compteurs[mot]
+                return compte
+
+    def update(self, mots):
+        # même interface que Counter.update : une liste de mots ou un dict {mot: nombre}
+        if hasattr(mots, "items"):
+            for mot, n in mots.items():
+                self.ajouter(mot, n)
+        else:
+            for mot in mots:
+                self.ajouter(mot)
+
+    def items(self):
+        return ((mot, entree[0]) for mot, entree in self._compteurs.items())
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        if n is None:
+            return sorted(self.items(), key=lambda x: x[1], reverse=True)
+        return heapq.nlargest(n, self.items(), key=lambda x: x[1])
+
+    def surestimation(self, mot: str) -> int:
+        # de combien le compte de ce mot peut être trop grand (0 = compte exact)
+        entree = self._compteurs.get(mot)
+        return entree[1] if entree is not None else 0
+
+    def erreur_max(self) -> float:
+        return self.total / self.capacite
+
+    def __len__(self) -> int:
+        return len(self._compteurs)
@@ -1,23 +1,33 @@
-from utils import nettoyer_texte, split_en_mots, split_en_phrases
-from analysis import compter_mots, compter_phrases, mot_plus_frequent, longueur_moyenne_mots
+import os
+import sys
+
+from tokenizer import analyser_texte
+from streaming import analyser_fichier
+from parallel import analyser_dossier, analyser_gros_fichier, SEUIL_PARALLELE
 
 if __name__ == "__main__":
-    # Demander à l'utilisateur de saisir un text
-    sentence = input("Veuillez saisir une phrase : ")
-    
-    # appeler les fonctions nécessaire pour nettqyer le text
-    cleaned_text = nettoyer_texte(sentence)
-    liste_words = split_en_mots(cleaned_text)
-    liste_phrases = split_en_phrases(sentence)
+    if len(sys.argv) > 1:
+        # mode fichier : python main.py gros_fichier.txt (ou "-" pour lire l'entrée standard)
+        # un dossier ou un très gros fichier est réparti sur tous les coeurs du processeur
+        chemin = sys.argv[1]
+        if os.path.isdir(chemin):
+            resultat = analyser_dossier(chemin)
+        elif chemin != "-" and os.path.getsize(chemin) > SEUIL_PARALLELE:
+            resultat = analyser_gros_fichier(chemin)
+        else:
+            resultat = analyser_fichier(chemin)
+    else:
+        # Demander à l'utilisateur de saisir un text
+        sentence = input("Veuillez saisir une phrase : ")
+
+        # un seul passage sur le texte calcule toutes les stats (mots, phrases, fréquences, longueurs)
+        resultat = analyser_texte(sentence)
 
-    # appeler les fonctions d'analyse pour extraire les stats
-    word_count = compter_mots(cleaned_text)
-    phrase_count = compter_phrases(sentence)
-    most_frequent_word, frequency = mot_plus_frequent(liste_words)
-    average_word_length = longueur_moyenne_mots(liste_words)
+    most_frequent_word, frequency = resultat.mot_plus_frequent()
 
     # Afficher les résultats
-    print(f"Nombre de mots : {word_count}")
-    print(f"Nombre de phrases : {phrase_count}")
+    print(f"Nombre de mots : {resultat.nb_mots}")
+    print(f"Nombre de phrases : {resultat.nb_phrases}")
     print(f"Mot le plus fréquent : {most_frequent_word} (fréquence : {frequency})")
-    print(f"Longueur moyenne des mots : {average_word_length:.2f}")
\ No newline at end of file
+    print(f"Longueur moyenne des mots : {resultat.longueur_moyenne_mots():.2f}")
+    print("Top 5 : " + ", ".join(f"{mot} ({freq})" for mot, freq in resultat.mots_plus_frequents(5)))
@@ -0,0 +1,90 @@
+import codecs
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from tokenizer import Tokeniseur, ResultatAnalyse
+from streaming import analyser_fichier, TAILLE_BLOC
+
+SEUIL_PARALLELE = 64 * 1024 * 1024  # au-delà de 64 Mo, un fichier est découpé entre plusieurs processus
+TRANCHES_PAR_PROCESSUS = 4           # plus de tranches que de processus pour mieux répartir la charge
+# fin de phrase sûre : un séparateur suivi d'un espace, on coupe juste après le séparateur
+MOTIF_FIN_DE_PHRASE = re.compile(rb"[.!?](?=\s)")
+
+
+def _nb_processus(nb_processus: int | None) -> int:
+    return nb_processus or os.cpu_count() or 1
+
+
+def _prochaine_fin_de_phrase(fichier, position: int, taille: int) -> int:
+    # cherche à partir de position la première fin de phrase et renvoie l'octet juste après
+    fichier.seek(position)
+    while position < taille:
+        octets = fichier.read(TAILLE_BLOC + 1)  # +1 pour voir l'espace après un séparateur en fin de bloc
+        correspondance = MOTIF_FIN_DE_PHRASE.search(octets)
+        if correspondance:
+            return position + correspondance.end()
+        position += TAILLE_BLOC
+        fichier.seek(position)
+    return taille
+
+
+def decouper_fichier(chemin: str, nb_tranches: int) -> list[tuple[int, int]]:
+    # découpe le fichier en tranches (début, fin) en octets, toujours à une fin de phrase
+    # ainsi aucun mot ni aucune phrase n'est partagé entre deux tranches
+    taille = os.path.getsize(chemin)
+    bornes = [0]
+    with open(chemin, "rb") as fichier:
+        for i in range(1, nb_tranches):
+            cible = max(taille * i // nb_tranches, bornes[-1])
+            borne = _prochaine_fin_de_phrase(fichier, cible, taille)
+            if bornes[-1] < borne < taille:
+                bornes.append(borne)
+    bornes.append(taille)
+    return list(zip(bornes, bornes[1:]))
+
+
+def _analyser_tranche(chemin: str, debut: int, fin: int) -> ResultatAnalyse:
+    # exécuté dans un processus : analyse les octets [debut, fin[ du fichier
+    tokeniseur = Tokeniseur()
+    decodeur = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(chemin, "rb") as fichier:
+        fichier.seek(debut)
+        restant = fin - debut
+        while restant > 0:
+            octets = fichier.read(min(TAILLE_BLOC, restant))
+            if not octets:
+                break
+            restant -= len(octets)
+            tokeniseur.alimenter(decodeur.decode(octets))
+    tokeniseur.alimenter(decodeur.decode(b"", final=True))
+    return tokeniseur.terminer()
+
+
+def _reduire(partiels) -> ResultatAnalyse:
+    # fusionne les résultats partiels dans l'ordre (garde le même mot le plus fréquent en cas d'égalité)
+    total = ResultatAnalyse()
+    for partiel in partiels:
+        total.fusionner(partiel)
+    return total
+
+
+def analyser_gros_fichier(chemin: str, nb_processus: int | None = None) -> ResultatAnalyse:
+    # un seul gros fichier réparti entre plusieurs processus
+    nb_processus = _nb_processus(nb_processus)
+    tranches = decouper_fichier(chemin, nb_processus * TRANCHES_PAR_PROCESSUS)
+    debuts = [debut for debut, _ in tranches]
+    fins = [fin for _, fin in tranches]
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        return _reduire(executeur.map(_analyser_tranche, [chemin] * len(tranches), debuts, fins))
+
+
+def analyser_dossier(dossier: str, motif: str = "*.txt", nb_processus: int | None = None) -> ResultatAnalyse:
+    # chaque fichier du dossier (et des sous-dossiers) est un document analysé par un processus
+    fichiers = sorted(str(chemin) for chemin in Path(dossier).rglob(motif) if chemin.is_file())
+    nb_processus = _nb_processus(nb_processus)
+    # envoyer les petits fichiers par paquets évite un aller-retour entre processus par document
+    paquet = max(1, len(fichiers) // (nb_processus * TRANCHES_PAR_PROCESSUS))
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        return _reduire(executeur.map(analyser_fichier, fichiers, chunksize=paquet))
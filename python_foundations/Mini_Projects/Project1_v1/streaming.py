@@ -0,0 +1,32 @@
+import sys
+
+from tokenizer import Tokeniseur, ResultatAnalyse
+
+TAILLE_BLOC = 1024 * 1024  # 1 Mo lu à la fois
+
+
+def lire_blocs(fichier, taille_bloc: int = TAILLE_BLOC):
+    # générateur qui lit un fichier texte ouvert par blocs de taille fixe
+    while True:
+        bloc = fichier.read(taille_bloc)
+        if not bloc:
+            break
+        yield bloc
+
+
+def analyser_flux(fichier, taille_bloc: int = TAILLE_BLOC, frequences=None) -> ResultatAnalyse:
+    # analyse un fichier ouvert (ou sys.stdin) bloc par bloc, sans jamais le garder en entier en mémoire
+    # le tokeniseur garde de côté les mots et les phrases coupés entre deux blocs
+    # frequences=SpaceSaving(...) borne aussi la mémoire du tableau des fréquences
+    tokeniseur = Tokeniseur(frequences=frequences)
+    for bloc in lire_blocs(fichier, taille_bloc):
+        tokeniseur.alimenter(bloc)
+    return tokeniseur.terminer()
+
+
+def analyser_fichier(chemin: str, taille_bloc: int = TAILLE_BLOC, frequences=None) -> ResultatAnalyse:
+    # "-" veut dire l'entrée standard, comme pour la plupart des outils en ligne de commande
+    if chemin == "-":
+        return analyser_flux(sys.stdin, taille_bloc, frequences)
+    with open(chemin, encoding="utf-8", errors="replace") as fichier:
+        return analyser_flux(fichier, taille_bloc, frequences)
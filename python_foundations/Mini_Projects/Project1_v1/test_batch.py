@@ -0,0 +1,59 @@
+"""
+Tests de batch.statistiques_lot : chaque ligne doit donner les mêmes stats que analyser_texte.
+
+Lancer avec : python -m unittest test_batch (ou pytest) depuis ce dossier.
+"""
+import unittest
+
+import pandas as pd
+
+from batch import statistiques_lot
+from tokenizer import analyser_texte
+
+TEXTES_MELANGES = [
+    "",
+    "   ",
+    "!!",
+    "...",
+    "?",
+    "  Le chat dort. Le chien aussi !  ",
+    "Élève, élève : ÉLÈVE... où est l'école ?",
+    "\tbonjour\n le monde ",
+    "a b a b c",
+    "— « citation » —",
+]
+
+
+def attendu(texte: str) -> tuple:
+    resultat = analyser_texte(texte)
+    return (resultat.nb_mots, resultat.nb_phrases, resultat.longueur_moyenne_mots(), *resultat.mot_plus_frequent())
+
+
+class StatistiquesLotTest(unittest.TestCase):
+
+    def verifier(self, textes):
+        stats = statistiques_lot(textes)
+        self.assertEqual(len(stats), len(textes))
+        for texte, ligne in zip(textes, stats.itertuples(index=False)):
+            nb_mots, nb_phrases, longueur, mot, frequence = attendu(texte)
+            with self.subTest(texte=texte):
+                self.assertEqual((ligne.nb_mots, ligne.nb_phrases, ligne.mot_plus_frequent, ligne.frequence),
+                                 (nb_mots, nb_phrases, mot, frequence))
+                self.assertAlmostEqual(ligne.longueur_moyenne, longueur)
+
+    def test_texte_sans_mot(self):
+        # que de la ponctuation : aucun mot, mais des phrases possibles
+        self.verifier(["!!"])
+        self.verifier(["...", "?"])
+        self.verifier(["", "   "])
+
+    def test_textes_melanges(self):
+        self.verifier(TEXTES_MELANGES)
+
+    def test_garde_l_index(self):
+        textes = pd.Series(["un deux", "!!", "trois"], index=[10, 20, 30])
+        self.assertEqual(list(statistiques_lot(textes).index), [10, 20, 30])
+
+
+if __name__ == "__main__":
+    unittest.main()
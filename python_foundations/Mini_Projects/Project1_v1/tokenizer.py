@@ -0,0 +1,105 @@
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+from utils import PONCTUATIONS, SEPARATEURS_PHRASES
+
+# mêmes règles que nettoyer_texte / split_en_mots / split_en_phrases, mais en un seul passage
+TABLE_NETTOYAGE = str.maketrans("", "", PONCTUATIONS)
+ENSEMBLE_SEPARATEURS = frozenset(SEPARATEURS_PHRASES)
+TAILLE_FENETRE = 64 * 1024  # caractères traités à la fois
+MOTIF_SEPARATEURS = re.compile("[" + re.escape("".join(SEPARATEURS_PHRASES)) + "]")
+
+
+@dataclass
+class ResultatAnalyse:
+    # toutes les statistiques du texte, calculées en une fois
+    nb_mots: int = 0
+    nb_phrases: int = 0
+    somme_longueurs: int = 0
+    frequences: Counter = field(default_factory=Counter)  # ou frequences.SpaceSaving (mémoire bornée)
+
+    def mot_plus_frequent(self) -> tuple[str, int]:
+        # en cas d'égalité, le premier mot rencontré gagne (comme analysis.mot_plus_frequent)
+        return max(self.frequences.items(), key=lambda x: x[1], default=("", 0))
+
+    def mots_plus_frequents(self, n: int = 10) -> list[tuple[str, int]]:
+        return self.frequences.most_common(n)
+
+    def longueur_moyenne_mots(self) -> float:
+        if not self.nb_mots:
+            return 0.0
+        return self.somme_longueurs / self.nb_mots
+
+    def fusionner(self, autre: "ResultatAnalyse") -> "ResultatAnalyse":
+        # additionne les stats d'un autre morceau de texte (résultats partiels des processus)
+        self.nb_mots += autre.nb_mots
+        self.nb_phrases += autre.nb_phrases
+        self.somme_longueurs += autre.somme_longueurs
+        self.frequences.update(autre.frequences)
+        return self
+
+
+class Tokeniseur:
+    # parcourt le texte une seule fois, par fenêtres de taille fixe coupées entre deux mots
+    # chaque fenêtre est nettoyée, découpée et comptée d'un coup : aucune copie du texte entier
+    # le texte peut arriver en plusieurs morceaux : un mot coupé en fin de morceau est mis de côté
+
+    def __init__(self, taille_fenetre: int = TAILLE_FENETRE, frequences=None):
+        # frequences : un SpaceSaving pour compter les mots en mémoire bornée (par défaut un Counter exact)
+        if frequences is None:
+            frequences = Counter()
+        self.resultat = ResultatAnalyse(frequences=frequences)
+        self.taille_fenetre = taille_fenetre
+        self._reste = ""               # mot coupé à la fin du morceau précédent
+        self._phrase_en_cours = False  # la phrase courante contient déjà du texte
+
+    def alimenter(self, texte: str):
+        debut = 0
+        while debut < len(texte):
+            fin = min(debut + self.taille_fenetre, len(texte))
+            # recule jusqu'au dernier espace pour ne jamais couper un mot en deux
+            coupure = fin
+            while coupure > debut and not texte[coupure - 1].isspace():
+                coupure -= 1
+            if coupure == debut:
+                # aucun espace dans la fenêtre : tout part dans le reste
+                self._reste += texte[debut:fin]
+            else:
+                self._traiter_fenetre(self._reste + texte[debut:coupure])
+                self._reste = texte[coupure:fin]
+            debut = fin
+
+    def terminer(self) -> ResultatAnalyse:
+        # traite le dernier mot et compte la dernière phrase sans ponctuation finale
+        if self._reste:
+            self._traiter_fenetre(self._reste)
+            self._reste = ""
+        if self._phrase_en_cours:
+            self.resultat.nb_phrases += 1
+            self._phrase_en_cours = False
+        return self.resultat
+
+    def _traiter_fenetre(self, fenetre: str):
+        # mots : même règle que split_en_mots(nettoyer_texte(...))
+        mots = fenetre.translate(TABLE_NETTOYAGE).lower().split()
+        self.resultat.nb_mots += len(mots)
+        self.resultat.somme_longueurs += sum(map(len, mots))
+        self.resultat.frequences.update(mots)
+        # phrases : même règle que split_en_phrases, une phrase vide (que des espaces) ne compte pas
+        if ENSEMBLE_SEPARATEURS.isdisjoint(fenetre):
+            if fenetre and not fenetre.isspace():
+                self._phrase_en_cours = True
+            return
+        morceaux = MOTIF_SEPARATEURS.split(fenetre)
+        if self._phrase_en_cours or morceaux[0].strip():
+            self.resultat.nb_phrases += 1
+        self.resultat.nb_phrases += sum(1 for morceau in morceaux[1:-1] if morceau.strip())
+        self._phrase_en_cours = bool(morceaux[-1].strip())
+
+
+def analyser_texte(texte: str) -> ResultatAnalyse:
+    # remplace nettoyer_texte + split_en_mots + split_en_phrases + compter_* en un seul appel
+    tokeniseur = Tokeniseur()
+    tokeniseur.alimenter(texte)
+    return tokeniseur.terminer()
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio front-end for the university database.
+
+AsyncUniversity exposes the same operations as University as coroutines. Each
+call runs on a dedicated thread pool (every worker thread has its own pooled
+SQLite connection), so the event loop never blocks on disk I/O and several
+queries can be in flight at once. A call that times out or is cancelled
+interrupts its SQLite statement instead of letting it run to completion.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import db_search
+from db_logic import DEFAULT_PAGE_SIZE, University
+
+DEFAULT_WORKERS = 8
+
+
+class _Job:
+    """Runs one University call on a worker thread and remembers the connection while it runs."""
+
+    def __init__(self, university, method_name, args):
+        self.university = university
+        self.method_name = method_name
+        self.args = args
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def run(self):
+        conn = self.university.conn
+        with self._lock:
+            self._conn = conn
+        try:
+            return getattr(self.university, self.method_name)(*self.args)
+        finally:
+            with self._lock:
+                self._conn = None
+
+    def interrupt(self):
+        """Aborts the running SQL statement, if the job is still running."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.interrupt()
+
+
+class AsyncUniversity:
+    """
+    Async counterpart of University. Every method accepts an optional `timeout`
+    (seconds) overriding the instance default; on timeout asyncio.TimeoutError
+    is raised and the underlying query is interrupted.
+    """
+
+    def __init__(self, db_path, max_workers=DEFAULT_WORKERS, timeout=None):
+        self.university = University(db_path)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="university")
+
+    async def _call(self, method_name, *args, timeout=None):
+        job = _Job(self.university, method_name, args)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, job.run)
+        try:
+            return await asyncio.wait_for(future, timeout if timeout is not None else self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # a queued job is dropped by the cancellation; a running one has to be interrupted
+            job.interrupt()
+            raise
+
+    # --- Writes ---
+
+    async def add_student(self, name, age, student_id, timeout=None):
+        return await self._call("add_student", name, age, student_id, timeout=timeout)
+
+    async def add_professor(self, name, age, employee_id, timeout=None):
+        return await self._call("add_professor", name, age, employee_id, timeout=timeout)
+
+    async def add_course(self, name, code, timeout=None):
+        return await self._call("add_course", name, code, timeout=timeout)
+
+    async def assign_professor_to_course(self, professor_identifier, course_code, timeout=None):
+        return await self._call("assign_professor_to_course", professor_identifier, course_code, timeout=timeout)
+
+    async def enroll_student_in_course(self, student_id, course_code, timeout=None):
+        return await self._call("enroll_student_in_course", student_id, course_code, timeout=timeout)
+
+    async def assign_grade(self, student_id, course_code, grade, timeout=None):
+        return await self._call("assign_grade", student_id, course_code, grade, timeout=timeout)
+
+    async def enroll_students_bulk(self, enrollments, timeout=None):
+        return await self._call("enroll_students_bulk", list(enrollments), timeout=timeout)
+
+    async def assign_grades_bulk(self, grades, timeout=None):
+        return await self._call("assign_grades_bulk", list(grades), timeout=timeout)
+
+    # --- Reads ---
+
+    async def get_people(self, role, timeout=None):
+        return await self._call("get_people", role, timeout=timeout)
+
+    async def get_courses(self, timeout=None):
+        return await self._call("get_courses", timeout=timeout)
+
+    async def get_course_summary(self, course_code, timeout=None):
+        return await self._call("get_course_summary", course_code, timeout=timeout)
+
+    async def get_student_grades(self, student_id, timeout=None):
+        return await self._call("get_student_grades", student_id, timeout=timeout)
+
+    async def get_people_page(self, role, page_size=DEFAULT_PAGE_SIZE, cursor=None, timeout=None):
+        return await self._call("get_people_page", role, page_size, cursor, timeout=timeout)
+
+    async def get_course_summary_page(self, course_code, page_size=DEFAULT_PAGE_SIZE, cursor=None, timeout=None):
+        return await self._call("get_course_summary_page", course_code, page_size, cursor, timeout=timeout)
+
+    async def get_table_page(self, table_name, page_size=DEFAULT_PAGE_SIZE, cursor=None, columns=None,
+                             filters=None, timeout=None):
+        return await self._call("get_table_page", table_name, page_size, cursor, columns, filters, timeout=timeout)
+
+    async def search_people(self, text, role=None, limit=db_search.DEFAULT_LIMIT, timeout=None):
+        return await self._call("search_people", text, role, limit, timeout=timeout)
+
+    async def search_courses(self, text, limit=db_search.DEFAULT_LIMIT, timeout=None):
+        return await self._call("search_courses", text, limit, timeout=timeout)
+
+    async def get_totals(self, timeout=None):
+        return await self._call("get_totals", timeout=timeout)
+
+    async def get_course_stats(self, course_code, timeout=None):
+        return await self._call("get_course_stats", course_code, timeout=timeout)
+
+    async def get_student_gpa(self, student_id, timeout=None):
+        return await self._call("get_student_gpa", student_id, timeout=timeout)
+
+    async def get_all_table_names(self, timeout=None):
+        return await self._call("get_all_table_names", timeout=timeout)
+
+    async def get_table_contents(self, table_name, timeout=None):
+        return await self._call("get_table_contents", table_name, timeout=timeout)
+
+    # --- Backups ---
+
+    async def backup_to(self, path, timeout=None):
+        return await self._call("backup_to", path, timeout=timeout)
+
+    async def restore_from(self, path, timeout=None):
+        return await self._call("restore_from", path, timeout=timeout)
+
+    # --- Lifecycle ---
+
+    async def close(self):
+        """Waits for the running calls, then closes the thread pool and the connections."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
+        self.university.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Pre-aggregated analytics for the university database.
+
+Summary tables kept current by triggers, so that dashboard numbers are single
+row lookups instead of counts and joins over persons / enrollments / grades:
+
+    stats_totals              number of persons per role, of courses and of enrollments
+    stats_course_enrollments  enrollment count per course
+    stats_course_grades       grade distribution per course
+    stats_student_gpa         grade points sum and graded course count per student
+    stats_professor_load      courses taught and students taught per professor
+
+Letter grades are mapped to points through the grade_points table (case-insensitive);
+grades missing from it count in the distribution but not in the GPA.
+
+The triggers only see INSERT / UPDATE / DELETE statements: "INSERT OR REPLACE"
+deletes the old row without firing the delete triggers, so writes to grades must
+use an upsert (INSERT ... ON CONFLICT DO UPDATE) instead.
+"""
+
+DEFAULT_GRADE_POINTS = {
+    "A+": 4.0, "A": 4.0, "A-": 3.7,
+    "B+": 3.3, "B": 3.0, "B-": 2.7,
+    "C+": 2.3, "C": 2.0, "C-": 1.7,
+    "D+": 1.3, "D": 1.0, "D-": 0.7,
+    "F": 0.0,
+}
+
+# Recomputes one student's GPA row from their grades (a primary key range, so it stays
+# cheap); an exact recount avoids the drift of adding and subtracting float points.
+# (An upsert, not INSERT OR REPLACE: the outer statement's conflict policy would override it.)
+_REFRESH_GPA = """
+    INSERT INTO stats_student_gpa (student_id, points, n_graded)
+    SELECT {student}, SUM(gp.points), COUNT(gp.points)
+    FROM grades g JOIN grade_points gp ON gp.grade = g.grade
+    WHERE g.student_id = {student}
+    ON CONFLICT (student_id) DO UPDATE SET points = excluded.points, n_graded = excluded.n_graded;"""
+
+_BUMP_TOTAL = """
+    INSERT INTO stats_totals (name, n) VALUES ({name}, {delta})
+    ON CONFLICT (name) DO UPDATE SET n = n + excluded.n;"""
+
+
+def _course_enrollments(course):
+    return f"COALESCE((SELECT n FROM stats_course_enrollments WHERE course_id = {course}), 0)"
+
+
+ANALYTICS_TABLES = [
+    "CREATE TABLE IF NOT EXISTS grade_points (grade TEXT PRIMARY KEY COLLATE NOCASE, points REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS stats_totals (name TEXT PRIMARY KEY, n INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS stats_course_enrollments (course_id INTEGER PRIMARY KEY, n INTEGER NOT NULL)",
+    """CREATE TABLE IF NOT EXISTS stats_course_grades (
+        course_id INTEGER, grade TEXT, n INTEGER NOT NULL, PRIMARY KEY (course_id, grade))""",
+    """CREATE TABLE IF NOT EXISTS stats_student_gpa (
+        student_id INTEGER PRIMARY KEY, points REAL, n_graded INTEGER NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS stats_professor_load (
+        professor_id INTEGER PRIMARY KEY, n_courses INTEGER NOT NULL, n_students INTEGER NOT NULL)""",
+]
+
+ANALYTICS_TRIGGERS = [
+    # --- persons: totals per role ---
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_persons_insert AFTER INSERT ON persons BEGIN
+        {_BUMP_TOTAL.format(name="'persons:' || NEW.role", delta=1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_persons_delete AFTER DELETE ON persons BEGIN
+        {_BUMP_TOTAL.format(name="'persons:' || OLD.role", delta=-1)}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_persons_role AFTER UPDATE OF role ON persons
+    WHEN OLD.role IS NOT NEW.role BEGIN
+        {_BUMP_TOTAL.format(name="'persons:' || OLD.role", delta=-1)}
+        {_BUMP_TOTAL.format(name="'persons:' || NEW.role", delta=1)}
+    END""",
+    # --- courses: total and professor load ---
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_courses_insert AFTER INSERT ON courses BEGIN
+        {_BUMP_TOTAL.format(name="'courses'", delta=1)}
+        INSERT INTO stats_professor_load (professor_id, n_courses, n_students)
+        SELECT NEW.professor_id, 1, {_course_enrollments("NEW.id")} WHERE NEW.professor_id IS NOT NULL
+        ON CONFLICT (professor_id) DO UPDATE SET n_courses = n_courses + 1,
+                                                 n_students = n_students + excluded.n_students;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_courses_delete AFTER DELETE ON courses BEGIN
+        {_BUMP_TOTAL.format(name="'courses'", delta=-1)}
+        UPDATE stats_professor_load SET n_courses = n_courses - 1,
+                                        n_students = n_students - {_course_enrollments("OLD.id")}
+        WHERE professor_id = OLD.professor_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_courses_professor AFTER UPDATE OF professor_id ON courses
+    WHEN OLD.professor_id IS NOT NEW.professor_id BEGIN
+        UPDATE stats_professor_load SET n_courses = n_courses - 1,
+                                        n_students = n_students - {_course_enrollments("NEW.id")}
+        WHERE professor_id = OLD.professor_id;
+        INSERT INTO stats_professor_load (professor_id, n_courses, n_students)
+        SELECT NEW.professor_id, 1, {_course_enrollments("NEW.id")} WHERE NEW.professor_id IS NOT NULL
+        ON CONFLICT (professor_id) DO UPDATE SET n_courses = n_courses + 1,
+                                                 n_students = n_students + excluded.n_students;
+    END""",
+    # --- enrollments: per course count, total and professor load ---
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_enrollments_insert AFTER INSERT ON enrollments BEGIN
+        {_BUMP_TOTAL.format(name="'enrollments'", delta=1)}
+        INSERT INTO stats_course_enrollments (course_id, n) VALUES (NEW.course_id, 1)
+        ON CONFLICT (course_id) DO UPDATE SET n = n + 1;
+        UPDATE stats_professor_load SET n_students = n_students + 1
+        WHERE professor_id = (SELECT professor_id FROM courses WHERE id = NEW.course_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_enrollments_delete AFTER DELETE ON enrollments BEGIN
+        {_BUMP_TOTAL.format(name="'enrollments'", delta=-1)}
+        UPDATE stats_course_enrollments SET n = n - 1 WHERE course_id = OLD.course_id;
+        UPDATE stats_professor_load SET n_students = n_students - 1
+        WHERE professor_id = (SELECT professor_id FROM courses WHERE id = OLD.course_id);
+    END""",
+    # --- grades: distribution per course and GPA per student ---
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_grades_insert AFTER INSERT ON grades BEGIN
+        INSERT INTO stats_course_grades (course_id, grade, n) VALUES (NEW.course_id, NEW.grade, 1)
+        ON CONFLICT (course_id, grade) DO UPDATE SET n = n + 1;
+        {_REFRESH_GPA.format(student="NEW.student_id")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_grades_update AFTER UPDATE ON grades BEGIN
+        UPDATE stats_course_grades SET n = n - 1 WHERE course_id = OLD.course_id AND grade = OLD.grade;
+        DELETE FROM stats_course_grades WHERE course_id = OLD.course_id AND grade = OLD.grade AND n = 0;
+        INSERT INTO stats_course_grades (course_id, grade, n) VALUES (NEW.course_id, NEW.grade, 1)
+        ON CONFLICT (course_id, grade) DO UPDATE SET n = n + 1;
+        {_REFRESH_GPA.format(student="OLD.student_id")}
+        {_REFRESH_GPA.format(student="NEW.student_id")}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stats_grades_delete AFTER DELETE ON grades BEGIN
+        UPDATE stats_course_grades SET n = n - 1 WHERE course_id = OLD.course_id AND grade = OLD.grade;
+        DELETE FROM stats_course_grades WHERE course_id = OLD.course_id AND grade = OLD.grade AND n = 0;
+        {_REFRESH_GPA.format(student="OLD.student_id")}
+    END""",
+]
+
+# Rebuilds every summary table from the base tables (backfill of an existing database,
+# and University.refresh_analytics after the grade points change).
+ANALYTICS_REBUILD = [
+    "DELETE FROM stats_totals",
+    "DELETE FROM stats_course_enrollments",
+    "DELETE FROM stats_course_grades",
+    "DELETE FROM stats_student_gpa",
+    "DELETE FROM stats_professor_load",
+    """INSERT INTO stats_totals (name, n)
+       SELECT 'persons:' || role, COUNT(*) FROM persons GROUP BY role
+       UNION ALL SELECT 'courses', COUNT(*) FROM courses
+       UNION ALL SELECT 'enrollments', COUNT(*) FROM enrollments""",
+    """INSERT INTO stats_course_enrollments (course_id, n)
+       SELECT course_id, COUNT(*) FROM enrollments GROUP BY course_id""",
+    """INSERT INTO stats_course_grades (course_id, grade, n)
+       SELECT course_id, grade, COUNT(*) FROM grades GROUP BY course_id, grade""",
+    """INSERT INTO stats_student_gpa (student_id, points, n_graded)
+       SELECT g.student_id, SUM(gp.points), COUNT(gp.points)
+       FROM grades g LEFT JOIN grade_points gp ON gp.grade = g.grade GROUP BY g.student_id""",
+    """INSERT INTO stats_professor_load (professor_id, n_courses, n_students)
+       SELECT c.professor_id, COUNT(*), SUM(COALESCE(e.n, 0))
+       FROM courses c LEFT JOIN stats_course_enrollments e ON e.course_id = c.id
+       WHERE c.professor_id IS NOT NULL GROUP BY c.professor_id""",
+]
+
+ANALYTICS_SCHEMA = (
+    ANALYTICS_TABLES
+    + [f"INSERT OR IGNORE INTO grade_points (grade, points) VALUES ('{grade}', {points})"
+       for grade, points in DEFAULT_GRADE_POINTS.items()]
+    + ANALYTICS_TRIGGERS
+    + ANALYTICS_REBUILD
+)
+
+# Read queries
+TOTALS_SQL = ("SELECT name, n FROM stats_totals "
+              "WHERE name IN ('persons:student', 'persons:professor', 'courses', 'enrollments')")
+COURSE_STATS_SQL = """
+        SELECT c.id, c.name, COALESCE(e.n, 0) FROM courses c
+        LEFT JOIN stats_course_enrollments e ON e.course_id = c.id
+        WHERE c.code = ?
+        """
+COURSE_GRADES_SQL = "SELECT grade, n FROM stats_course_grades WHERE course_id = ? ORDER BY grade"
+STUDENT_GPA_SQL = """
+        SELECT s.points, s.n_graded FROM stats_student_gpa s
+        JOIN persons p ON p.id = s.student_id
+        WHERE p.university_id = ? AND p.role = 'student'
+        """
+COURSE_ENROLLMENT_COUNTS_SQL = """
+        SELECT c.name, c.code, COALESCE(e.n, 0) AS n FROM courses c
+        LEFT JOIN stats_course_enrollments e ON e.course_id = c.id
+        ORDER BY n DESC, c.id
+        """
+PROFESSOR_LOAD_SQL = """
+        SELECT p.name, p.university_id, COALESCE(l.n_courses, 0) AS n_courses, COALESCE(l.n_students, 0)
+        FROM persons p LEFT JOIN stats_professor_load l ON l.professor_id = p.id
+        WHERE p.role = 'professor'
+        ORDER BY n_courses DESC, p.id
+        """
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Online backups, snapshots and fast resets of the university database.
+
+All of it goes through SQLite's backup API (sqlite3.Connection.backup), which
+copies a database page by page between two connections while the others keep
+working. It copies pages, not rows: the cost follows the size of the file,
+whatever the number of rows, indexes and triggers in it.
+
+- snapshot(conn, path) copies the database into a new file. In one step (the
+  default) the copy is consistent as of its start; in WAL mode it only holds a
+  read transaction, so writers are not blocked.
+- restore(path, conn) copies a database file over the live one, through one of
+  its connections, in place: nothing is deleted, the other connections (other
+  threads, other Streamlit sessions, other processes) stay open and see the
+  restored data at their next transaction.
+- ensure_template(path, build, version) keeps a prebuilt database (the sample
+  data) that a reset restores in one copy instead of replaying the inserts.
+- BackupScheduler copies the database to a file at a fixed interval, `pages`
+  pages per step with a pause between steps, so no read transaction stays
+  open long enough to hold back the WAL checkpoints. A commit from another
+  connection between two steps makes SQLite restart the copy; after
+  max_restarts restarts the scheduler finishes with a one-step copy instead.
+  A run is skipped when nothing was committed since the previous backup.
+
+Backups are written to "<path>.tmp" and renamed over the previous one, so an
+interrupted backup never leaves a half-written file behind.
+
+    python db_backup.py snapshot university.db backups/university.db
+    python db_backup.py restore university_template.db university.db
+    python db_backup.py schedule university.db backups/university.db --interval 300
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+PAGES_PER_STEP = 1024      # pages copied per step by the scheduler (4 MiB with the default page size)
+STEP_SLEEP = 0.005         # seconds between two steps
+MAX_RESTARTS = 3           # restarted stepped copies before falling back to a one-step copy
+DEFAULT_INTERVAL = 300.0   # seconds between two scheduled backups
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _remove(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _side_files(path):
+    # a WAL database keeps two side files next to it, they belong to that file only
+    return path + "-wal", path + "-shm"
+
+
+def snapshot(conn, path, pages=-1, sleep=STEP_SLEEP, progress=None):
+    """
+    Copies the database open on conn to a new file at path (replacing any previous one)
+    and returns {"pages", "bytes", "seconds"}. pages=-1 copies everything in one step;
+    progress(status, remaining, total) is called after each step.
+    """
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    _remove(tmp, *_side_files(tmp))
+    target = sqlite3.connect(tmp)
+    try:
+        conn.backup(target, pages=pages, progress=progress, sleep=sleep)
+        page_count, page_size = (target.execute(f"PRAGMA {pragma}").fetchone()[0]
+                                 for pragma in ("page_count", "page_size"))
+    except BaseException:
+        target.close()
+        _remove(tmp)
+        raise
+    target.close()
+    _remove(*_side_files(path))
+    os.replace(tmp, path)
+    return {"pages": page_count, "bytes": page_count * page_size, "seconds": time.perf_counter() - start}
+
+
+def restore(path, conn):
+    """
+    Replaces the whole database open on conn with the database file at path, in one step,
+    and returns {"pages", "seconds"}. conn must not be in a transaction.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No database to restore at '{path}'")
+    start = time.perf_counter()
+    source = sqlite3.connect(path)
+    try:
+        source.backup(conn)
+        page_count = source.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        source.close()
+    return {"pages": page_count, "seconds": time.perf_counter() - start}
+
+
+def user_version(path):
+    """PRAGMA user_version of the database at path (the schema version), -1 if there is no file."""
+    if not os.path.exists(path):
+        return -1
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def ensure_template(path, build, version):
+    """
+    Returns path after building the template database there with build(tmp_path) when
+    it is missing or its schema version is below version (delete the file to rebuild it
+    after changing what build() loads). The template is left in rollback journal mode,
+    a single self-contained file.
+    """
+    if user_version(path) >= version:
+        return path
+    tmp = path + ".tmp"
+    _remove(tmp, *_side_files(tmp))
+    build(tmp)
+    conn = sqlite3.connect(tmp)
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.close()
+    _remove(*_side_files(path))
+    os.replace(tmp, path)
+    return path
+
+
+class BackupScheduler:
+    """
+    Background thread backing up a database file to target_path every `interval` seconds
+    (see the module docstring). run_once() can also be called directly.
+    """
+
+    def __init__(self, db_path, target_path, interval=DEFAULT_INTERVAL, pages=PAGES_PER_STEP,
+                 sleep=STEP_SLEEP, max_restarts=MAX_RESTARTS, start=True):
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        if pages == 0 or pages < -1:
+            raise ValueError(f"pages must be positive or -1, got {pages}")
+        self.db_path = db_path
+        self.target_path = target_path
+        self.interval = interval
+        self.pages = pages
+        self.sleep = sleep
+        self.max_restarts = max_restarts
+        # a connection of its own: PRAGMA data_version then tells whether anything was committed
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._version = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stats = {"backups": 0, "skipped": 0, "restarts": 0, "fallbacks": 0, "errors": 0,
+                       "last_pages": 0, "last_seconds": 0.0, "last_error": None}
+        self._thread = None
+        if start:
+            self._thread = threading.Thread(target=self._run, name="university-backup", daemon=True)
+            self._thread.start()
+
+    def run_once(self, force=False):
+        """Backs the database up now unless nothing changed since the last backup; returns the backup's stats or None."""
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if not force and version == self._version and os.path.exists(self.target_path):
+                self._stats["skipped"] += 1
+                return None
+            start = time.perf_counter()
+            restarts = 0
+            remaining_before = None
+
+            def progress(status, remaining, total):
+                nonlocal restarts, remaining_before
+                if remaining_before is not None and remaining > remaining_before:
+                    restarts += 1
+                    if restarts > self.max_restarts:
+                        raise _TooManyRestarts()
+                remaining_before = remaining
+
+            try:
+                result = snapshot(self._conn, self.target_path, self.pages, self.sleep, progress)
+            except _TooManyRestarts:
+                self._stats["fallbacks"] += 1
+                result = snapshot(self._conn, self.target_path)
+            # commits made during the copy bump data_version again: the next run copies them
+            self._version = version
+            self._stats["backups"] += 1
+            self._stats["restarts"] += restarts
+            self._stats["last_pages"] = result["pages"]
+            # including the stepped attempt that was given up, if any
+            self._stats["last_seconds"] = result["seconds"] = time.perf_counter() - start
+            return result
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:
+                with self._lock:
+                    self._stats["errors"] += 1
+                    self._stats["last_error"] = repr(exc)
+            self._stop.wait(self.interval)
+
+    def stats(self):
+        """Returns {backups, skipped, restarts, fallbacks, errors, last_pages, last_seconds, last_error}."""
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self, timeout=None):
+        """Stops the thread (after the backup in progress, if any) and closes the connection."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot, restore or periodically back up a university database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("snapshot", help="copy a database to a file")
+    command.add_argument("db")
+    command.add_argument("target")
+    command = commands.add_parser("restore", help="copy a backup over a database, in place")
+    command.add_argument("backup")
+    command.add_argument("db")
+    command = commands.add_parser("schedule", help="back a database up every --interval seconds")
+    command.add_argument("db")
+    command.add_argument("target")
+    command.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    command.add_argument("--pages", type=int, default=PAGES_PER_STEP, help="pages per step (-1: one step)")
+    args = parser.parse_args(argv)
+
+    if args.command == "schedule":
+        with BackupScheduler(args.db, args.target, args.interval, args.pages) as scheduler:
+            try:
+                while True:
+                    time.sleep(args.interval)
+                    print(scheduler.stats())
+            except KeyboardInterrupt:
+                pass
+        return 0
+    if args.command == "snapshot" and not os.path.exists(args.db):
+        parser.error(f"no database at '{args.db}'")
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.command == "snapshot":
+            result = snapshot(conn, args.target)
+        else:
+            result = restore(args.backup, conn)
+    finally:
+        conn.close()
+    print(f"{args.command}: {result['pages']} pages in {result['seconds'] * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
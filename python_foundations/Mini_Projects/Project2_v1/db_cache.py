@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Read-through cache for University query methods.
+
+Results are stored in an LRU keyed by (method name, arguments) and tagged with
+what they depend on, e.g. ("people", "student") or ("course_summary", "CS101").
+Write methods invalidate exactly the tags they touch. Commits made through
+other connections (other threads, other sessions, other processes) are
+detected with SQLite's PRAGMA data_version and clear the whole cache.
+
+IdCache applies the same rules to identifier lookups (university_id -> persons.id,
+course code -> courses.id) so the write methods can skip those SELECTs.
+"""
+import functools
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_ROWS = 100_000
+DEFAULT_MAX_IDS = 10_000
+
+
+class DataVersionWatch:
+    """
+    Tells whether another connection committed since a connection last asked (PRAGMA data_version).
+    data_version values only compare on the same connection, so a connection seen for the first
+    time (a new pooled connection, possibly opened after another process rewrote the tables)
+    counts as changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}             # connection -> last PRAGMA data_version seen on it
+
+    def changed(self, conn):
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        with self._lock:
+            previous = self._versions.get(conn)
+            self._versions[conn] = version
+        return previous != version
+
+
+class QueryCache:
+    """Thread-safe LRU of query results with tag-based invalidation and hit/miss counters."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_rows=DEFAULT_MAX_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (rows, tags)
+        self._keys_by_tag = {}          # tag -> set of keys
+        self._rows = 0
+        self._generation = 0            # bumped by every invalidation
+        self._tag_generation = {}       # tag -> generation of its last invalidation
+        self._cleared_at = 0            # generation of the last clear()
+        self._watch = DataVersionWatch()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def get(self, key):
+        """Returns (True, rows) on a hit, (False, None) on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, list(entry[0])
+
+    def put(self, key, rows, tags, generation):
+        """
+        Stores a result read when the cache was at `generation`. If one of its tags
+        was invalidated since (a write raced with the read), the result is dropped.
+        """
+        if not self.enabled or len(rows) > self.max_rows:
+            return
+        with self._lock:
+            if self._cleared_at > generation or any(
+                    self._tag_generation.get(tag, 0) > generation for tag in tags):
+                return
+            self._remove(key)
+            self._entries[key] = (list(rows), tags)
+            self._rows += len(rows)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        rows, tags = entry
+        self._rows -= len(rows)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def invalidate(self, *tags):
+        """Drops every cached result depending on one of `tags`."""
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                self._tag_generation[tag] = self._generation
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._tag_generation.clear()
+            self._rows = 0
+            self._cleared_at = self._generation
+
+    def check_external_writes(self, conn):
+        """Clears the cache if another connection committed since `conn` last looked."""
+        if self._watch.changed(conn):
+            self.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "rows": self._rows,
+                "max_entries": self.max_entries,
+                "max_rows": self.max_rows,
+            }
+
+
+class IdCache:
+    """
+    Thread-safe LRU of identifier lookups, (kind, key) -> row, e.g. ("student", "S12345") -> (42,).
+    Only rows that were found are kept; writes that can change what a lookup returns
+    drop its whole kind.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_IDS):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # (kind, key) -> row
+        self._generation = 0
+        self._kind_generation = {}      # kind -> generation of its last invalidation
+        self._cleared_at = 0
+        self._watch = DataVersionWatch()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def get(self, kind, key):
+        """Returns the cached row, or None on a miss."""
+        with self._lock:
+            row = self._entries.get((kind, key))
+            if row is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((kind, key))
+            self.hits += 1
+            return row
+
+    def put(self, kind, key, row, generation):
+        """Stores a row read at `generation`, unless its kind was invalidated since."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._cleared_at > generation or self._kind_generation.get(kind, 0) > generation:
+                return
+            self._entries[(kind, key)] = row
+            self._entries.move_to_end((kind, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *kinds):
+        with self._lock:
+            self._generation += 1
+            for kind in kinds:
+                self._kind_generation[kind] = self._generation
+            stale = [entry for entry in self._entries if entry[0] in kinds]
+            for entry in stale:
+                del self._entries[entry]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._kind_generation.clear()
+            self._cleared_at = self._generation
+
+    def check_external_writes(self, conn):
+        """Clears the cache if another connection committed since `conn` last looked."""
+        if self._watch.changed(conn):
+            self.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+def cached_query(tags):
+    """
+    Decorator for University read methods. `tags(*args)` returns the tags the
+    result depends on; the write methods invalidate those same tags.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            cache = self._cache
+            if not cache.enabled:
+                return method(self, *args)
+            cache.check_external_writes(self.conn)
+            key = (method.__name__,) + args
+            found, rows = cache.get(key)
+            if found:
+                return rows
+            generation = cache.generation()
+            rows = method(self, *args)
+            cache.put(key, rows, tuple(tags(*args)), generation)
+            return rows
+        return wrapper
+    return decorator
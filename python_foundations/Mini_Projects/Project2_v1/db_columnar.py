@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar export / import of the university database.
+
+Moves persons, courses, enrollments and grades to and from Parquet files
+(compressed, for storage and exchange) or Arrow IPC files (uncompressed, so
+they can be memory-mapped and loaded into pandas without copying). Rows are
+streamed in record batches in both directions, so large tables are never held
+in memory as a whole.
+
+Usage:
+    python db_columnar.py export exports/ --format arrow
+    python db_columnar.py import exports/ --db copy.db --replace
+"""
+import argparse
+import functools
+import os
+import sys
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from db_logic import DB_FILE, University
+
+BATCH_SIZE = 64 * 1024
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Column types of the exported tables, in import order (courses reference persons, ...)
+TABLE_SCHEMAS = {
+    "persons": pa.schema([
+        ("id", pa.int64()), ("name", pa.string()), ("age", pa.int64()),
+        ("role", pa.string()), ("university_id", pa.string()),
+    ]),
+    "courses": pa.schema([
+        ("id", pa.int64()), ("name", pa.string()), ("code", pa.string()), ("professor_id", pa.int64()),
+    ]),
+    "enrollments": pa.schema([("course_id", pa.int64()), ("student_id", pa.int64())]),
+    "grades": pa.schema([("student_id", pa.int64()), ("course_id", pa.int64()), ("grade", pa.string())]),
+}
+
+
+def table_path(directory, table, fmt):
+    return os.path.join(directory, table + FORMATS[fmt])
+
+
+def _open_writer(path, schema, fmt):
+    if fmt == "parquet":
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    # no compression: compressed IPC buffers would have to be decompressed (copied) on load
+    return pa.ipc.new_file(path, schema)
+
+
+def _record_batches(path):
+    """Yields the record batches of a Parquet or Arrow IPC file, reading one batch at a time."""
+    if path.endswith(FORMATS["parquet"]):
+        yield from pq.ParquetFile(path).iter_batches(batch_size=BATCH_SIZE)
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def export_table(university, table, path, fmt="parquet", batch_size=BATCH_SIZE):
+    """Writes one table to `path`, one record batch per batch_size rows. Returns the row count."""
+    schema = TABLE_SCHEMAS[table]
+    count = 0
+    with _open_writer(path, schema, fmt) as writer:
+        for rows in university.iter_table_batches(table, schema.names, batch_size):
+            columns = list(zip(*rows))
+            writer.write_batch(pa.record_batch(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema))
+            count += len(rows)
+    return count
+
+
+def export_database(university, directory, fmt="parquet", batch_size=BATCH_SIZE):
+    """
+    Exports every table of TABLE_SCHEMAS into `directory` from a single read snapshot
+    (writers keep going meanwhile). Returns {table: row count}.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {sorted(FORMATS)}")
+    os.makedirs(directory, exist_ok=True)
+    with university.snapshot():
+        return {table: export_table(university, table, table_path(directory, table, fmt), fmt, batch_size)
+                for table in TABLE_SCHEMAS}
+
+
+def import_table(university, table, path, replace=False):
+    """Loads one exported file into `table`, batch by batch, in one transaction. Returns the row count."""
+    # a function, not the batches: a retried load reads the file again from the start
+    return university.load_table_rows(table, TABLE_SCHEMAS[table].names, functools.partial(_row_batches, table, path),
+                                      replace=replace)
+
+
+def _row_batches(table, path):
+    names = TABLE_SCHEMAS[table].names
+    return (list(zip(*(batch.column(name).to_pylist() for name in names))) for batch in _record_batches(path))
+
+
+def import_database(university, directory, replace=False):
+    """
+    Imports the files written by export_database (Parquet or Arrow, whichever is found)
+    into the tables of `university`, all in one transaction: a bad file or row leaves the
+    database as it was. Ids are kept, so references stay valid; use replace=True to empty
+    the tables first. Returns {table: row count}.
+    """
+    paths = {}
+    for table in TABLE_SCHEMAS:
+        found = [table_path(directory, table, fmt) for fmt in FORMATS
+                 if os.path.exists(table_path(directory, table, fmt))]
+        if not found:
+            raise FileNotFoundError(f"No export of table '{table}' in '{directory}'")
+        paths[table] = found[0]
+    # TABLE_SCHEMAS lists the parent tables first (load_tables empties them children first)
+    loads = [(table, TABLE_SCHEMAS[table].names, functools.partial(_row_batches, table, path))
+             for table, path in paths.items()]
+    return university.load_tables(loads, replace=replace)
+
+
+def read_table(path):
+    """
+    Reads an exported file as a pyarrow Table. Arrow IPC files are memory-mapped:
+    the columns point into the mapped file and nothing is copied until used.
+    """
+    if path.endswith(FORMATS["parquet"]):
+        return pq.read_table(path, memory_map=True)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def load_dataframe(path):
+    """
+    Loads an exported file into pandas. Columns are backed by Arrow memory
+    (pd.ArrowDtype), so for a memory-mapped Arrow file no data is copied.
+    """
+    import pandas as pd
+    return read_table(path).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export / import the university database as Parquet or Arrow.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("directory")
+    parser.add_argument("--db", default=DB_FILE, help="database file (default: %(default)s)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="parquet", help="export format")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per record batch")
+    parser.add_argument("--replace", action="store_true", help="import: empty the tables first")
+    args = parser.parse_args(argv)
+
+    university = University(args.db)
+    try:
+        if args.command == "export":
+            counts = export_database(university, args.directory, args.format, args.batch_size)
+        else:
+            counts = import_database(university, args.directory, replace=args.replace)
+    finally:
+        university.close()
+    for table, count in counts.items():
+        print(f"{args.command}: {table}: {count} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic data generator for the university database.
+
+Fills a new database with any number of students, professors, courses,
+enrollments and grades, for capacity planning and benchmarks. The output
+depends only on the counts, the profile and the seed.
+
+Rows are written straight into the tables in large transactions, with the
+load-time PRAGMAs below, while secondary indexes and the analytics and search triggers
+are dropped; they are recreated, and the summary and search tables rebuilt, once at the
+end. Course popularity follows a Zipf law (the course of rank r gets a share
+of enrollments proportional to 1 / r ** skew) and grades follow the profile's
+letter distribution.
+
+Usage:
+    python db_generate.py synthetic.db --students 1000000 --courses 5000 --enrollments 20000000
+    python db_generate.py synthetic.db --students 10000 --profile skewed --seed 7 --replace
+"""
+import argparse
+import bisect
+import itertools
+import os
+import random
+import sqlite3
+import sys
+import time
+
+import db_analytics
+import db_search
+from db_logic import University
+
+SEED = 42
+BATCH_SIZE = 100_000       # rows per executemany
+COMMIT_ROWS = 1_000_000    # rows per transaction
+
+# Load-time settings: no rollback journal and no fsync (a failed load is simply redone),
+# a large page cache so index pages stay in memory, and an exclusive lock for the whole load.
+LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA cache_size = -262144",     # 256 MB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA locking_mode = EXCLUSIVE",
+]
+
+DEFAULT_GRADE_WEIGHTS = {"A": 15, "A-": 10, "B+": 12, "B": 15, "B-": 10, "C+": 10, "C": 12, "D": 8, "F": 8}
+
+# popularity_skew: Zipf exponent of course popularity (0 = every course equally popular)
+# graded_fraction: share of enrollments that have a grade
+PROFILES = {
+    "uniform": {"popularity_skew": 0.0, "graded_fraction": 0.8, "grade_weights": DEFAULT_GRADE_WEIGHTS},
+    "default": {"popularity_skew": 1.0, "graded_fraction": 0.8, "grade_weights": DEFAULT_GRADE_WEIGHTS},
+    "skewed": {"popularity_skew": 1.5, "graded_fraction": 0.6,
+               "grade_weights": {"A": 35, "A-": 20, "B+": 15, "B": 10, "B-": 6, "C+": 5, "C": 4, "D": 3, "F": 2}},
+}
+
+FIRST_NAMES = ("Alice Bob Charlie David Eva Frank Grace Hannah Ian Julia Karim Lea Mohamed Nina Omar "
+               "Paul Quentin Rosa Samuel Tina Ugo Vera William Xavier Yasmine Zoe").split()
+LAST_NAMES = ("Martin Bernard Dubois Thomas Robert Richard Petit Durand Leroy Moreau Simon Laurent "
+              "Lefebvre Michel Garcia David Bertrand Roux Vincent Fournier Morel Girard Andre Mercier").split()
+DEPARTMENTS = {
+    "CS": "Computer Science", "MA": "Mathematics", "PH": "Physics", "CH": "Chemistry",
+    "BI": "Biology", "EC": "Economics", "HI": "History", "LI": "Literature",
+}
+
+
+def _batches(rows, size=BATCH_SIZE):
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _id_width(count):
+    return max(5, len(str(count)))
+
+
+def course_sizes(n_courses, n_students, n_enrollments, skew, rng):
+    """
+    Splits n_enrollments over the courses following a Zipf law of exponent `skew`
+    (ranks shuffled with rng), no course getting more than n_students.
+    Returns the number of enrolled students per course.
+    """
+    if n_enrollments > n_courses * n_students:
+        raise ValueError(f"{n_enrollments} enrollments do not fit in {n_courses} courses x {n_students} students")
+    ranks = list(range(1, n_courses + 1))
+    rng.shuffle(ranks)
+    weights = [1 / rank ** skew for rank in ranks]
+    sizes = [0] * n_courses
+    remaining = n_enrollments
+    # largest remainder rounding; courses that hit the cap hand their surplus to the others
+    while remaining:
+        open_courses = [c for c in range(n_courses) if sizes[c] < n_students]
+        total = sum(weights[c] for c in open_courses)
+        shares = {c: remaining * weights[c] / total for c in open_courses}
+        given = 0
+        for c in open_courses:
+            add = min(int(shares[c]), n_students - sizes[c])
+            sizes[c] += add
+            given += add
+        leftover = remaining - given
+        for c in sorted(open_courses, key=lambda c: shares[c] - int(shares[c]), reverse=True):
+            if not leftover:
+                break
+            if sizes[c] < n_students:
+                sizes[c] += 1
+                leftover -= 1
+        remaining = leftover
+    return sizes
+
+
+def _grade_function(seed, grade_weights, graded_fraction):
+    """
+    SQL function grade(student_id, course_id): a letter drawn from grade_weights, or
+    NULL for ungraded enrollments. A hash of (seed, student, course) replaces a random
+    generator, so the result does not depend on the order rows are read in.
+    """
+    letters = list(grade_weights)
+    cumulative = list(itertools.accumulate(grade_weights[letter] for letter in letters))
+    total = cumulative[-1]
+    mask = (1 << 64) - 1
+
+    def grade(student_id, course_id):
+        # splitmix64 finalizer over the packed key
+        x = (seed * 0x9E3779B97F4A7C15 + student_id * 0xBF58476D1CE4E5B9 + course_id * 0x94D049BB133111EB) & mask
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & mask
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & mask
+        x ^= x >> 31
+        if (x >> 40) / (1 << 24) >= graded_fraction:
+            return None
+        return letters[bisect.bisect_right(cumulative, (x & 0xFFFFFFFFFF) / (1 << 40) * total)]
+    return grade
+
+
+def _insert(conn, query, rows, counter):
+    for batch in _batches(rows):
+        conn.executemany(query, batch)
+        counter[0] += len(batch)
+        if counter[0] >= COMMIT_ROWS:
+            conn.commit()
+            counter[0] = 0
+
+
+def generate(db_path, students, courses, enrollments, professors=None, profile="default",
+             seed=SEED, replace=False, **overrides):
+    """
+    Creates a database at db_path with the given counts and returns
+    {table: row count, "seconds": load time}.
+
+    professors defaults to one per two courses. profile is a PROFILES name; keyword
+    overrides (popularity_skew, graded_fraction, grade_weights) replace its values.
+    The file must not exist unless replace=True.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{profile}', expected one of {sorted(PROFILES)}")
+    unknown = set(overrides) - set(PROFILES[profile])
+    if unknown:
+        raise TypeError(f"Unknown profile settings: {sorted(unknown)}")
+    settings = {**PROFILES[profile], **overrides}
+    if professors is None:
+        professors = max(1, courses // 2) if courses else 0
+    if min(students, courses, enrollments, professors) < 0:
+        raise ValueError("Counts must not be negative")
+    if enrollments > courses * students:
+        raise ValueError(f"{enrollments} enrollments do not fit in {courses} courses x {students} students")
+
+    for path in (db_path, db_path + "-wal", db_path + "-shm"):
+        if os.path.exists(path):
+            if not replace:
+                raise FileExistsError(f"'{path}' already exists (use replace=True to overwrite it)")
+            os.remove(path)
+
+    start = time.perf_counter()
+    University(db_path).close()   # creates the tables and applies the schema migrations
+
+    conn = sqlite3.connect(db_path)
+    try:
+        for pragma in LOAD_PRAGMAS:
+            conn.execute(pragma)
+        # indexes and triggers are rebuilt after the load, from their own definitions
+        deferred = conn.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND sql IS NOT NULL"
+        ).fetchall()
+        for kind, name, _ in deferred:
+            conn.execute(f'DROP {kind.upper()} "{name}"')
+        conn.commit()
+
+        rng = random.Random(seed)
+        counter = [0]
+        width = _id_width(max(students, professors))
+        _insert(conn, "INSERT INTO persons (id, name, age, role, university_id) VALUES (?, ?, ?, 'student', ?)",
+                ((i, _name(rng), rng.randint(18, 30), f"S{i:0{width}d}") for i in range(1, students + 1)),
+                counter)
+        _insert(conn, "INSERT INTO persons (id, name, age, role, university_id) VALUES (?, ?, ?, 'professor', ?)",
+                ((students + i, "Dr. " + _name(rng), rng.randint(30, 70), f"P{i:0{width}d}")
+                 for i in range(1, professors + 1)),
+                counter)
+        departments = list(DEPARTMENTS)
+        code_width = _id_width(courses)
+        _insert(conn, "INSERT INTO courses (id, name, code, professor_id) VALUES (?, ?, ?, ?)",
+                ((i, f"{DEPARTMENTS[dept]} {i}", f"{dept}{i:0{code_width}d}",
+                  students + rng.randint(1, professors) if professors else None)
+                 for i, dept in ((i, rng.choice(departments)) for i in range(1, courses + 1))),
+                counter)
+
+        # enrollments course by course, students in id order: appends to the primary key index
+        sizes = course_sizes(courses, students, enrollments, settings["popularity_skew"], rng)
+        _insert(conn, "INSERT INTO enrollments (course_id, student_id) VALUES (?, ?)",
+                ((course_id, student_id)
+                 for course_id, size in enumerate(sizes, start=1)
+                 for student_id in sorted(rng.sample(range(1, students + 1), size))),
+                counter)
+        conn.commit()
+
+        # grades from the enrollments, in (student_id, course_id) order to match the grades primary key;
+        # ungraded enrollments get NULL, which OR IGNORE skips (grade is NOT NULL) without a second call
+        conn.create_function("synthetic_grade", 2,
+                             _grade_function(seed, settings["grade_weights"], settings["graded_fraction"]),
+                             deterministic=True)
+        conn.execute("""
+            INSERT OR IGNORE INTO grades (student_id, course_id, grade)
+            SELECT student_id, course_id, synthetic_grade(student_id, course_id) FROM enrollments
+            ORDER BY student_id, course_id""")
+        conn.commit()
+
+        for _, _, sql in deferred:
+            conn.execute(sql)
+        # the analytics and search triggers were off during the load: rebuild their tables once
+        for statement in db_analytics.ANALYTICS_REBUILD + db_search.SEARCH_REBUILD:
+            conn.execute(statement)
+        conn.commit()
+        conn.execute("PRAGMA journal_mode = WAL")   # back to the mode University runs in
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ("persons", "courses", "enrollments", "grades")}
+    finally:
+        conn.close()
+    counts["seconds"] = time.perf_counter() - start
+    return counts
+
+
+def _parse_grade_weights(value):
+    """Parses 'A=30,B=40,C=20,F=10'."""
+    weights = {}
+    for item in value.split(","):
+        letter, _, weight = item.partition("=")
+        weights[letter.strip()] = float(weight)
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a large synthetic university database.")
+    parser.add_argument("db", help="database file to create")
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--enrollments", type=int, help="total enrollments (default: 4 per student)")
+    parser.add_argument("--professors", type=int, help="default: one per two courses")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="default")
+    parser.add_argument("--skew", type=float, help="Zipf exponent of course popularity (overrides the profile)")
+    parser.add_argument("--graded-fraction", type=float, help="share of enrollments with a grade")
+    parser.add_argument("--grades", type=_parse_grade_weights, help="grade weights, e.g. A=30,B=40,C=20,F=10")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--replace", action="store_true", help="overwrite an existing file")
+    args = parser.parse_args(argv)
+
+    overrides = {key: value for key, value in [("popularity_skew", args.skew),
+                                               ("graded_fraction", args.graded_fraction),
+                                               ("grade_weights", args.grades)] if value is not None}
+    enrollments = args.enrollments if args.enrollments is not None else 4 * args.students
+    counts = generate(args.db, args.students, args.courses, enrollments, args.professors, args.profile,
+                      args.seed, args.replace, **overrides)
+    seconds = counts.pop("seconds")
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    print(f"generated in {seconds:.1f} s ({sum(counts.values()) / seconds:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
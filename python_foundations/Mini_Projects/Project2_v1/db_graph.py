@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""
+In-memory enrollment graph for the university database.
+
+Holds who is enrolled where, with the grades, in compact arrays instead of
+Python objects, so roster and transcript queries are answered without SQL:
+
+- students and courses get dense integer indexes (in persons.id / courses.id
+  order); university ids and course codes are interned once, in lists;
+- both directions are stored in compressed sparse row form: for student s,
+  its course indexes are student_courses[student_offsets[s]:student_offsets[s + 1]]
+  (sorted, with a parallel array of grade codes, -1 for "not graded"), and the
+  same for course -> students;
+- writes arrive through University's write listener (see
+  University.add_write_listener): the touched students are re-read from the
+  database and their edges replace the base arrays through small overrides,
+  folded back in by compact() once they grow.
+
+Writes made to the database by anything else than the attached University
+instance (another process, raw SQL) are not seen: call reload() after them.
+"""
+import collections
+import threading
+from array import array
+from bisect import bisect_left
+
+LOOKUP_CHUNK_SIZE = 500
+COMPACT_MIN_OVERRIDES = 10_000   # overrides kept before compact() runs (or 10% of the students)
+
+STUDENTS_SQL = "SELECT id, name, university_id FROM persons WHERE role = 'student' AND id > ? ORDER BY id"
+COURSES_SQL = "SELECT id, name, code FROM courses WHERE id > ? ORDER BY id"
+EDGES_SQL = """
+        SELECT e.student_id, e.course_id, g.grade FROM enrollments e
+        LEFT JOIN grades g ON g.student_id = e.student_id AND g.course_id = e.course_id
+        {where} ORDER BY e.student_id, e.course_id
+        """
+
+_NOT_GRADED = -1
+
+
+class EnrollmentGraph:
+    """Roster, transcript and co-enrollment queries over an in-memory copy of enrollments and grades."""
+
+    def __init__(self, university):
+        self._university = university
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        # students: dense index -> persons.id / university_id / name, and university_id -> dense index
+        self._student_ids = array("q")
+        self._student_codes = []
+        self._student_names = []
+        self._student_index = {}
+        # courses, same layout
+        self._course_ids = array("q")
+        self._course_codes = []
+        self._course_names = []
+        self._course_index = {}
+        self._course_by_id = {}
+        # grades interned as integers (grades are free text: no fixed set of letters)
+        self._grade_letters = []
+        self._grade_codes = {}
+        # base adjacency (compressed sparse rows) and the edits made since it was built
+        self._student_offsets = array("q", [0])
+        self._student_courses = array("i")
+        self._student_grades = array("i")
+        self._course_offsets = array("q", [0])
+        self._course_students = array("i")
+        self._student_overrides = {}                            # s -> (courses, grades)
+        self._course_added = collections.defaultdict(set)       # c -> students added since the build
+        self._course_removed = collections.defaultdict(set)     # c -> students removed since the build
+
+    # --- Loading and syncing ---
+
+    def reload(self):
+        """Rebuilds the whole graph from the database."""
+        with self._lock:
+            self._reset()
+            self._load_students()
+            self._load_courses()
+            cursor = self._university.conn.cursor()
+            cursor.execute(EDGES_SQL.format(where=""))
+            self._build(self._edges_by_student(cursor))
+            cursor.close()
+
+    def attach(self):
+        """Keeps the graph in sync with the writes of its University."""
+        self._university.add_write_listener(self._on_write)
+
+    def detach(self):
+        self._university.remove_write_listener(self._on_write)
+
+    def _load_students(self):
+        last = self._student_ids[-1] if self._student_ids else 0
+        self._university.cursor.execute(STUDENTS_SQL, (last,))
+        for person_id, name, university_id in self._university.cursor.fetchall():
+            self._student_index[university_id] = len(self._student_ids)
+            self._student_ids.append(person_id)
+            self._student_codes.append(university_id)
+            self._student_names.append(name)
+
+    def _load_courses(self):
+        last = self._course_ids[-1] if self._course_ids else 0
+        self._university.cursor.execute(COURSES_SQL, (last,))
+        for course_id, name, code in self._university.cursor.fetchall():
+            self._course_index[code] = self._course_by_id[course_id] = len(self._course_ids)
+            self._course_ids.append(course_id)
+            self._course_codes.append(code)
+            self._course_names.append(name)
+
+    def _grade_code(self, letter):
+        if letter is None:
+            return _NOT_GRADED
+        code = self._grade_codes.get(letter)
+        if code is None:
+            code = self._grade_codes[letter] = len(self._grade_letters)
+            self._grade_letters.append(letter)
+        return code
+
+    def _edges_by_student(self, rows):
+        """Groups (student_id, course_id, grade) rows ordered by student into (s, courses, grades)."""
+        current, courses, grades = None, array("i"), array("i")
+        for student_id, course_id, grade in rows:
+            if student_id != current:
+                if current is not None:
+                    yield current, courses, grades
+                current, courses, grades = student_id, array("i"), array("i")
+            course = self._course_by_id.get(course_id)
+            if course is not None:
+                courses.append(course)
+                grades.append(self._grade_code(grade))
+        if current is not None:
+            yield current, courses, grades
+
+    def _dense_student(self, person_id):
+        s = bisect_left(self._student_ids, person_id)
+        return s if s < len(self._student_ids) and self._student_ids[s] == person_id else None
+
+    def _build(self, edges):
+        """Builds both CSR directions from (persons.id, courses, grades) groups in student order."""
+        n_students, n_courses = len(self._student_ids), len(self._course_ids)
+        offsets, courses, grades = array("q", [0]), array("i"), array("i")
+        for person_id, student_courses, student_grades in edges:
+            s = self._dense_student(person_id)
+            if s is None:
+                continue   # enrollment of a person that is not a student
+            while len(offsets) <= s:
+                offsets.append(len(courses))
+            courses.extend(student_courses)
+            grades.extend(student_grades)
+            offsets.append(len(courses))
+        while len(offsets) <= n_students:
+            offsets.append(len(courses))
+
+        # course -> students by counting sort; filling in student order keeps every roster sorted
+        counts = array("q", bytes(8 * (n_courses + 1)))
+        for c in courses:
+            counts[c + 1] += 1
+        for c in range(n_courses):
+            counts[c + 1] += counts[c]
+        course_offsets = array("q", counts)
+        course_students = array("i", bytes(4 * len(courses)))
+        for s in range(n_students):
+            for position in range(offsets[s], offsets[s + 1]):
+                c = courses[position]
+                course_students[counts[c]] = s
+                counts[c] += 1
+
+        self._student_offsets, self._student_courses, self._student_grades = offsets, courses, grades
+        self._course_offsets, self._course_students = course_offsets, course_students
+        self._student_overrides.clear()
+        self._course_added.clear()
+        self._course_removed.clear()
+
+    def compact(self):
+        """
+        Folds the edits made since the last build back into the base arrays, and re-interns
+        the grades so the grades no longer used by any enrollment are dropped.
+        """
+        with self._lock:
+            letters = self._grade_letters
+            self._grade_letters, self._grade_codes = [], {}
+
+            def edges(s):
+                courses, grades = self._edges(s)
+                return courses, array("i", (g if g == _NOT_GRADED else self._grade_code(letters[g]) for g in grades))
+
+            self._build((self._student_ids[s], *edges(s)) for s in range(len(self._student_ids)))
+
+    def _on_write(self, tags):
+        """Write listener: re-reads whatever the write touched."""
+        if tags is None:
+            self.reload()
+            return
+        students = set()
+        with self._lock:
+            for tag in tags:
+                if tag == ("people", "student"):
+                    self._load_students()
+                elif tag[0] == "courses":
+                    self._load_courses()
+                elif tag[0] in ("student_courses", "student_grades"):
+                    students.add(tag[1])
+            if students:
+                self._refresh_students(students)
+
+    def _refresh_students(self, university_ids):
+        if any(university_id not in self._student_index for university_id in university_ids):
+            self._load_students()
+        dense = sorted(self._student_index[u] for u in university_ids if u in self._student_index)
+        for start in range(0, len(dense), LOOKUP_CHUNK_SIZE):
+            chunk = dense[start:start + LOOKUP_CHUNK_SIZE]
+            person_ids = [self._student_ids[s] for s in chunk]
+            self._university.cursor.execute(
+                EDGES_SQL.format(where=f"WHERE e.student_id IN ({','.join('?' * len(chunk))})"), person_ids)
+            found = {self._dense_student(person_id): (courses, grades) for person_id, courses, grades
+                     in self._edges_by_student(self._university.cursor.fetchall())}
+            for s in chunk:
+                self._replace_edges(s, *found.get(s, (array("i"), array("i"))))
+        if len(self._student_overrides) > max(COMPACT_MIN_OVERRIDES, len(self._student_ids) // 10):
+            self.compact()
+
+    def _replace_edges(self, s, courses, grades):
+        old = set(self._edges(s)[0])
+        new = set(courses)
+        for c in new - old:
+            if s in self._course_removed[c]:
+                self._course_removed[c].discard(s)
+            else:
+                self._course_added[c].add(s)
+        for c in old - new:
+            if s in self._course_added[c]:
+                self._course_added[c].discard(s)
+            else:
+                self._course_removed[c].add(s)
+        self._student_overrides[s] = (courses, grades)
+
+    # --- Adjacency ---
+
+    def _edges(self, s):
+        """(course indexes, grade codes) of student s."""
+        override = self._student_overrides.get(s)
+        if override is not None:
+            return override
+        if s + 1 < len(self._student_offsets):
+            start, end = self._student_offsets[s], self._student_offsets[s + 1]
+            return self._student_courses[start:end], self._student_grades[start:end]
+        return array("i"), array("i")
+
+    def _members(self, c):
+        """Student indexes enrolled in course c, in persons.id order."""
+        if c + 1 < len(self._course_offsets):
+            members = self._course_students[self._course_offsets[c]:self._course_offsets[c + 1]]
+        else:
+            members = array("i")
+        added, removed = self._course_added.get(c), self._course_removed.get(c)
+        if added or removed:
+            members = sorted((set(members) - (removed or set())) | (added or set()))
+        return members
+
+    # --- Queries ---
+
+    def roster(self, course_code):
+        """(name, university_id) of the students enrolled in a course, like University.get_course_summary."""
+        with self._lock:
+            c = self._course_index.get(course_code)
+            if c is None:
+                return []
+            return [(self._student_names[s], self._student_codes[s]) for s in self._members(c)]
+
+    def transcript(self, student_id):
+        """(course name, code, grade) of the student's graded courses, like University.get_student_grades."""
+        with self._lock:
+            s = self._student_index.get(student_id)
+            if s is None:
+                return []
+            courses, grades = self._edges(s)
+            return [(self._course_names[c], self._course_codes[c], self._grade_letters[g])
+                    for c, g in zip(courses, grades) if g != _NOT_GRADED]
+
+    def courses_of(self, student_id):
+        """Codes of every course the student is enrolled in, graded or not."""
+        with self._lock:
+            s = self._student_index.get(student_id)
+            return [] if s is None else [self._course_codes[c] for c in self._edges(s)[0]]
+
+    def shared_courses(self, student_a, student_b):
+        """Codes of the courses both students are enrolled in."""
+        with self._lock:
+            a, b = self._student_index.get(student_a), self._student_index.get(student_b)
+            if a is None or b is None:
+                return []
+            common = set(self._edges(a)[0]) & set(self._edges(b)[0])
+            return [self._course_codes[c] for c in sorted(common)]
+
+    def classmates(self, student_id, min_shared=1, limit=None):
+        """
+        Students sharing at least min_shared courses with student_id, as
+        (university_id, shared course count), most shared first.
+        """
+        with self._lock:
+            s = self._student_index.get(student_id)
+            if s is None:
+                return []
+            shared = collections.Counter()
+            for c in self._edges(s)[0]:
+                shared.update(self._members(c))
+            del shared[s]
+            found = sorted(((-n, other) for other, n in shared.items() if n >= min_shared))[:limit]
+            return [(self._student_codes[other], -n) for n, other in found]
+
+    def check_enrollment(self, student_id, course_code):
+        """
+        Returns the error University.enroll_student_in_course would return for this
+        pair (unknown student or course, already enrolled), or None if it would succeed.
+        """
+        with self._lock:
+            s, c = self._student_index.get(student_id), self._course_index.get(course_code)
+            if s is None or c is None:
+                return "Error: Could not find student or course."
+            if c in self._edges(s)[0]:
+                return f"Error: Student '{student_id}' is already enrolled in '{course_code}'."
+            return None
+
+    def check_grade(self, student_id, course_code):
+        """Same as check_enrollment for University.assign_grade (the student must be enrolled)."""
+        with self._lock:
+            s, c = self._student_index.get(student_id), self._course_index.get(course_code)
+            if s is None or c is None:
+                return "Error: Could not find student or course."
+            if c not in self._edges(s)[0]:
+                return f"Error: Student '{student_id}' is not enrolled in course '{course_code}'."
+            return None
+
+    def stats(self):
+        """Sizes of the graph and the bytes held by its arrays (the interned strings are not counted)."""
+        with self._lock:
+            arrays = (self._student_ids, self._course_ids, self._student_offsets, self._student_courses,
+                      self._student_grades, self._course_offsets, self._course_students)
+            return {
+                "students": len(self._student_ids),
+                "courses": len(self._course_ids),
+                "enrollments": len(self._student_courses) + sum(
+                    len(courses) - (self._student_offsets[s + 1] - self._student_offsets[s]
+                                    if s + 1 < len(self._student_offsets) else 0)
+                    for s, (courses, _) in self._student_overrides.items()),
+                "overrides": len(self._student_overrides),
+                "array_bytes": sum(a.itemsize * len(a) for a in arrays),
+            }
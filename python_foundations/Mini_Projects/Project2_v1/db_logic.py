@@ -3,21 +3,256 @@
 This file contains the data models and database interaction logic for the
 university management system.
 """
-import sqlite3
+import csv
+import logging
 import os
+import sqlite3
+import tempfile
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+import db_analytics
+import db_backup
+import db_search
+from db_cache import DEFAULT_MAX_ENTRIES, DEFAULT_MAX_IDS, IdCache, QueryCache, cached_query
+from db_graph import EnrollmentGraph
+from db_metrics import InstrumentedCursor, QueryMetrics
+from db_pool import ConnectionPool, retry_on_busy
 
 DB_FILE = "university.db"
+TEMPLATE_FILE = "university_template.db"   # sample database restored by initialize_database()
+
+listener_logger = logging.getLogger("university.write_listeners")
+# Max number of values bound in one "IN (...)" lookup (SQLite's historical limit is 999)
+LOOKUP_CHUNK_SIZE = 500
+# id cache kinds (see IdCache) dropped when a write touches a read cache tag of that kind:
+# a new person can take the university_id a professor name lookup fell back from
+ID_KINDS_BY_TAG = {"people": ("professor",)}
+# Column order expected for each kind of CSV file accepted by University.bulk_load_csv
+CSV_COLUMNS = {
+    "students": ["name", "age", "student_id"],
+    "professors": ["name", "age", "employee_id"],
+    "courses": ["name", "code"],
+    "assignments": ["professor_id", "course_code"],
+    "enrollments": ["student_id", "course_code"],
+    "grades": ["student_id", "course_code", "grade"],
+}
+
+
+# Keyset pagination: pages are ordered by rowid (persons.id, enrollments.student_id for a course)
+# and the cursor token handed back to the caller is the last key of the previous page.
+DEFAULT_PAGE_SIZE = 100
+FIRST_KEY = -2 ** 63
+Page = namedtuple("Page", ["headers", "rows", "next_cursor"])
+
+
+# Schema migrations, applied in order by University._migrate and tracked with PRAGMA user_version.
+# Each entry is (version, description, statements); never edit a released entry, append a new one.
+SCHEMA_MIGRATIONS = [
+    (1, "secondary indexes for role filters, case-insensitive lookups and reverse joins", [
+        # get_people filters on role (kept on role alone so rows still come back in insertion order)
+        "CREATE INDEX IF NOT EXISTS idx_persons_role ON persons (role)",
+        # assign_professor_to_course: lower(name) = lower(?) / lower(code) = lower(?)
+        # (expression indexes on lower() play the role of COLLATE NOCASE indexes for these queries)
+        "CREATE INDEX IF NOT EXISTS idx_persons_lower_name ON persons (lower(name), role)",
+        "CREATE INDEX IF NOT EXISTS idx_courses_lower_code ON courses (lower(code))",
+        # the primary keys only cover (course_id, ...) for enrollments and (student_id, ...) for grades
+        "CREATE INDEX IF NOT EXISTS idx_enrollments_student ON enrollments (student_id, course_id)",
+        "CREATE INDEX IF NOT EXISTS idx_grades_course ON grades (course_id, student_id)",
+        "CREATE INDEX IF NOT EXISTS idx_courses_professor ON courses (professor_id)",
+    ]),
+    (2, "trigger-maintained summary tables for the dashboard (see db_analytics.py)",
+     db_analytics.ANALYTICS_SCHEMA),
+    (3, "FTS5 trigram indexes for the people and course search (see db_search.py)",
+     db_search.SEARCH_SCHEMA + db_search.SEARCH_REBUILD),
+]
+
+# Queries on the hot paths, shared by the methods below and by University.check_query_plans
+FIND_STUDENT_SQL = "SELECT id FROM persons WHERE university_id = ? AND role = 'student'"
+FIND_COURSE_SQL = "SELECT id FROM courses WHERE code = ?"
+FIND_PROFESSOR_BY_ID_SQL = "SELECT id, name, university_id FROM persons WHERE university_id = ? AND role = 'professor'"
+FIND_PROFESSOR_BY_NAME_SQL = ("SELECT id, name, university_id FROM persons "
+                              "WHERE lower(name) = lower(?) AND role = 'professor' ORDER BY id")
+FIND_COURSE_NOCASE_SQL = "SELECT id, code FROM courses WHERE lower(code) = lower(?) ORDER BY id"
+FIND_ENROLLMENT_SQL = "SELECT * FROM enrollments WHERE student_id = ? AND course_id = ?"
+# an upsert rather than INSERT OR REPLACE, so the analytics triggers see an UPDATE of the old grade
+UPSERT_GRADE_SQL = ("INSERT INTO grades (student_id, course_id, grade) VALUES (?, ?, ?) "
+                    "ON CONFLICT (student_id, course_id) DO UPDATE SET grade = excluded.grade")
+GET_PEOPLE_SQL = "SELECT name, age, university_id FROM persons WHERE role = ?"
+COURSE_SUMMARY_SQL = """
+        SELECT p.name, p.university_id FROM persons p
+        JOIN enrollments e ON p.id = e.student_id
+        JOIN courses c ON e.course_id = c.id
+        WHERE c.code = ?
+        """
+STUDENT_GRADES_SQL = """
+        SELECT c.name, c.code, g.grade FROM grades g
+        JOIN persons p ON g.student_id = p.id
+        JOIN courses c ON g.course_id = c.id
+        WHERE p.university_id = ?
+        """
+PEOPLE_PAGE_SQL = "SELECT id, name, age, university_id FROM persons WHERE role = ? AND id > ? ORDER BY id LIMIT ?"
+COURSE_SUMMARY_PAGE_SQL = """
+        SELECT e.student_id, p.name, p.university_id FROM enrollments e
+        JOIN persons p ON p.id = e.student_id
+        WHERE e.course_id = (SELECT id FROM courses WHERE code = ?) AND e.student_id > ?
+        ORDER BY e.student_id LIMIT ?
+        """
+# name -> (sql, sample parameters) checked by University.check_query_plans
+HOT_QUERIES = {
+    "find_student": (FIND_STUDENT_SQL, ("S00000",)),
+    "find_course": (FIND_COURSE_SQL, ("CS000",)),
+    "find_professor_by_id": (FIND_PROFESSOR_BY_ID_SQL, ("P00000",)),
+    "find_professor_by_name": (FIND_PROFESSOR_BY_NAME_SQL, ("dr. nobody",)),
+    "find_course_nocase": (FIND_COURSE_NOCASE_SQL, ("cs000",)),
+    "find_enrollment": (FIND_ENROLLMENT_SQL, (0, 0)),
+    "get_people": (GET_PEOPLE_SQL, ("student",)),
+    "get_course_summary": (COURSE_SUMMARY_SQL, ("CS000",)),
+    "get_student_grades": (STUDENT_GRADES_SQL, ("S00000",)),
+    "existing_enrollments": ("SELECT student_id, course_id FROM enrollments WHERE student_id IN (?)", (0,)),
+    "get_people_page": (PEOPLE_PAGE_SQL, ("student", 0, DEFAULT_PAGE_SIZE)),
+    "get_course_summary_page": (COURSE_SUMMARY_PAGE_SQL, ("CS000", 0, DEFAULT_PAGE_SIZE)),
+    "get_totals": (db_analytics.TOTALS_SQL, ()),
+    "get_course_stats": (db_analytics.COURSE_STATS_SQL, ("CS000",)),
+    "get_course_grades": (db_analytics.COURSE_GRADES_SQL, (0,)),
+    "get_student_gpa": (db_analytics.STUDENT_GPA_SQL, ("S00000",)),
+    # short search prefixes (the FTS5 MATCH queries are virtual table scans by design)
+    "search_people_name": (db_search.PEOPLE_NAME_PREFIX_SQL.format(role="AND +role = ?"), ("a", "b", "student", 1)),
+    "search_people_id": (db_search.PEOPLE_ID_PREFIX_SQL.format(role="AND +role = ?"), ("S", "T", "student", 1)),
+    "search_courses_code": (db_search.COURSES_CODE_PREFIX_SQL, ("a", "b", 1)),
+    "search_courses_name": (db_search.COURSES_NAME_PREFIX_SQL, ("a", "b", 1)),
+}
+
+
+def _decode_cursor(cursor):
+    """Turns a page cursor token back into the last key read (None means the first page)."""
+    if cursor is None:
+        return FIRST_KEY
+    try:
+        return int(cursor)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid page cursor {cursor!r}") from None
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _chunks(items, size):
+    """Yields successive slices of at most `size` items from a list."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _padded(chunk):
+    """
+    Pads a lookup chunk to the next power of two by repeating its last key, so every
+    "IN (...)" query comes in a handful of shapes that stay in the statement cache.
+    """
+    return chunk + chunk[-1:] * ((1 << (len(chunk) - 1).bit_length()) - len(chunk))
 
 class University:
     """
     A controller class to manage all database interactions for the university system.
     """
-    def __init__(self, db_path):
-        """Initializes the University and connects to the database."""
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.cursor = self.conn.cursor()
+    def __init__(self, db_path, cache_size=DEFAULT_MAX_ENTRIES, id_cache_size=DEFAULT_MAX_IDS):
+        """
+        Initializes the University and connects to the database.
+        cache_size is the number of query results kept by the read cache (0 disables it);
+        id_cache_size the number of identifier lookups kept by the id cache (0 disables it).
+        """
+        # every thread gets its own connection and cursor from the pool (see db_pool.py)
+        self._pool = ConnectionPool(db_path)
+        self._write_lock = threading.RLock()
+        self._cache = QueryCache(max_entries=cache_size)
+        self._ids = IdCache(max_entries=id_cache_size)
+        self._metrics = None
+        self._write_listeners = []
+        self._graph = None
         self._setup_database()
 
+    @property
+    def conn(self):
+        """The calling thread's database connection."""
+        return self._pool.conn
+
+    @property
+    def cursor(self):
+        """The calling thread's cursor (wrapped to record query metrics when they are enabled)."""
+        if self._metrics is None:
+            return self._pool.cursor
+        return InstrumentedCursor(self._pool.cursor, self._metrics)
+
+    # --- Query metrics (see db_metrics.py) ---
+
+    def enable_metrics(self, slow_query_threshold=None):
+        """
+        Starts timing every query issued through self.cursor. Queries slower than
+        slow_query_threshold seconds are logged on the "university.slow_queries" logger.
+        """
+        if self._metrics is None:
+            self._metrics = QueryMetrics(slow_query_threshold)
+        else:
+            self._metrics.slow_query_threshold = slow_query_threshold
+
+    def disable_metrics(self):
+        """Stops recording; the collected metrics are dropped."""
+        self._metrics = None
+
+    def metrics_snapshot(self):
+        """
+        Returns {"methods": {method: {calls, rows, total_ms, mean_ms, p50_ms, p95_ms, p99_ms}},
+        "slow_queries": [...], "caches": {"queries": cache_stats(), "ids": id_cache_stats()}},
+        or None when metrics are disabled.
+        """
+        if self._metrics is None:
+            return None
+        snapshot = self._metrics.snapshot()
+        snapshot["caches"] = {"queries": self.cache_stats(), "ids": self.id_cache_stats()}
+        return snapshot
+
+    # --- Write listeners ---
+    # Every committed write invalidates the read cache tags it touched, e.g.
+    # ("people", "student") or ("course_summary", "CS101"), and then calls the listeners
+    # with those tags, so caches kept outside this class (the Streamlit data layer,
+    # see streamlit_data.py) can drop the same entries.
+
+    def add_write_listener(self, listener):
+        """
+        Registers listener(tags), called after each committed write with the tuple of
+        tags it touched, or with None when any table may have changed (bulk table loads).
+        An exception raised by a listener is logged on the "university.write_listeners" logger.
+        """
+        self._write_listeners.append(listener)
+
+    def remove_write_listener(self, listener):
+        if listener in self._write_listeners:
+            self._write_listeners.remove(listener)
+
+    def _after_write(self, *tags):
+        if not tags:
+            return
+        self._cache.invalidate(*tags)
+        id_kinds = {kind for tag in tags for kind in ID_KINDS_BY_TAG.get(tag[0], ())}
+        if id_kinds:
+            self._ids.invalidate(*id_kinds)
+        self._notify(tags)
+
+    def _after_write_all(self):
+        self._cache.clear()
+        self._ids.clear()
+        self._notify(None)
+
+    def _notify(self, tags):
+        # the write is already committed: a failing listener is logged, it must not make the
+        # write raise (or be retried), nor keep the other listeners from being called
+        for listener in list(self._write_listeners):
+            try:
+                listener(tags)
+            except Exception:
+                listener_logger.exception("Write listener %r failed for tags %r", listener, tags)
+
     def _setup_database(self):
         """Creates the necessary database tables if they don't exist."""
         self.cursor.execute('''
@@ -54,56 +289,128 @@ class University:
             FOREIGN KEY (course_id) REFERENCES courses (id)
         )''')
         self.conn.commit()
+        self._migrate()
+
+    def _migrate(self):
+        """Applies the pending SCHEMA_MIGRATIONS, each one in its own transaction."""
+        self.cursor.execute("PRAGMA user_version")
+        current = self.cursor.fetchone()[0]
+        for version, _, statements in SCHEMA_MIGRATIONS:
+            if version <= current:
+                continue
+            self.cursor.execute("BEGIN")
+            try:
+                for statement in statements:
+                    self.cursor.execute(statement)
+                self.cursor.execute(f"PRAGMA user_version = {version}")
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                raise
+        # refresh the planner statistics for the new indexes (cheap, only analyzes what needs it)
+        self.cursor.execute("PRAGMA optimize")
+
+    def schema_version(self):
+        """Returns the version of the last applied schema migration."""
+        self.cursor.execute("PRAGMA user_version")
+        return self.cursor.fetchone()[0]
+
+    def explain(self, query, params=()):
+        """
+        Returns the query plan of `query` as a dict:
+        {"plan": [detail lines], "full_scans": [tables read with a full table scan]}.
+        """
+        self.cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        plan = [row[3] for row in self.cursor.fetchall()]
+        # "SCAN t" reads every row of t; "SCAN t USING ... INDEX" or "SEARCH ..." do not count here
+        full_scans = [detail.split()[1] for detail in plan
+                      if detail.startswith("SCAN ") and "USING" not in detail and "CONSTANT ROW" not in detail]
+        return {"plan": plan, "full_scans": full_scans}
 
+    def check_query_plans(self):
+        """Explains every HOT_QUERIES entry and returns {name: plan} for those still doing a full table scan."""
+        flagged = {}
+        for name, (query, params) in HOT_QUERIES.items():
+            result = self.explain(query, params)
+            if result["full_scans"]:
+                flagged[name] = result
+        return flagged
+
+    # --- Identifier lookups ---
+    # The write methods resolve university_id / course code to row ids through the id
+    # cache (see db_cache.IdCache), so repeated writes for the same student or course
+    # skip those SELECTs. Each write checks once for commits from other connections
+    # (_check_ids) before its lookups: one PRAGMA instead of two or three SELECTs.
+
+    def _check_ids(self):
+        if self._ids.enabled:
+            self._ids.check_external_writes(self.conn)
+
+    def _find(self, kind, key, *queries):
+        """
+        Runs each query (with key as its only parameter) until one returns a row and
+        caches that row under (kind, key). Returns None when no query finds anything.
+        """
+        ids = self._ids
+        if ids.enabled:
+            row = ids.get(kind, key)
+            if row is not None:
+                return row
+        generation = ids.generation()
+        for query in queries:
+            self.cursor.execute(query, (key,))
+            row = self.cursor.fetchone()
+            if row is not None:
+                ids.put(kind, key, row, generation)
+                return row
+        return None
+
+    @retry_on_busy
     def add_student(self, name, age, student_id):
         """Adds a new student to the database."""
         try:
             self.cursor.execute("INSERT INTO persons (name, age, role, university_id) VALUES (?, ?, 'student', ?)",
                                 (name, age, student_id))
             self.conn.commit()
+            self._after_write(("people", "student"))
             return f"Student '{name}' added successfully."
         except sqlite3.IntegrityError:
             return f"Error: Student with ID '{student_id}' already exists."
 
+    @retry_on_busy
     def add_professor(self, name, age, employee_id):
         """Adds a new professor to the database."""
         try:
             self.cursor.execute("INSERT INTO persons (name, age, role, university_id) VALUES (?, ?, 'professor', ?)",
                                 (name, age, employee_id))
             self.conn.commit()
+            self._after_write(("people", "professor"))
             return f"Professor '{name}' added successfully."
         except sqlite3.IntegrityError:
             return f"Error: Professor with ID '{employee_id}' already exists."
 
+    @retry_on_busy
     def add_course(self, name, code):
         """Adds a new course to the database."""
         try:
             self.cursor.execute("INSERT INTO courses (name, code) VALUES (?, ?)", (name, code))
             self.conn.commit()
+            self._after_write(("courses",))
             return f"Course '{name}' added successfully."
         except sqlite3.IntegrityError:
             return f"Error: Course with code '{code}' already exists."
 
+    @retry_on_busy
     def assign_professor_to_course(self, professor_identifier, course_code):
         """Assigns a professor to a course.
         professor_identifier can be the university_id (e.g. 'P54321') or the professor name.
         """
+        self._check_ids()
         # Try to find professor by university_id first, then by name (case-insensitive)
-        self.cursor.execute(
-            "SELECT id, name, university_id FROM persons WHERE university_id = ? AND role = 'professor'",
-            (professor_identifier,)
-        )
-        prof = self.cursor.fetchone()
-        if not prof:
-            self.cursor.execute(
-                "SELECT id, name, university_id FROM persons WHERE lower(name) = lower(?) AND role = 'professor'",
-                (professor_identifier,)
-            )
-            prof = self.cursor.fetchone()
+        prof = self._find("professor", professor_identifier, FIND_PROFESSOR_BY_ID_SQL, FIND_PROFESSOR_BY_NAME_SQL)
 
         # Find course by code (case-insensitive)
-        self.cursor.execute("SELECT id, code FROM courses WHERE lower(code) = lower(?)", (course_code,))
-        course = self.cursor.fetchone()
+        course = self._find("course_nocase", course_code, FIND_COURSE_NOCASE_SQL)
 
         if not prof:
             return f"Error: Professor '{professor_identifier}' not found."
@@ -113,45 +420,291 @@ class University:
         try:
             self.cursor.execute("UPDATE courses SET professor_id = ? WHERE id = ?", (prof[0], course[0]))
             self.conn.commit()
+            self._after_write(("courses",))
             return f"Professor '{prof[1]}' (ID: {prof[2]}) assigned to course '{course[1]}'."
         except Exception as e:
             return f"Error: Failed to assign professor: {e}"
 
+    @retry_on_busy
     def enroll_student_in_course(self, student_id, course_code):
         """Enrolls a student in a course."""
-        self.cursor.execute("SELECT id FROM persons WHERE university_id = ? AND role = 'student'", (student_id,))
-        student = self.cursor.fetchone()
-        self.cursor.execute("SELECT id FROM courses WHERE code = ?", (course_code,))
-        course = self.cursor.fetchone()
+        self._check_ids()
+        student = self._find("student", student_id, FIND_STUDENT_SQL)
+        course = self._find("course", course_code, FIND_COURSE_SQL)
         if student and course:
             try:
                 self.cursor.execute("INSERT INTO enrollments (student_id, course_id) VALUES (?, ?)", (student[0], course[0]))
                 self.conn.commit()
+                self._after_write(("course_summary", course_code), ("student_courses", student_id))
                 return f"Student '{student_id}' enrolled in course '{course_code}'."
             except sqlite3.IntegrityError:
                 return f"Error: Student '{student_id}' is already enrolled in '{course_code}'."
         return "Error: Could not find student or course."
 
+    @retry_on_busy
     def assign_grade(self, student_id, course_code, grade):
         """Assigns a grade to a student for a specific course."""
-        self.cursor.execute("SELECT id FROM persons WHERE university_id = ? AND role = 'student'", (student_id,))
-        student = self.cursor.fetchone()
-        self.cursor.execute("SELECT id FROM courses WHERE code = ?", (course_code,))
-        course = self.cursor.fetchone()
+        self._check_ids()
+        student = self._find("student", student_id, FIND_STUDENT_SQL)
+        course = self._find("course", course_code, FIND_COURSE_SQL)
         if student and course:
-            self.cursor.execute("SELECT * FROM enrollments WHERE student_id = ? AND course_id = ?", (student[0], course[0]))
+            self.cursor.execute(FIND_ENROLLMENT_SQL, (student[0], course[0]))
             if self.cursor.fetchone():
-                self.cursor.execute("INSERT OR REPLACE INTO grades (student_id, course_id, grade) VALUES (?, ?, ?)", (student[0], course[0], grade))
+                self.cursor.execute(UPSERT_GRADE_SQL, (student[0], course[0], grade))
                 self.conn.commit()
+                self._after_write(("student_grades", student_id))
                 return f"Grade '{grade}' assigned to student '{student_id}' for course '{course_code}'."
             return f"Error: Student '{student_id}' is not enrolled in course '{course_code}'."
         return "Error: Could not find student or course."
 
+    # --- Bulk ingestion ---
+    # Each bulk method takes an iterable of rows, resolves identifiers with a few
+    # set-based SELECTs, inserts everything with executemany in one transaction and
+    # returns one message per input row (same wording as the single-row methods),
+    # so conflicting rows are reported without aborting the rest of the batch.
+
+    def _lookup_rows(self, query, keys):
+        """
+        Runs `query` over all keys in chunks and returns {key: rest_of_row}, keeping
+        the first row per key like fetchone() would. The query must return the key
+        as its first column and contain either a '{placeholders}' slot (for an
+        "IN (...)" list) or a '{values}' slot (for a "VALUES (?), (?)" list).
+        """
+        found = {}
+        for chunk in _chunks(list(set(keys)), LOOKUP_CHUNK_SIZE):
+            chunk = _padded(chunk)
+            self.cursor.execute(query.format(placeholders=",".join("?" * len(chunk)),
+                                             values=",".join(["(?)"] * len(chunk))), chunk)
+            for row in self.cursor.fetchall():
+                found.setdefault(row[0], row[1:])
+        return found
+
+    def _lookup(self, query, keys):
+        """Same as _lookup_rows for queries returning (key, id) rows; returns {key: id}."""
+        return {key: row[0] for key, row in self._lookup_rows(query, keys).items()}
+
+    def _lookup_ids(self, kind, query, keys):
+        """_lookup through the id cache: only the keys it does not hold are queried."""
+        ids = self._ids
+        if not ids.enabled:
+            return self._lookup(query, keys)
+        self._check_ids()
+        found, missing = {}, []
+        for key in set(keys):
+            row = ids.get(kind, key)
+            if row is None:
+                missing.append(key)
+            else:
+                found[key] = row[0]
+        generation = ids.generation()
+        fetched = self._lookup(query, missing)
+        for key, row_id in fetched.items():
+            ids.put(kind, key, (row_id,), generation)
+        found.update(fetched)
+        return found
+
+    def _resolve_students(self, student_ids):
+        return self._lookup_ids(
+            "student",
+            "SELECT university_id, id FROM persons WHERE role = 'student' AND university_id IN ({placeholders})",
+            student_ids)
+
+    def _resolve_courses(self, course_codes):
+        return self._lookup_ids("course", "SELECT code, id FROM courses WHERE code IN ({placeholders})", course_codes)
+
+    @retry_on_busy
+    def _add_people_bulk(self, people, role):
+        """Shared implementation of add_students_bulk / add_professors_bulk."""
+        label = "Student" if role == "student" else "Professor"
+        taken = set(self._lookup("SELECT university_id, id FROM persons WHERE university_id IN ({placeholders})",
+                                 [row[2] for row in people]))
+        messages, to_insert = [], []
+        for name, age, university_id in people:
+            if university_id in taken:
+                messages.append(f"Error: {label} with ID '{university_id}' already exists.")
+                continue
+            taken.add(university_id)
+            to_insert.append((name, age, role, university_id))
+            messages.append(f"{label} '{name}' added successfully.")
+        with self.conn:
+            self.cursor.executemany(
+                "INSERT INTO persons (name, age, role, university_id) VALUES (?, ?, ?, ?)", to_insert)
+        if to_insert:
+            self._after_write(("people", role))
+        return messages
+
+    # The bulk writes take any iterable: the public method turns it into a list once,
+    # before retry_on_busy, so a retried attempt sees the same rows as the first one.
+
+    def add_students_bulk(self, students):
+        """Adds many (name, age, student_id) rows in one transaction."""
+        return self._add_people_bulk(list(students), "student")
+
+    def add_professors_bulk(self, professors):
+        """Adds many (name, age, employee_id) rows in one transaction."""
+        return self._add_people_bulk(list(professors), "professor")
+
+    def add_courses_bulk(self, courses):
+        """Adds many (name, code) rows in one transaction."""
+        return self._add_courses_bulk(list(courses))
+
+    @retry_on_busy
+    def _add_courses_bulk(self, courses):
+        taken = set(self._resolve_courses([code for _, code in courses]))
+        messages, to_insert = [], []
+        for name, code in courses:
+            if code in taken:
+                messages.append(f"Error: Course with code '{code}' already exists.")
+                continue
+            taken.add(code)
+            to_insert.append((name, code))
+            messages.append(f"Course '{name}' added successfully.")
+        with self.conn:
+            self.cursor.executemany("INSERT INTO courses (name, code) VALUES (?, ?)", to_insert)
+        if to_insert:
+            self._after_write(("courses",))
+        return messages
+
+    def assign_professors_bulk(self, assignments):
+        """
+        Assigns many (professor_identifier, course_code) pairs in one transaction.
+        Identifiers are resolved like assign_professor_to_course: university_id first,
+        then case-insensitive name; course codes are matched case-insensitively.
+        """
+        return self._assign_professors_bulk(list(assignments))
+
+    @retry_on_busy
+    def _assign_professors_bulk(self, assignments):
+        identifiers = [identifier for identifier, _ in assignments]
+        by_id = self._lookup_rows(
+            "SELECT university_id, id, name, university_id FROM persons "
+            "WHERE role = 'professor' AND university_id IN ({placeholders}) ORDER BY id",
+            identifiers)
+        # the VALUES list hands back the identifier as typed, so SQLite's lower() does the matching
+        by_name = self._lookup_rows(
+            "WITH wanted(identifier) AS (VALUES {values}) "
+            "SELECT w.identifier, p.id, p.name, p.university_id FROM wanted w "
+            "JOIN persons p ON lower(p.name) = lower(w.identifier) AND p.role = 'professor' ORDER BY p.id",
+            [identifier for identifier in identifiers if identifier not in by_id])
+        courses = self._lookup_rows(
+            "WITH wanted(code) AS (VALUES {values}) "
+            "SELECT w.code, c.id, c.code FROM wanted w JOIN courses c ON lower(c.code) = lower(w.code) ORDER BY c.id",
+            [code for _, code in assignments])
+
+        messages, updates = [], []
+        for identifier, course_code in assignments:
+            prof = by_id.get(identifier) or by_name.get(identifier)
+            course = courses.get(course_code)
+            if not prof:
+                messages.append(f"Error: Professor '{identifier}' not found.")
+            elif not course:
+                messages.append(f"Error: Course with code '{course_code}' not found.")
+            else:
+                updates.append((prof[0], course[0]))
+                messages.append(f"Professor '{prof[1]}' (ID: {prof[2]}) assigned to course '{course[1]}'.")
+        with self.conn:
+            self.cursor.executemany("UPDATE courses SET professor_id = ? WHERE id = ?", updates)
+        if updates:
+            self._after_write(("courses",))
+        return messages
+
+    def _existing_enrollments(self, student_row_ids):
+        """Returns the set of (student_id, course_id) enrollment pairs for the given persons.id values."""
+        pairs = set()
+        for chunk in _chunks(list(set(student_row_ids)), LOOKUP_CHUNK_SIZE):
+            chunk = _padded(chunk)
+            self.cursor.execute(
+                f"SELECT student_id, course_id FROM enrollments WHERE student_id IN ({','.join('?' * len(chunk))})",
+                chunk)
+            pairs.update(self.cursor.fetchall())
+        return pairs
+
+    def enroll_students_bulk(self, enrollments):
+        """Enrolls many (student_id, course_code) pairs in one transaction."""
+        return self._enroll_students_bulk(list(enrollments))
+
+    @retry_on_busy
+    def _enroll_students_bulk(self, enrollments):
+        students = self._resolve_students([student_id for student_id, _ in enrollments])
+        courses = self._resolve_courses([code for _, code in enrollments])
+        enrolled = self._existing_enrollments(students.values())
+        messages, to_insert, touched = [], [], set()
+        for student_id, course_code in enrollments:
+            student, course = students.get(student_id), courses.get(course_code)
+            if not (student and course):
+                messages.append("Error: Could not find student or course.")
+            elif (student, course) in enrolled:
+                messages.append(f"Error: Student '{student_id}' is already enrolled in '{course_code}'.")
+            else:
+                enrolled.add((student, course))
+                to_insert.append((student, course))
+                touched.update([("course_summary", course_code), ("student_courses", student_id)])
+                messages.append(f"Student '{student_id}' enrolled in course '{course_code}'.")
+        with self.conn:
+            self.cursor.executemany("INSERT INTO enrollments (student_id, course_id) VALUES (?, ?)", to_insert)
+        self._after_write(*touched)
+        return messages
+
+    def assign_grades_bulk(self, grades):
+        """Assigns many (student_id, course_code, grade) rows in one transaction."""
+        return self._assign_grades_bulk(list(grades))
+
+    @retry_on_busy
+    def _assign_grades_bulk(self, grades):
+        students = self._resolve_students([student_id for student_id, _, _ in grades])
+        courses = self._resolve_courses([code for _, code, _ in grades])
+        enrolled = self._existing_enrollments(students.values())
+        messages, to_write, touched = [], [], set()
+        for student_id, course_code, grade in grades:
+            student, course = students.get(student_id), courses.get(course_code)
+            if not (student and course):
+                messages.append("Error: Could not find student or course.")
+            elif (student, course) not in enrolled:
+                messages.append(f"Error: Student '{student_id}' is not enrolled in course '{course_code}'.")
+            else:
+                to_write.append((student, course, grade))
+                touched.add(("student_grades", student_id))
+                messages.append(f"Grade '{grade}' assigned to student '{student_id}' for course '{course_code}'.")
+        with self.conn:
+            self.cursor.executemany(UPSERT_GRADE_SQL, to_write)
+        self._after_write(*touched)
+        return messages
+
+    def bulk_load_csv(self, kind, csv_path):
+        """
+        Loads a CSV export into the database with the matching bulk method.
+        `kind` is one of CSV_COLUMNS' keys; the file must have a header row with those columns.
+        """
+        loaders = {
+            "students": self.add_students_bulk,
+            "professors": self.add_professors_bulk,
+            "courses": self.add_courses_bulk,
+            "assignments": self.assign_professors_bulk,
+            "enrollments": self.enroll_students_bulk,
+            "grades": self.assign_grades_bulk,
+        }
+        if kind not in loaders:
+            raise ValueError(f"Unknown CSV kind '{kind}', expected one of {sorted(loaders)}")
+        columns = CSV_COLUMNS[kind]
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            missing = set(columns) - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"CSV file '{csv_path}' is missing columns: {sorted(missing)}")
+            rows = [tuple(int(row[c]) if c == "age" else row[c] for c in columns) for row in reader]
+        return loaders[kind](rows)
+
+    # --- Reads ---
+    # The four query methods below go through the read cache (see db_cache.py); the
+    # tags say which write methods invalidate them.
+
+    @cached_query(lambda role: [("people", role)])
     def get_people(self, role):
         """Fetches all people of a specific role (student or professor)."""
-        self.cursor.execute("SELECT name, age, university_id FROM persons WHERE role = ?", (role,))
+        self.cursor.execute(GET_PEOPLE_SQL, (role,))
         return self.cursor.fetchall()
 
+    @cached_query(lambda: [("courses",)])
     def get_courses(self):
         """Fetches all courses."""
         query = """
@@ -161,26 +714,16 @@ class University:
         self.cursor.execute(query)
         return self.cursor.fetchall()
 
+    @cached_query(lambda course_code: [("course_summary", course_code)])
     def get_course_summary(self, course_code):
         """Fetches summary for a specific course."""
-        query = """
-        SELECT p.name, p.university_id FROM persons p
-        JOIN enrollments e ON p.id = e.student_id
-        JOIN courses c ON e.course_id = c.id
-        WHERE c.code = ?
-        """
-        self.cursor.execute(query, (course_code,))
+        self.cursor.execute(COURSE_SUMMARY_SQL, (course_code,))
         return self.cursor.fetchall()
 
+    @cached_query(lambda student_id: [("student_grades", student_id)])
     def get_student_grades(self, student_id):
         """Fetches all grades for a specific student."""
-        query = """
-        SELECT c.name, c.code, g.grade FROM grades g
-        JOIN persons p ON g.student_id = p.id
-        JOIN courses c ON g.course_id = c.id
-        WHERE p.university_id = ?
-        """
-        self.cursor.execute(query, (student_id,))
+        self.cursor.execute(STUDENT_GRADES_SQL, (student_id,))
         return self.cursor.fetchall()
         
     def get_all_table_names(self):
@@ -189,120 +732,448 @@ class University:
         tables = self.cursor.fetchall()
         return [table[0] for table in tables]
 
+    def _table_columns(self, table_name):
+        """Returns the column names of `table_name`, raising ValueError if there is no such table."""
+        if table_name not in self.get_all_table_names():
+            raise ValueError(f"Unknown table '{table_name}'")
+        self.cursor.execute(f"PRAGMA table_info({_quote(table_name)})")
+        return [row[1] for row in self.cursor.fetchall()]
+
     def get_table_contents(self, table_name):
         """Fetches all contents for a specific table."""
-        self.cursor.execute(f"SELECT * FROM {table_name}")
+        self._table_columns(table_name)
+        self.cursor.execute(f"SELECT * FROM {_quote(table_name)}")
         contents = self.cursor.fetchall()
         # Get column headers
         headers = [description[0] for description in self.cursor.description]
         return headers, contents
 
+    # --- Paginated and streaming reads ---
+    # The *_page methods return one Page(headers, rows, next_cursor); pass next_cursor
+    # back to get the following page (it is None on the last page). Pages are found
+    # with an index seek on the last key seen, so page N costs the same as page 1.
+    # The iter_* generators walk the pages and yield rows one by one, without keeping
+    # a read transaction open between pages.
+
+    def _keyset_page(self, query, params, headers, page_size, cursor):
+        """Runs a query ending in "key > ? ... LIMIT ?" whose first column is the key."""
+        if page_size < 1:
+            raise ValueError(f"page_size must be at least 1, got {page_size}")
+        self.cursor.execute(query, (*params, _decode_cursor(cursor), page_size + 1))
+        rows = self.cursor.fetchall()
+        next_cursor = str(rows[page_size - 1][0]) if len(rows) > page_size else None
+        return Page(headers, [row[1:] for row in rows[:page_size]], next_cursor)
+
+    @staticmethod
+    def _iter_pages(get_page, batch_size):
+        cursor = None
+        while True:
+            page = get_page(batch_size, cursor)
+            yield from page.rows
+            cursor = page.next_cursor
+            if cursor is None:
+                return
+
+    def get_table_page(self, table_name, page_size=DEFAULT_PAGE_SIZE, cursor=None, columns=None, filters=None):
+        """
+        Fetches one page of a table in rowid order.
+        columns restricts the columns returned; filters is a {column: value} dict of
+        equality conditions (None matches NULL). Table and column names are checked
+        against the schema.
+        """
+        table_columns = self._table_columns(table_name)
+        columns = list(columns or table_columns)
+        filters = filters or {}
+        unknown = (set(columns) | set(filters)) - set(table_columns)
+        if unknown:
+            raise ValueError(f"Unknown columns for table '{table_name}': {sorted(unknown)}")
+        conditions, params = [], []
+        for column, value in filters.items():
+            if value is None:
+                conditions.append(f"{_quote(column)} IS NULL")
+            else:
+                conditions.append(f"{_quote(column)} = ?")
+                params.append(value)
+        conditions.append("rowid > ?")
+        query = (f"SELECT rowid, {', '.join(_quote(c) for c in columns)} FROM {_quote(table_name)} "
+                 f"WHERE {' AND '.join(conditions)} ORDER BY rowid LIMIT ?")
+        return self._keyset_page(query, params, columns, page_size, cursor)
+
+    def iter_table_contents(self, table_name, columns=None, filters=None, batch_size=DEFAULT_PAGE_SIZE):
+        """Yields the rows of a table (same options as get_table_page), batch_size rows per query."""
+        return self._iter_pages(
+            lambda size, cursor: self.get_table_page(table_name, size, cursor, columns, filters), batch_size)
+
+    def get_people_page(self, role, page_size=DEFAULT_PAGE_SIZE, cursor=None):
+        """Fetches one page of (name, age, university_id) rows for a role, in insertion order."""
+        return self._keyset_page(PEOPLE_PAGE_SQL, (role,), ["name", "age", "university_id"], page_size, cursor)
+
+    def iter_people(self, role, batch_size=DEFAULT_PAGE_SIZE):
+        """Yields the same rows as get_people without loading them all at once."""
+        return self._iter_pages(lambda size, cursor: self.get_people_page(role, size, cursor), batch_size)
+
+    def get_course_summary_page(self, course_code, page_size=DEFAULT_PAGE_SIZE, cursor=None):
+        """Fetches one page of (name, university_id) rows for the students enrolled in a course."""
+        return self._keyset_page(COURSE_SUMMARY_PAGE_SQL, (course_code,), ["name", "university_id"],
+                                 page_size, cursor)
+
+    def iter_course_summary(self, course_code, batch_size=DEFAULT_PAGE_SIZE):
+        """Yields the same rows as get_course_summary without loading them all at once."""
+        return self._iter_pages(
+            lambda size, cursor: self.get_course_summary_page(course_code, size, cursor), batch_size)
+
+    # --- Raw table access (used by db_columnar.py for exports and imports) ---
+
+    @contextmanager
+    def snapshot(self):
+        """
+        Runs the enclosed reads of the calling thread in one read transaction, so that
+        several tables are read as of the same moment (writers are not blocked in WAL mode).
+        """
+        self.conn.execute("BEGIN")
+        try:
+            yield
+        finally:
+            self.conn.rollback()
+
+    def iter_table_batches(self, table_name, columns=None, batch_size=DEFAULT_PAGE_SIZE):
+        """
+        Yields the rows of a table in rowid order as lists of at most batch_size tuples,
+        from a single SELECT read with fetchmany (wrap in snapshot() for a consistent read
+        of several tables).
+        """
+        table_columns = self._table_columns(table_name)
+        columns = list(columns or table_columns)
+        unknown = set(columns) - set(table_columns)
+        if unknown:
+            raise ValueError(f"Unknown columns for table '{table_name}': {sorted(unknown)}")
+        # a cursor of its own, so other calls on this thread do not reset the running SELECT
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {', '.join(_quote(c) for c in columns)} FROM {_quote(table_name)} ORDER BY rowid")
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            cursor.close()
+
+    def load_table_rows(self, table_name, columns, batches, replace=False):
+        """
+        Inserts batches of rows (lists of tuples in `columns` order) into a table in one
+        transaction, keeping the given ids; with replace=True the table is emptied first.
+        batches is a list of batches, or a function returning an iterable of them (called
+        again when a busy database makes the load start over). Returns the number of rows inserted.
+        """
+        return self.load_tables([(table_name, columns, batches)], replace)[table_name]
+
+    def load_tables(self, loads, replace=False):
+        """
+        Same as load_table_rows for several tables, all in one transaction: loads is a list of
+        (table_name, columns, batches) with the parent tables first. With replace=True every
+        listed table is emptied first (children first). If a row fails, nothing is changed.
+        Returns {table_name: rows inserted}.
+        """
+        for table_name, _, batches in loads:
+            # a retry rolls back the rows already read: a one-shot iterator could not give them again
+            if not callable(batches) and iter(batches) is batches:
+                raise TypeError(f"batches for table '{table_name}' must be a list or a function returning "
+                                f"the batches, not a one-shot iterator")
+        return self._load_tables(loads, replace)
+
+    @retry_on_busy
+    def _load_tables(self, loads, replace):
+        queries = []
+        for table_name, columns, _ in loads:
+            table_columns = self._table_columns(table_name)
+            unknown = set(columns) - set(table_columns)
+            if unknown:
+                raise ValueError(f"Unknown columns for table '{table_name}': {sorted(unknown)}")
+            queries.append(f"INSERT INTO {_quote(table_name)} ({', '.join(_quote(c) for c in columns)}) "
+                           f"VALUES ({', '.join('?' * len(columns))})")
+        counts = {}
+        with self.conn:
+            if replace:
+                for table_name, _, _ in reversed(loads):
+                    self.cursor.execute(f"DELETE FROM {_quote(table_name)}")
+            for (table_name, _, batches), query in zip(loads, queries):
+                count = 0
+                for rows in batches() if callable(batches) else batches:
+                    self.cursor.executemany(query, rows)
+                    count += len(rows)
+                counts[table_name] = count
+        self._after_write_all()
+        return counts
+
+    # --- Analytics ---
+    # Summary tables maintained by triggers (see db_analytics.py): these reads are
+    # primary key lookups, whatever the size of enrollments and grades.
+
+    def get_totals(self):
+        """Returns the number of students, professors, courses and enrollments."""
+        self.cursor.execute(db_analytics.TOTALS_SQL)
+        totals = dict(self.cursor.fetchall())
+        return {
+            "students": totals.get("persons:student", 0),
+            "professors": totals.get("persons:professor", 0),
+            "courses": totals.get("courses", 0),
+            "enrollments": totals.get("enrollments", 0),
+        }
+
+    def get_course_stats(self, course_code):
+        """
+        Returns {"name", "enrollments", "grades": {grade: count}} for a course,
+        or None if there is no course with that code.
+        """
+        self.cursor.execute(db_analytics.COURSE_STATS_SQL, (course_code,))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        course_id, name, enrollments = row
+        self.cursor.execute(db_analytics.COURSE_GRADES_SQL, (course_id,))
+        return {"name": name, "enrollments": enrollments, "grades": dict(self.cursor.fetchall())}
+
+    def get_student_gpa(self, student_id):
+        """Returns the student's grade point average, or None if no grade maps to points."""
+        self.cursor.execute(db_analytics.STUDENT_GPA_SQL, (student_id,))
+        row = self.cursor.fetchone()
+        if not row or not row[1]:
+            return None
+        return row[0] / row[1]
+
+    def get_course_enrollment_counts(self):
+        """Returns (course name, code, enrollment count) for every course, most enrolled first."""
+        self.cursor.execute(db_analytics.COURSE_ENROLLMENT_COUNTS_SQL)
+        return self.cursor.fetchall()
+
+    def get_professor_load(self):
+        """Returns (name, university_id, courses taught, students taught) for every professor."""
+        self.cursor.execute(db_analytics.PROFESSOR_LOAD_SQL)
+        return self.cursor.fetchall()
+
+    @retry_on_busy
+    def refresh_analytics(self):
+        """Rebuilds every summary table from the base tables."""
+        with self.conn:
+            for statement in db_analytics.ANALYTICS_REBUILD:
+                self.cursor.execute(statement)
+        self._after_write(("analytics",))
+
+    @retry_on_busy
+    def set_grade_points(self, grade_points):
+        """Replaces the letter grade -> points mapping used for GPAs, e.g. {"A": 4.0, "B": 3.0}."""
+        with self.conn:
+            self.cursor.execute("DELETE FROM grade_points")
+            self.cursor.executemany("INSERT INTO grade_points (grade, points) VALUES (?, ?)",
+                                    list(grade_points.items()))
+            for statement in db_analytics.ANALYTICS_REBUILD:
+                self.cursor.execute(statement)
+        self._after_write(("analytics",))
+
+    # --- Search (see db_search.py) ---
+    # Typeahead lookups: prefix matches first, then substring matches, then close
+    # spellings, so "ali", "S001" or "algoritm" all find something in a few milliseconds.
+
+    def search_people(self, text, role=None, limit=db_search.DEFAULT_LIMIT):
+        """
+        Returns up to `limit` (name, age, university_id) rows whose name or university_id
+        matches `text`, best matches first; role restricts the search to students or professors.
+        """
+        params = (role,) if role else ()
+
+        def with_role(query, condition):
+            return query.format(role=condition if role else "")
+
+        queries = {
+            "first": with_role(db_search.PEOPLE_FIRST_SQL, "AND role = ?"),
+            "prefix": [(with_role(db_search.PEOPLE_NAME_PREFIX_SQL, "AND +role = ?"), str.lower),
+                       (with_role(db_search.PEOPLE_ID_PREFIX_SQL, "AND +role = ?"), str.upper)],
+            "match": with_role(db_search.PEOPLE_MATCH_SQL, "AND p.role = ?"),
+            "fuzzy": with_role(db_search.PEOPLE_FUZZY_SQL, "AND p.role = ?"),
+        }
+        return self._search(text, limit, queries, params, key=lambda row: row[2],
+                            values=lambda row: (row[0], row[2]))
+
+    def search_courses(self, text, limit=db_search.DEFAULT_LIMIT):
+        """Returns up to `limit` (name, code, professor) rows whose code or name matches `text`, best matches first."""
+        queries = {
+            "first": db_search.COURSES_FIRST_SQL,
+            "prefix": [(db_search.COURSES_CODE_PREFIX_SQL, str.lower), (db_search.COURSES_NAME_PREFIX_SQL, str.lower)],
+            "match": db_search.COURSES_MATCH_SQL,
+            "fuzzy": db_search.COURSES_FUZZY_SQL,
+        }
+        return self._search(text, limit, queries, (), key=lambda row: row[1],
+                            values=lambda row: (row[0], row[1]))
+
+    def _search(self, text, limit, queries, params, key, values):
+        """
+        Runs the search steps described in db_search.py. params are the filter parameters
+        shared by every query; each prefix query comes with the case its column is searched in.
+        """
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        text = (text or "").strip().lower()
+        if not text:
+            self.cursor.execute(queries["first"], (*params, limit))
+            return self.cursor.fetchall()
+        found = {}
+
+        def collect(rows):
+            for row in rows:
+                if len(found) == limit:
+                    return
+                found.setdefault(key(row), row)
+
+        for query, case in queries["prefix"]:
+            if len(found) < limit:
+                self.cursor.execute(query, (*db_search.prefix_bounds(case(text)), *params, limit))
+                collect(self.cursor.fetchall())
+        if len(text) < db_search.MIN_TRIGRAM_LENGTH:
+            return list(found.values())
+
+        if len(found) < limit:
+            # rows already found come back again here, hence the larger limit
+            self.cursor.execute(queries["match"], (db_search.fts_phrase(text), *params, limit + len(found)))
+            collect(self.cursor.fetchall())
+        if len(found) < limit:
+            self.cursor.execute(queries["fuzzy"],
+                                (db_search.fts_any_trigram(text), *params, db_search.FUZZY_CANDIDATES))
+            scored = [(db_search.similarity(text, values(row)), row) for row in self.cursor.fetchall()
+                      if key(row) not in found]
+            scored.sort(key=lambda item: -item[0])
+            collect(row for score, row in scored if score >= db_search.FUZZY_MIN_SCORE)
+        return list(found.values())
+
+    # --- Backups (see db_backup.py) ---
+
+    def backup_to(self, path, pages=-1):
+        """
+        Writes a consistent copy of the database to path while it keeps serving reads and
+        writes; returns {"pages", "bytes", "seconds"}.
+        """
+        return db_backup.snapshot(self.conn, path, pages)
+
+    @retry_on_busy
+    def restore_from(self, path):
+        """
+        Replaces the whole database with the database file at path, in place: every open
+        connection stays valid and sees the restored data. Returns {"pages", "seconds"}.
+        """
+        result = db_backup.restore(path, self.conn)
+        # a backup from an older version of the schema is brought up to date
+        self._migrate()
+        self._after_write_all()
+        return result
+
+    def enrollment_graph(self):
+        """
+        Returns the in-memory EnrollmentGraph (see db_graph.py), loading it on the first
+        call; it then follows the writes made through this instance.
+        """
+        with self._write_lock:
+            if self._graph is None:
+                graph = EnrollmentGraph(self)
+                graph.reload()
+                graph.attach()
+                self._graph = graph
+            return self._graph
+
+    def cache_stats(self):
+        """Returns the read cache's counters (hits, misses, hit_rate, evictions, invalidations, size)."""
+        return self._cache.stats()
+
+    def id_cache_stats(self):
+        """Returns the id cache's counters (hits, misses, hit_rate, evictions, invalidations, entries)."""
+        return self._ids.stats()
+
+    def clear_cache(self):
+        """Drops every cached query result and identifier lookup."""
+        self._cache.clear()
+        self._ids.clear()
+
     def close(self):
-        """Closes the database connection."""
-        self.conn.close()
+        """Closes every database connection opened by this instance."""
+        self._pool.close_all()
         
-def initialize_database():
-    """Wipes and sets up the database with sample data."""
-    if os.path.exists(DB_FILE):
-        os.remove(DB_FILE)
-    
-    university = University(DB_FILE)
-    # sample data to get started
+SAMPLE_STUDENTS = [
+    ("Alice", 20, "S12345"), ("Bob", 22, "S67890"), ("Charlie", 21, "S11223"), ("David", 23, "S44556"),
+    ("Eva", 19, "S77889"), ("Frank", 24, "S33445"), ("Grace", 20, "S55667"), ("Hannah", 22, "S88990"),
+    ("Ian", 21, "S99001"), ("Julia", 23, "S10203"),
+]
+SAMPLE_PROFESSORS = [
+    ("Dr. Smith", 45, "P54321"), ("Dr. Jones", 52, "P98765"), ("Dr. Brown", 48, "P11223"),
+    ("Dr. Taylor", 50, "P33445"), ("Dr. Wilson", 55, "P55667"), ("Dr. Lee", 47, "P77889"),
+    ("Dr. Clark", 53, "P99001"), ("Dr. Lewis", 49, "P10203"), ("Dr. Walker", 51, "P20304"),
+    ("Dr. Hall", 46, "P30405"),
+]
+SAMPLE_COURSES = [
+    ("Introduction to Python", "CS101"), ("Advanced Algorithms", "CS301"), ("Database Systems", "CS201"),
+    ("Operating Systems", "CS202"), ("Computer Networks", "CS203"), ("Software Engineering", "CS204"),
+    ("Artificial Intelligence", "CS205"), ("Machine Learning", "CS206"), ("Data Structures", "CS102"),
+    ("Web Development", "CS207"),
+]
+SAMPLE_ASSIGNMENTS = [
+    ("P54321", "CS101"), ("P98765", "CS301"), ("P11223", "CS201"), ("P33445", "CS202"), ("P55667", "CS203"),
+    ("P77889", "CS204"), ("P99001", "CS205"), ("P10203", "CS206"), ("P20304", "CS102"), ("P30405", "CS207"),
+]
+# Each student in 2 courses, with a grade for each
+SAMPLE_GRADES = [
+    ("S12345", "CS101", "A"), ("S12345", "CS201", "B+"), ("S67890", "CS101", "B"), ("S67890", "CS301", "A-"),
+    ("S11223", "CS301", "A-"), ("S11223", "CS202", "B"), ("S44556", "CS203", "B+"), ("S44556", "CS204", "A"),
+    ("S77889", "CS205", "A-"), ("S77889", "CS206", "B+"), ("S33445", "CS102", "A"), ("S33445", "CS207", "A-"),
+    ("S55667", "CS201", "B"), ("S55667", "CS202", "B+"), ("S88990", "CS203", "A"), ("S88990", "CS204", "A-"),
+    ("S99001", "CS205", "B+"), ("S99001", "CS206", "A"), ("S10203", "CS102", "A-"), ("S10203", "CS207", "B"),
+]
+
+
+def initialize_database(**synthetic):
+    """
+    Replaces the content of the database with the sample data. Given keyword arguments
+    (students=, courses=, enrollments=, profile=, seed=, ...), fills it with
+    db_generate.generate instead, for any number of rows.
+    """
+    if synthetic:
+        from db_generate import generate
+        # generated in a new file next to the database, then copied over it in place
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(DB_FILE))) as tmp:
+            generated = os.path.join(tmp, "generated.db")
+            counts = generate(generated, **synthetic)
+            _restore_database(generated)
+        print(f"Database generated: {counts}")
+        return
     print("--- Initializing Database with Sample Data ---")
-    # Add 10 students
-    university.add_student("Alice", 20, "S12345")
-    university.add_student("Bob", 22, "S67890")
-    university.add_student("Charlie", 21, "S11223")
-    university.add_student("David", 23, "S44556")
-    university.add_student("Eva", 19, "S77889")
-    university.add_student("Frank", 24, "S33445")
-    university.add_student("Grace", 20, "S55667")
-    university.add_student("Hannah", 22, "S88990")
-    university.add_student("Ian", 21, "S99001")
-    university.add_student("Julia", 23, "S10203")
-
-    # Add 10 professors
-    university.add_professor("Dr. Smith", 45, "P54321")
-    university.add_professor("Dr. Jones", 52, "P98765")
-    university.add_professor("Dr. Brown", 48, "P11223")
-    university.add_professor("Dr. Taylor", 50, "P33445")
-    university.add_professor("Dr. Wilson", 55, "P55667")
-    university.add_professor("Dr. Lee", 47, "P77889")
-    university.add_professor("Dr. Clark", 53, "P99001")
-    university.add_professor("Dr. Lewis", 49, "P10203")
-    university.add_professor("Dr. Walker", 51, "P20304")
-    university.add_professor("Dr. Hall", 46, "P30405")
-
-    # Add 10 courses
-    university.add_course("Introduction to Python", "CS101")
-    university.add_course("Advanced Algorithms", "CS301")
-    university.add_course("Database Systems", "CS201")
-    university.add_course("Operating Systems", "CS202")
-    university.add_course("Computer Networks", "CS203")
-    university.add_course("Software Engineering", "CS204")
-    university.add_course("Artificial Intelligence", "CS205")
-    university.add_course("Machine Learning", "CS206")
-    university.add_course("Data Structures", "CS102")
-    university.add_course("Web Development", "CS207")
-
-    # Assign professors to courses
-    university.assign_professor_to_course("P54321", "CS101")
-    university.assign_professor_to_course("P98765", "CS301")
-    university.assign_professor_to_course("P11223", "CS201")
-    university.assign_professor_to_course("P33445", "CS202")
-    university.assign_professor_to_course("P55667", "CS203")
-    university.assign_professor_to_course("P77889", "CS204")
-    university.assign_professor_to_course("P99001", "CS205")
-    university.assign_professor_to_course("P10203", "CS206")
-    university.assign_professor_to_course("P20304", "CS102")
-    university.assign_professor_to_course("P30405", "CS207")
-
-    # Enroll students in courses (each student in 2-3 courses)
-    university.enroll_student_in_course("S12345", "CS101")
-    university.enroll_student_in_course("S12345", "CS201")
-    university.enroll_student_in_course("S67890", "CS101")
-    university.enroll_student_in_course("S67890", "CS301")
-    university.enroll_student_in_course("S11223", "CS301")
-    university.enroll_student_in_course("S11223", "CS202")
-    university.enroll_student_in_course("S44556", "CS203")
-    university.enroll_student_in_course("S44556", "CS204")
-    university.enroll_student_in_course("S77889", "CS205")
-    university.enroll_student_in_course("S77889", "CS206")
-    university.enroll_student_in_course("S33445", "CS102")
-    university.enroll_student_in_course("S33445", "CS207")
-    university.enroll_student_in_course("S55667", "CS201")
-    university.enroll_student_in_course("S55667", "CS202")
-    university.enroll_student_in_course("S88990", "CS203")
-    university.enroll_student_in_course("S88990", "CS204")
-    university.enroll_student_in_course("S99001", "CS205")
-    university.enroll_student_in_course("S99001", "CS206")
-    university.enroll_student_in_course("S10203", "CS102")
-    university.enroll_student_in_course("S10203", "CS207")
-
-    # Assign grades to students for their courses
-    university.assign_grade("S12345", "CS101", "A")
-    university.assign_grade("S12345", "CS201", "B+")
-    university.assign_grade("S67890", "CS101", "B")
-    university.assign_grade("S67890", "CS301", "A-")
-    university.assign_grade("S11223", "CS301", "A-")
-    university.assign_grade("S11223", "CS202", "B")
-    university.assign_grade("S44556", "CS203", "B+")
-    university.assign_grade("S44556", "CS204", "A")
-    university.assign_grade("S77889", "CS205", "A-")
-    university.assign_grade("S77889", "CS206", "B+")
-    university.assign_grade("S33445", "CS102", "A")
-    university.assign_grade("S33445", "CS207", "A-")
-    university.assign_grade("S55667", "CS201", "B")
-    university.assign_grade("S55667", "CS202", "B+")
-    university.assign_grade("S88990", "CS203", "A")
-    university.assign_grade("S88990", "CS204", "A-")
-    university.assign_grade("S99001", "CS205", "B+")
-    university.assign_grade("S99001", "CS206", "A")
-    university.assign_grade("S10203", "CS102", "A-")
-    university.assign_grade("S10203", "CS207", "B")
-    university.close()
+    # the sample data are loaded once into a template, then copied over the database in place
+    _restore_database(sample_template())
     print("Database initialized with sample data.")
 
+
+def _restore_database(path):
+    """Copies the database file at path over DB_FILE in place (connections other processes hold on it stay valid)."""
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        db_backup.restore(path, conn)
+    finally:
+        conn.close()
+
+
+def sample_template():
+    """Path of the sample database template, built on first use and after schema changes."""
+    return db_backup.ensure_template(TEMPLATE_FILE, build_sample_database, SCHEMA_MIGRATIONS[-1][0])
+
+
+def build_sample_database(path):
+    """Creates a database at path with the sample data."""
+    university = University(path)
+    # loaded with the bulk methods (one transaction per table)
+    university.add_students_bulk(SAMPLE_STUDENTS)
+    university.add_professors_bulk(SAMPLE_PROFESSORS)
+    university.add_courses_bulk(SAMPLE_COURSES)
+    university.assign_professors_bulk(SAMPLE_ASSIGNMENTS)
+    university.enroll_students_bulk((student_id, code) for student_id, code, _ in SAMPLE_GRADES)
+    university.assign_grades_bulk(SAMPLE_GRADES)
+    university.close()
+
 def inspect_database():
     """Initializes the DB, lists all tables, and prints their contents."""
     print("--- Initializing Database for Inspection ---")
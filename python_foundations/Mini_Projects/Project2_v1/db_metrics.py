@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Query instrumentation for University.
+
+When metrics are enabled, University.cursor hands out an InstrumentedCursor that
+times every execute / executemany together with the fetches that follow it, counts
+rows, and attributes the query to the public University method that issued it
+(found by walking up the call stack). Queries slower than the threshold are logged
+with their SQL and parameters on the "university.slow_queries" logger once they
+are finished (their rows all fetched, or the thread running its next statement),
+so the logged time and row count include every fetch.
+
+When metrics are disabled University.cursor returns the plain sqlite3 cursor, so
+the only cost left is one attribute check per query.
+"""
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+
+SAMPLE_WINDOW = 1000     # latencies kept per method for the percentiles
+SLOW_LOG_SIZE = 100      # slow queries kept for metrics snapshots
+LOG_TEXT_LIMIT = 300     # characters of SQL / parameters kept in the slow-query log
+
+slow_query_logger = logging.getLogger("university.slow_queries")
+
+_DB_MODULES = {"db_logic.py"}
+
+
+def _calling_method():
+    """Name of the first public function of db_logic.py up the stack (the University method)."""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        code = frame.f_code
+        if os.path.basename(code.co_filename) in _DB_MODULES:
+            if not code.co_name.startswith(("_", "<")):
+                return code.co_name
+            fallback = fallback or code.co_name
+        frame = frame.f_back
+    return fallback or "?"
+
+
+class _Sample:
+    """One query: execute time plus the time spent fetching its rows."""
+    __slots__ = ("method", "sql", "params", "seconds", "rows")
+
+    def __init__(self, method, sql, params, seconds, rows):
+        self.method = method
+        self.sql = sql
+        self.params = params
+        self.seconds = seconds
+        self.rows = rows
+
+
+class _MethodStats:
+    __slots__ = ("calls", "samples")
+
+    def __init__(self, window):
+        self.calls = 0
+        self.samples = collections.deque(maxlen=window)
+
+
+def _shorten(text):
+    text = " ".join(str(text).split())
+    return text if len(text) <= LOG_TEXT_LIMIT else text[:LOG_TEXT_LIMIT] + "..."
+
+
+def _percentile(sorted_values, pct):
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class QueryMetrics:
+    """Per-method call counts, row counts and latency percentiles, plus the slow-query log."""
+
+    def __init__(self, slow_query_threshold=None, window=SAMPLE_WINDOW):
+        self.slow_query_threshold = slow_query_threshold    # seconds, None to disable the log
+        self.window = window
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._methods = {}
+        self._totals = collections.defaultdict(lambda: [0.0, 0])   # method -> [seconds, rows]
+        self._slow = collections.deque(maxlen=SLOW_LOG_SIZE)
+
+    def start(self, sql, params, seconds, rows, done=False):
+        """
+        Records an executed statement; fetches on the same thread are added to it until
+        it is done (done=True when it returns no rows to fetch).
+        """
+        self._finish()
+        sample = _Sample(_calling_method(), sql, params, seconds, max(rows, 0))
+        with self._lock:
+            stats = self._methods.get(sample.method)
+            if stats is None:
+                stats = self._methods[sample.method] = _MethodStats(self.window)
+            stats.calls += 1
+            stats.samples.append(sample)
+            totals = self._totals[sample.method]
+            totals[0] += seconds
+            totals[1] += sample.rows
+        self._local.sample = sample
+        if done:
+            self._finish()
+
+    def add_fetch(self, seconds, rows, done=False):
+        """Adds a fetch to the thread's running statement; done=True when it returned the last rows."""
+        sample = getattr(self._local, "sample", None)
+        if sample is None:
+            return
+        sample.seconds += seconds
+        sample.rows += rows
+        with self._lock:
+            totals = self._totals[sample.method]
+            totals[0] += seconds
+            totals[1] += rows
+        if done:
+            self._finish()
+
+    def _finish(self):
+        """Ends the thread's running statement: its time and rows are final, log it if it was slow."""
+        sample = getattr(self._local, "sample", None)
+        if sample is None:
+            return
+        self._local.sample = None
+        threshold = self.slow_query_threshold
+        if threshold is not None and sample.seconds >= threshold:
+            self._log_slow(sample)
+        sample.params = None   # only kept for the slow-query log
+
+    def _log_slow(self, sample):
+        entry = {"method": sample.method, "sql": _shorten(sample.sql), "params": _shorten(repr(sample.params)),
+                 "ms": sample.seconds * 1000, "rows": sample.rows}
+        with self._lock:
+            self._slow.append(entry)
+        slow_query_logger.warning("slow query in %s (%.1f ms, %d rows): %s params=%s",
+                                  entry["method"], entry["ms"], entry["rows"], entry["sql"], entry["params"])
+
+    def snapshot(self):
+        """
+        Returns {"methods": {name: {calls, rows, total_ms, mean_ms, p50_ms, p95_ms, p99_ms}},
+        "slow_queries": [{method, sql, params, ms, rows}, ...]}; percentiles cover the last
+        `window` queries of each method.
+        """
+        with self._lock:
+            methods = {}
+            for name, stats in self._methods.items():
+                latencies = sorted(sample.seconds for sample in stats.samples)
+                total_seconds, rows = self._totals[name]
+                methods[name] = {
+                    "calls": stats.calls,
+                    "rows": rows,
+                    "total_ms": total_seconds * 1000,
+                    "mean_ms": total_seconds * 1000 / stats.calls,
+                    **{f"p{p}_ms": _percentile(latencies, p) * 1000 for p in (50, 95, 99)},
+                }
+            slow = list(self._slow)
+        return {"methods": methods, "slow_queries": slow}
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+            self._totals.clear()
+            self._slow.clear()
+
+
+class InstrumentedCursor:
+    """Wraps a sqlite3 cursor and reports its statements and fetches to a QueryMetrics."""
+    __slots__ = ("_cursor", "_metrics")
+
+    def __init__(self, cursor, metrics):
+        self._cursor = cursor
+        self._metrics = metrics
+
+    def execute(self, sql, params=()):
+        start = time.perf_counter()
+        self._cursor.execute(sql, params)
+        # no description: not a query, there is nothing left to fetch
+        self._metrics.start(sql, params, time.perf_counter() - start, self._cursor.rowcount,
+                            self._cursor.description is None)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        start = time.perf_counter()
+        self._cursor.executemany(sql, seq_of_params)
+        self._metrics.start(sql, f"<{len(seq_of_params)} rows>", time.perf_counter() - start,
+                            self._cursor.rowcount, True)
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._metrics.add_fetch(time.perf_counter() - start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        size = size if size is not None else self._cursor.arraysize
+        rows = self._cursor.fetchmany(size)
+        # a short batch is the last one
+        self._metrics.add_fetch(time.perf_counter() - start, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._metrics.add_fetch(time.perf_counter() - start, len(rows), True)
+        return rows
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany(self._cursor.arraysize or 100)
+            if not rows:
+                return
+            yield from rows
+
+    def __getattr__(self, name):
+        # description, rowcount, lastrowid, close, ...
+        return getattr(self._cursor, name)
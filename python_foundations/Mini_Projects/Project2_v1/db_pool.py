@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Connection pooling and write-retry helpers for the university database.
+
+SQLite connections must not be used by two threads at the same time, so the
+pool hands every thread its own connection (and cursor). In WAL mode readers
+on those connections run in parallel with the single writer. When a thread
+ends, its connection goes back to an idle list for the next thread instead of
+being reopened.
+"""
+import functools
+import sqlite3
+import threading
+import time
+
+BUSY_TIMEOUT = 5.0       # seconds SQLite waits on a locked database before raising
+MAX_IDLE_CONNECTIONS = 8
+WRITE_RETRIES = 5
+RETRY_BACKOFF = 0.05     # seconds, doubled after each failed attempt
+# compiled statements kept per connection (sqlite3's default is 128, fewer than the
+# hot queries plus the padded lookup shapes of the bulk methods)
+STATEMENT_CACHE_SIZE = 512
+
+
+class _Lease:
+    """Holds a thread's connection; returns it to the pool when the thread's local storage is freed."""
+
+    def __init__(self, pool, conn):
+        self.pool = pool
+        self.conn = conn
+        self.cursor = conn.cursor()
+
+    def __del__(self):
+        self.pool._release(self.conn)
+
+
+class ConnectionPool:
+    """
+    One SQLite connection per thread, created lazily and recycled across threads.
+    ':memory:' databases cannot be shared between connections, so they get a
+    single connection for every thread (fine for tests and demos, not for concurrent use).
+    """
+
+    def __init__(self, db_path, busy_timeout=BUSY_TIMEOUT, max_idle=MAX_IDLE_CONNECTIONS,
+                 statement_cache_size=STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.statement_cache_size = statement_cache_size
+        self.max_idle = max_idle
+        self.in_memory = db_path == ":memory:"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle = []
+        self._open = set()
+        self._closed = False
+        self._shared = _Lease(self, self._connect()) if self.in_memory else None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False,
+                               cached_statements=self.statement_cache_size)
+        if not self.in_memory:
+            # WAL lets readers run while one writer commits; NORMAL sync is safe with WAL
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        with self._lock:
+            self._open.add(conn)
+        return conn
+
+    def _lease(self):
+        if self._shared is not None:
+            return self._shared
+        lease = getattr(self._local, "lease", None)
+        if lease is None:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            lease = self._local.lease = _Lease(self, conn or self._connect())
+        return lease
+
+    @property
+    def conn(self):
+        """The calling thread's connection."""
+        return self._lease().conn
+
+    @property
+    def cursor(self):
+        """The calling thread's cursor."""
+        return self._lease().cursor
+
+    def _release(self, conn):
+        with self._lock:
+            if self._closed or conn not in self._open:
+                return
+            if conn.in_transaction:
+                conn.rollback()
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self._open.discard(conn)
+        conn.close()
+
+    def close_all(self):
+        """Closes every connection, including the ones still held by other threads."""
+        with self._lock:
+            self._closed = True
+            connections, self._open, self._idle = list(self._open), set(), []
+        # the calling thread's cursor still holds its last statement, and SQLite only releases
+        # the file of a closed connection once every statement is finalized
+        self._local.lease = None
+        for conn in connections:
+            conn.close()
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def retry_on_busy(method):
+    """
+    Decorator for University write methods: writes from this process go one at a
+    time through the instance's write lock, and a write that still hits a busy
+    database (another process holding the lock past busy_timeout) is rolled back
+    and retried with exponential backoff. A write that returns or raises without
+    committing is rolled back so it does not hold the lock.
+    A retry calls the method again with the same arguments, so they must not be
+    one-shot iterators: callers turn those into lists before the retried method.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        delay = RETRY_BACKOFF
+        for attempt in range(WRITE_RETRIES):
+            try:
+                with self._write_lock:
+                    try:
+                        return method(self, *args, **kwargs)
+                    finally:
+                        # a write that failed (e.g. IntegrityError) must not keep the database locked
+                        if self.conn.in_transaction:
+                            self.conn.rollback()
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or attempt == WRITE_RETRIES - 1:
+                    raise
+                time.sleep(delay)
+                delay *= 2
+    return wrapper
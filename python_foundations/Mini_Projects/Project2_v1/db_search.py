@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Search indexes for the university database (schema migration 3).
+
+Two FTS5 tables with the trigram tokenizer index persons (name, university_id)
+and courses (name, code). They are external-content tables: the text stays in
+persons / courses, the FTS tables only hold the index, kept current by
+triggers. University.search_people / search_courses fill up to `limit` rows
+in three steps, each one only run if the previous ones found too few rows:
+
+    1. prefix match on the lower(name) / university_id / lower(code) indexes;
+    2. substring match through the trigram index (text of 3 characters or more),
+       in rowid order: bm25 ranks say little about short names and would have
+       to score every match;
+    3. fuzzy match: the best-ranked rows sharing at least one trigram with the
+       text, re-ranked by difflib similarity. This is the expensive step (tens
+       of milliseconds on 200k people with very common trigrams), reached only
+       when the text matches almost nothing as typed.
+"""
+DEFAULT_LIMIT = 20
+MIN_TRIGRAM_LENGTH = 3
+FUZZY_CANDIDATES = 200     # rows re-ranked by similarity in the fuzzy step
+FUZZY_MIN_SCORE = 0.6      # difflib ratio below which a fuzzy candidate is dropped
+
+SEARCH_SCHEMA = [
+    # course names get the same lower() index as codes for the short prefix search
+    "CREATE INDEX IF NOT EXISTS idx_courses_lower_name ON courses (lower(name))",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_people USING fts5(
+        name, university_id, content='persons', content_rowid='id', tokenize='trigram')""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_courses USING fts5(
+        name, code, content='courses', content_rowid='id', tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS trg_search_persons_insert AFTER INSERT ON persons BEGIN
+        INSERT INTO search_people (rowid, name, university_id) VALUES (NEW.id, NEW.name, NEW.university_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_search_persons_delete AFTER DELETE ON persons BEGIN
+        INSERT INTO search_people (search_people, rowid, name, university_id)
+        VALUES ('delete', OLD.id, OLD.name, OLD.university_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_search_persons_update AFTER UPDATE OF name, university_id ON persons BEGIN
+        INSERT INTO search_people (search_people, rowid, name, university_id)
+        VALUES ('delete', OLD.id, OLD.name, OLD.university_id);
+        INSERT INTO search_people (rowid, name, university_id) VALUES (NEW.id, NEW.name, NEW.university_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_search_courses_insert AFTER INSERT ON courses BEGIN
+        INSERT INTO search_courses (rowid, name, code) VALUES (NEW.id, NEW.name, NEW.code);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_search_courses_delete AFTER DELETE ON courses BEGIN
+        INSERT INTO search_courses (search_courses, rowid, name, code) VALUES ('delete', OLD.id, OLD.name, OLD.code);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_search_courses_update AFTER UPDATE OF name, code ON courses BEGIN
+        INSERT INTO search_courses (search_courses, rowid, name, code) VALUES ('delete', OLD.id, OLD.name, OLD.code);
+        INSERT INTO search_courses (rowid, name, code) VALUES (NEW.id, NEW.name, NEW.code);
+    END""",
+]
+
+# Re-indexes everything from the content tables (backfill, and after loads done without triggers)
+SEARCH_REBUILD = [
+    "INSERT INTO search_people (search_people) VALUES ('rebuild')",
+    "INSERT INTO search_courses (search_courses) VALUES ('rebuild')",
+]
+
+# --- Queries ---
+# {role} is "AND +role = ?" (or "AND p.role = ?") when searching one role, "" otherwise;
+# the unary + keeps the prefix queries on their range index rather than on idx_persons_role,
+# and CROSS JOIN keeps the FTS table as the outer loop (SQLite does not reorder a CROSS JOIN).
+
+PEOPLE_FIRST_SQL = "SELECT name, age, university_id FROM persons WHERE 1 {role} ORDER BY id LIMIT ?"
+PEOPLE_NAME_PREFIX_SQL = """
+        SELECT name, age, university_id FROM persons
+        WHERE lower(name) >= ? AND lower(name) < ? {role} ORDER BY lower(name) LIMIT ?
+        """
+PEOPLE_ID_PREFIX_SQL = """
+        SELECT name, age, university_id FROM persons
+        WHERE university_id >= ? AND university_id < ? {role} ORDER BY university_id LIMIT ?
+        """
+PEOPLE_MATCH_SQL = """
+        SELECT p.name, p.age, p.university_id FROM search_people s CROSS JOIN persons p ON p.id = s.rowid
+        WHERE search_people MATCH ? {role} LIMIT ?
+        """
+PEOPLE_FUZZY_SQL = """
+        SELECT p.name, p.age, p.university_id FROM search_people s CROSS JOIN persons p ON p.id = s.rowid
+        WHERE search_people MATCH ? {role} ORDER BY s.rank LIMIT ?
+        """
+
+_COURSE_COLUMNS = "SELECT c.name, c.code, p.name FROM courses c LEFT JOIN persons p ON p.id = c.professor_id"
+COURSES_FIRST_SQL = f"{_COURSE_COLUMNS} ORDER BY c.id LIMIT ?"
+COURSES_CODE_PREFIX_SQL = f"{_COURSE_COLUMNS} WHERE lower(c.code) >= ? AND lower(c.code) < ? ORDER BY lower(c.code) LIMIT ?"
+COURSES_NAME_PREFIX_SQL = f"{_COURSE_COLUMNS} WHERE lower(c.name) >= ? AND lower(c.name) < ? ORDER BY lower(c.name) LIMIT ?"
+COURSES_MATCH_SQL = """
+        SELECT c.name, c.code, p.name FROM search_courses s CROSS JOIN courses c ON c.id = s.rowid
+        LEFT JOIN persons p ON p.id = c.professor_id
+        WHERE search_courses MATCH ? LIMIT ?
+        """
+COURSES_FUZZY_SQL = """
+        SELECT c.name, c.code, p.name FROM search_courses s CROSS JOIN courses c ON c.id = s.rowid
+        LEFT JOIN persons p ON p.id = c.professor_id
+        WHERE search_courses MATCH ? ORDER BY s.rank LIMIT ?
+        """
+
+
+def prefix_bounds(prefix):
+    """(low, high) such that low <= value < high selects the values starting with prefix."""
+    return prefix, prefix + "\U0010ffff"
+
+
+def fts_phrase(text):
+    """FTS5 query matching text as a substring (one quoted phrase for the trigram tokenizer)."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def fts_any_trigram(text):
+    """FTS5 query matching rows that share at least one trigram with text."""
+    trigrams = {text[i:i + MIN_TRIGRAM_LENGTH] for i in range(len(text) - MIN_TRIGRAM_LENGTH + 1)}
+    return " OR ".join(fts_phrase(trigram) for trigram in sorted(trigrams))
+
+
+def similarity(text, values):
+    """Best difflib ratio between text and each value or word of a value (all lower-cased)."""
+    import difflib   # only the fuzzy step needs it, keep it out of the startup imports
+    best = 0.0
+    for value in values:
+        if not value:
+            continue
+        value = value.lower()
+        for candidate in (value, *value.split()):
+            best = max(best, difflib.SequenceMatcher(None, text, candidate).ratio())
+    return best
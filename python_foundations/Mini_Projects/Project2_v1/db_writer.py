@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Group commits for enrollment and grade writes.
+
+During registration peaks many threads call enroll_student_in_course and
+assign_grade at the same time; each call runs its own lookups, its own INSERT
+and its own commit, one after the other. WriteBatcher puts those calls on a
+queue instead. A single writer thread takes everything queued (up to
+max_batch requests, optionally waiting max_delay seconds for more after the
+first one) and writes it with the bulk methods of University: a few
+set-based lookups, one executemany and one commit per kind of request.
+
+The default window is 0: a batch is whatever queued up while the previous one
+was being written, so a lone request is not delayed and batches grow with the
+load. A window only pays off when commits are expensive (synchronous = FULL,
+slow disks) and the clients many.
+
+Each call returns a concurrent.futures.Future whose result is the message the
+single-row method would have returned ("already enrolled", "not enrolled",
+...). A batch is written as one bulk call per kind, except that a request
+touching a (student, course) pair already queued by a request of the other
+kind starts a new group: an enrollment queued before a grade for the same
+course is committed before that grade is checked, and a grade queued before
+the enrollment still gets "not enrolled".
+
+    with WriteBatcher(db) as writer:
+        future = writer.enroll_student_in_course("S12345", "CS101")
+        print(future.result())
+
+asyncio code can await a future with asyncio.wrap_future(future).
+"""
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+DEFAULT_MAX_BATCH = 1000
+DEFAULT_MAX_DELAY = 0.0     # seconds the writer waits for more requests after the first one
+
+# request kind -> (University bulk method taking the list of argument tuples, single-row method)
+METHODS = {
+    "enroll": ("enroll_students_bulk", "enroll_student_in_course"),
+    "grade": ("assign_grades_bulk", "assign_grade"),
+}
+_FLUSH = "flush"
+_STOP = object()
+
+
+class WriteBatcher:
+    """
+    Background writer coalescing single enrollment and grade writes into group commits.
+    """
+
+    def __init__(self, university, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY):
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be at least 1, got {max_batch}")
+        if max_delay < 0:
+            raise ValueError(f"max_delay must not be negative, got {max_delay}")
+        self.university = university
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "batches": 0, "commits": 0, "largest_batch": 0, "errors": 0}
+        self._thread = threading.Thread(target=self._run, name="university-writer", daemon=True)
+        self._thread.start()
+
+    # --- Requests ---
+
+    def enroll_student_in_course(self, student_id, course_code):
+        """Queues an enrollment; the future's result is enroll_student_in_course's message."""
+        return self._submit("enroll", (student_id, course_code))
+
+    def assign_grade(self, student_id, course_code, grade):
+        """Queues a grade; the future's result is assign_grade's message."""
+        return self._submit("grade", (student_id, course_code, grade))
+
+    def flush(self, timeout=None):
+        """Blocks until every request queued before this call has been committed."""
+        self._submit(_FLUSH, ()).result(timeout)
+
+    def _submit(self, kind, args):
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("WriteBatcher is closed")
+            self._queue.put((kind, args, future))
+        return future
+
+    # --- Writer thread ---
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def _next_batch(self):
+        """Waits for a request, then collects more until max_batch or max_delay; returns (batch, stop)."""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    @staticmethod
+    def _segments(batch):
+        """
+        Splits a batch into {kind: [requests]} groups that can be written one kind after
+        the other (see the module docstring); a flush ends its group.
+        """
+        segment, kind_by_pair = {}, {}
+        for item in batch:
+            kind, args, _ = item
+            if kind != _FLUSH and kind_by_pair.setdefault(args[:2], kind) != kind:
+                yield segment
+                segment, kind_by_pair = {}, {args[:2]: kind}
+            segment.setdefault(kind, []).append(item)
+            if kind == _FLUSH:
+                yield segment
+                segment, kind_by_pair = {}, {}
+        if segment:
+            yield segment
+
+    def _write(self, batch):
+        # requests the caller cancelled while they were queued are dropped
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        commits = 0
+        runs = [(kind, run) for segment in self._segments(batch) for kind, run in segment.items()]
+        for kind, run in runs:
+            if kind == _FLUSH:
+                for _, _, future in run:
+                    future.set_result(None)
+                continue
+            try:
+                messages = self._write_run(kind, [args for _, args, _ in run])
+            except Exception as exc:
+                with self._lock:
+                    self._stats["errors"] += len(run)
+                for _, _, future in run:
+                    future.set_exception(exc)
+                continue
+            commits += 1
+            for (_, _, future), message in zip(run, messages):
+                future.set_result(message)
+        with self._lock:
+            requests = sum(1 for item in batch if item[0] != _FLUSH)
+            self._stats["requests"] += requests
+            self._stats["batches"] += 1
+            self._stats["commits"] += commits
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], requests)
+
+    def _write_run(self, kind, rows):
+        bulk_method, single_method = METHODS[kind]
+        try:
+            return getattr(self.university, bulk_method)(rows)
+        except sqlite3.IntegrityError:
+            # a write made outside this batcher landed between the bulk lookups and the insert:
+            # the bulk transaction was rolled back, redo the rows one by one
+            return [getattr(self.university, single_method)(*args) for args in rows]
+
+    # --- Lifecycle ---
+
+    def stats(self):
+        """Returns {requests, batches, commits, largest_batch, errors, mean_batch, queued}."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["mean_batch"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def close(self, timeout=None):
+        """Writes what is still queued, then stops the writer thread; later requests raise RuntimeError."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
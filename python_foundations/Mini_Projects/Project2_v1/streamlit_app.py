@@ -1,9 +1,12 @@
 """
 A Streamlit web application for the University Management System.
 """
+import os
+import time
+
 import streamlit as st
-import pandas as pd
-from db_logic import University, initialize_database, DB_FILE
+import streamlit_data as data
+from db_logic import sample_template
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -13,11 +16,80 @@ st.set_page_config(
 )
 
 # --- Database Connection ---
-# Use a session state to cache the database connection
-if 'db' not in st.session_state:
-    st.session_state.db = University(DB_FILE)
+# One University shared by all sessions; reads go through the cached loaders of streamlit_data.py,
+# writes go to db directly, enrollments and grades through the shared write batcher
+# (the write listener clears the loaders they make stale). The pages that write fetch db
+# themselves, so a rerun served from the loaders' cache does not even open the database.
+rerun_started = data.start_rerun()
+
+PAGE_SIZE = 50
+SEARCH_LIMIT = 20
+BACKUP_DIR = "backups"      # snapshots taken from the System page
+
+
+def frame(rows, columns=None, index=None):
+    """
+    Builds the DataFrame of a table or chart. pandas is imported here, by the first table
+    actually shown, instead of at startup: pages without tables never load it.
+    """
+    import pandas as pd
+    return pd.DataFrame(rows, columns=columns, index=index)
+
+
+def show_table(rows, columns):
+    st.dataframe(frame(rows, columns), use_container_width=True)
+
+
+def show_page(key, fetch_page, columns, empty_message):
+    """
+    Shows one page of rows with Previous / Next buttons. Only the visible page is read
+    from the database: fetch_page(page_size, cursor) returns a db_logic.Page, and the
+    cursors of the pages already visited are kept in the session state.
+    """
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    page = fetch_page(PAGE_SIZE, cursors[-1])
+    if not page.rows and len(cursors) == 1:
+        st.info(empty_message)
+        return
+    show_table(page.rows, columns)
+    prev_col, info_col, next_col = st.columns([1, 4, 1])
+    info_col.caption(f"Page {len(cursors)} ({len(page.rows)} rows)")
+    if prev_col.button("Previous", key=f"{key}_prev", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if next_col.button("Next", key=f"{key}_next", disabled=page.next_cursor is None):
+        cursors.append(page.next_cursor)
+        st.rerun()
+
+
+def reset_pages(key):
+    """Goes back to the first page of a paged table (e.g. when its filters change)."""
+    st.session_state[f"{key}_cursors"] = [None]
+
+
+def search_select(label, key, search, on_change=None, args=()):
+    """
+    Search-as-you-type picker: a text box, then a selectbox of the SEARCH_LIMIT best matches
+    found by the database search (db_search.py), instead of a selectbox listing every row.
+    search(text, limit) returns (display, value) pairs; returns the selected value or None.
+    """
+    text = st.text_input(label, key=f"{key}_search", placeholder="Type a name, an ID or a code",
+                         on_change=on_change, args=args)
+    options = dict(search(text, SEARCH_LIMIT))
+    if not options:
+        st.caption("No match." if text.strip() else "Nothing to select yet.")
+        return None
+    choice = st.selectbox(label, list(options), key=key, label_visibility="collapsed",
+                          on_change=on_change, args=args)
+    return options[choice]
+
 
-db = st.session_state.db
+def people_matches(role):
+    return lambda text, limit: [(f"{p[0]} ({p[2]})", p[2]) for p in data.load_people_search(text, role, limit)]
+
+
+def course_matches(text, limit):
+    return [(f"{c[0]} ({c[1]})", c[1]) for c in data.load_course_search(text, limit)]
 
 # --- Page Title ---
 st.title("University Management System")
@@ -40,31 +112,47 @@ if page == "Dashboard":
     st.header("Dashboard")
     st.markdown("Welcome to the University Management System. Here's a quick overview.")
 
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
 
-    students = db.get_people('student')
-    professors = db.get_people('professor')
-    courses = db.get_courses()
+    # counts come from the trigger-maintained summary tables, not from loading every row
+    totals = data.load_totals()
 
     with col1:
-        st.metric("Total Students", len(students))
+        st.metric("Total Students", totals["students"])
     with col2:
-        st.metric("Total Professors", len(professors))
+        st.metric("Total Professors", totals["professors"])
     with col3:
-        st.metric("Total Courses", len(courses))
+        st.metric("Total Courses", totals["courses"])
+    with col4:
+        st.metric("Total Enrollments", totals["enrollments"])
 
     st.markdown("---")
 
+    st.subheader("Enrollments per Course")
+    counts = data.load_course_enrollment_counts()
+    if counts:
+        df_counts = frame(counts, ["Course Name", "Course Code", "Enrolled"])
+        st.bar_chart(df_counts.set_index("Course Code")["Enrolled"])
+
+    st.subheader("Professor Teaching Load")
+    load = data.load_professor_load()
+    if load:
+        show_table(load, ["Professor", "Employee ID", "Courses", "Students"])
+    else:
+        st.info("No professors found.")
+
+    courses = data.load_courses()
+
     st.subheader("All Courses")
     if courses:
-        df_courses = pd.DataFrame(courses, columns=["Course Name", "Course Code", "Professor"])
-        st.dataframe(df_courses, use_container_width=True)
+        show_table(courses, ["Course Name", "Course Code", "Professor"])
     else:
         st.info("No courses found.")
 
 # --- Page: Manage People ---
 elif page == "Manage People":
     st.header("Manage People")
+    db = data.get_university()
 
     tab1, tab2 = st.tabs(["Students", "Professors"])
 
@@ -82,12 +170,8 @@ elif page == "Manage People":
                 st.warning("Please fill in all fields.")
 
         st.subheader("Existing Students")
-        students = db.get_people('student')
-        if students:
-            df_students = pd.DataFrame(students, columns=["Name", "Age", "Student ID"])
-            st.dataframe(df_students, use_container_width=True)
-        else:
-            st.info("No students found.")
+        show_page("students", lambda size, cursor: data.load_people_page('student', size, cursor),
+                  ["Name", "Age", "Student ID"], "No students found.")
 
     with tab2:
         st.subheader("Add New Professor")
@@ -103,16 +187,13 @@ elif page == "Manage People":
                 st.warning("Please fill in all fields.")
 
         st.subheader("Existing Professors")
-        professors = db.get_people('professor')
-        if professors:
-            df_profs = pd.DataFrame(professors, columns=["Name", "Age", "Employee ID"])
-            st.dataframe(df_profs, use_container_width=True)
-        else:
-            st.info("No professors found.")
+        show_page("professors", lambda size, cursor: data.load_people_page('professor', size, cursor),
+                  ["Name", "Age", "Employee ID"], "No professors found.")
 
 # --- Page: Manage Courses ---
 elif page == "Manage Courses":
     st.header("Manage Courses")
+    db = data.get_university()
 
     st.subheader("Add New Course")
     with st.form("add_course_form", clear_on_submit=True):
@@ -126,30 +207,21 @@ elif page == "Manage Courses":
             st.warning("Please fill in all fields.")
 
     st.subheader("Assign Professor to Course")
-    professors = db.get_people('professor')
-    courses = db.get_courses()
-
-    if professors and courses:
-        prof_options = {f"{p[0]} ({p[2]})": p[2] for p in professors}
-        course_options = {f"{c[0]} ({c[1]})": c[1] for c in courses}
-
-        selected_prof_display = st.selectbox("Select Professor", list(prof_options.keys()))
-        selected_course_display = st.selectbox("Select Course", list(course_options.keys()))
+    prof_id = search_select("Select Professor", "assign_prof", people_matches('professor'))
+    course_code = search_select("Select Course", "assign_course", course_matches)
 
+    if prof_id and course_code:
         if st.button("Assign Professor"):
-            prof_id = prof_options[selected_prof_display]
-            course_code = course_options[selected_course_display]
             message = db.assign_professor_to_course(prof_id, course_code)
             st.success(message)
             st.rerun() # Refresh the page to show updated course list
     else:
-        st.warning("Please add professors and courses first.")
+        st.warning("Please pick a professor and a course (add them first if there are none).")
 
     st.subheader("All Courses")
-    courses_refreshed = db.get_courses() # Re-fetch courses to show updates
+    courses_refreshed = data.load_courses() # Re-fetch courses to show updates
     if courses_refreshed:
-        df_courses = pd.DataFrame(courses_refreshed, columns=["Course Name", "Course Code", "Professor"])
-        st.dataframe(df_courses, use_container_width=True)
+        show_table(courses_refreshed, ["Course Name", "Course Code", "Professor"])
     else:
         st.info("No courses found.")
 
@@ -157,98 +229,153 @@ elif page == "Manage Courses":
 # --- Page: Enrollments & Grades ---
 elif page == "Enrollments & Grades":
     st.header("Enrollments & Grades")
+    db = data.get_university()
 
     tab1, tab2, tab3 = st.tabs(["Enroll Student", "Assign Grade", "View Records"])
 
     with tab1:
         st.subheader("Enroll Student in a Course")
-        students = db.get_people('student')
-        courses = db.get_courses()
-
-        if students and courses:
-            student_options = {f"{s[0]} ({s[2]})": s[2] for s in students}
-            course_options = {f"{c[0]} ({c[1]})": c[1] for c in courses}
-
-            selected_student_display = st.selectbox("Select Student", list(student_options.keys()), key="enroll_student")
-            selected_course_display = st.selectbox("Select Course", list(course_options.keys()), key="enroll_course")
+        student_id = search_select("Select Student", "enroll_student", people_matches('student'))
+        course_code = search_select("Select Course", "enroll_course", course_matches)
 
+        if student_id and course_code:
             if st.button("Enroll Student"):
-                student_id = student_options[selected_student_display]
-                course_code = course_options[selected_course_display]
-                message = db.enroll_student_in_course(student_id, course_code)
+                message = data.get_writer().enroll_student_in_course(student_id, course_code).result()
                 st.success(message)
         else:
-            st.warning("Please add students and courses first.")
+            st.warning("Please pick a student and a course (add them first if there are none).")
 
     with tab2:
         st.subheader("Assign a Grade")
-        students = db.get_people('student')
-        courses = db.get_courses()
+        student_id = search_select("Select Student", "grade_student", people_matches('student'))
+        course_code = search_select("Select Course", "grade_course", course_matches)
 
-        if students and courses:
-            student_options = {f"{s[0]} ({s[2]})": s[2] for s in students}
-            course_options = {f"{c[0]} ({c[1]})": c[1] for c in courses}
-
-            selected_student_display = st.selectbox("Select Student", list(student_options.keys()), key="grade_student")
-            selected_course_display = st.selectbox("Select Course", list(course_options.keys()), key="grade_course")
+        if student_id and course_code:
             grade = st.text_input("Grade (e.g., A, B+, C-)")
 
             if st.button("Assign Grade"):
                 if grade:
-                    student_id = student_options[selected_student_display]
-                    course_code = course_options[selected_course_display]
-                    message = db.assign_grade(student_id, course_code, grade)
+                    message = data.get_writer().assign_grade(student_id, course_code, grade).result()
                     st.success(message)
                 else:
                     st.warning("Please enter a grade.")
         else:
-            st.warning("Please add students and courses first.")
+            st.warning("Please pick a student and a course (add them first if there are none).")
 
     with tab3:
         st.subheader("View Course Summary")
-        courses = db.get_courses()
-        if courses:
-            course_options = {f"{c[0]} ({c[1]})": c[1] for c in courses}
-            selected_course_display = st.selectbox("Select a course to view its summary", list(course_options.keys()))
-            if selected_course_display:
-                course_code = course_options[selected_course_display]
-                enrolled_students = db.get_course_summary(course_code)
-                if enrolled_students:
-                    df_enrolled = pd.DataFrame(enrolled_students, columns=["Student Name", "Student ID"])
-                    st.dataframe(df_enrolled, use_container_width=True)
-                else:
-                    st.info("No students are enrolled in this course.")
+        course_code = search_select("Select a course to view its summary", "summary_course", course_matches,
+                                    on_change=reset_pages, args=("course_summary",))
+        if course_code:
+            stats = data.load_course_stats(course_code)
+            if stats and stats["grades"]:
+                st.caption(f"{stats['enrollments']} enrolled - grades: "
+                           + ", ".join(f"{grade}: {n}" for grade, n in stats["grades"].items()))
+            show_page("course_summary", lambda size, cursor: data.load_course_summary_page(course_code, size, cursor),
+                      ["Student Name", "Student ID"], "No students are enrolled in this course.")
 
         st.markdown("---")
 
         st.subheader("View Student Grades")
-        students = db.get_people('student')
-        if students:
-            student_options = {f"{s[0]} ({s[2]})": s[2] for s in students}
-            selected_student_display = st.selectbox("Select a student to view their grades", list(student_options.keys()))
-            if selected_student_display:
-                student_id = student_options[selected_student_display]
-                grades = db.get_student_grades(student_id)
-                if grades:
-                    df_grades = pd.DataFrame(grades, columns=["Course Name", "Course Code", "Grade"])
-                    st.dataframe(df_grades, use_container_width=True)
-                else:
-                    st.info("This student has no grades recorded.")
+        student_id = search_select("Select a student to view their grades", "records_student",
+                                   people_matches('student'))
+        if student_id:
+            # answered from the in-memory enrollment graph (db_graph.py), no SQL join
+            grades = db.enrollment_graph().transcript(student_id)
+            if grades:
+                show_table(grades, ["Course Name", "Course Code", "Grade"])
+                gpa = data.load_student_gpa(student_id)
+                if gpa is not None:
+                    st.metric("GPA", f"{gpa:.2f}")
+            else:
+                st.info("This student has no grades recorded.")
 
 # --- Page: System ---
 elif page == "System":
     st.header("System Management")
-    st.warning("Warning: This will delete all existing data and create a new database with sample entries.")
+    db = data.get_university()
+
+    st.subheader("Inspect Tables")
+    table = st.selectbox("Table", db.get_all_table_names(), on_change=reset_pages, args=("inspect",))
+    if table:
+        all_columns = db.get_table_page(table, page_size=1).headers
+        columns = st.multiselect("Columns", all_columns, default=all_columns,
+                                 on_change=reset_pages, args=("inspect",))
+        filter_column = st.selectbox("Filter on column", ["(none)"] + all_columns,
+                                     on_change=reset_pages, args=("inspect",))
+        filter_value = st.text_input("Equal to", on_change=reset_pages, args=("inspect",))
+        filters = {filter_column: filter_value} if filter_column != "(none)" and filter_value else None
+        if columns:
+            show_page("inspect", lambda size, cursor: db.get_table_page(table, size, cursor, columns, filters),
+                      columns, "No matching rows.")
+
+    st.markdown("---")
+    st.subheader("Query Metrics")
+    record = st.checkbox("Record query timings (slow queries above 100 ms are logged)",
+                         value=db.metrics_snapshot() is not None)
+    if record and db.metrics_snapshot() is None:
+        db.enable_metrics(slow_query_threshold=0.1)
+    elif not record:
+        db.disable_metrics()
+    snapshot = db.metrics_snapshot()
+    if snapshot and snapshot["methods"]:
+        methods = snapshot["methods"]
+        df_metrics = frame(list(methods.values()), index=list(methods)).sort_values("total_ms", ascending=False)
+        st.dataframe(df_metrics.round(3), use_container_width=True)
+        if snapshot["slow_queries"]:
+            st.dataframe(frame(snapshot["slow_queries"]), use_container_width=True)
+        st.caption(", ".join(f"{name} cache: {stats['hit_rate']:.0%} hits"
+                             for name, stats in snapshot["caches"].items()))
+    elif record:
+        st.info("No queries recorded yet.")
+
+    st.markdown("---")
+    st.subheader("Backup")
+    st.write("Copies the database to a file while the application keeps serving requests.")
+    if st.button("Take a Snapshot"):
+        path = os.path.join(BACKUP_DIR, time.strftime("university-%Y%m%d-%H%M%S.db"))
+        result = db.backup_to(path)
+        st.success(f"Snapshot written to {path} ({result['bytes'] / 1024:,.0f} KiB "
+                   f"in {result['seconds'] * 1000:.1f} ms).")
+        with open(path, "rb") as f:
+            st.download_button("Download Snapshot", f.read(), file_name=os.path.basename(path))
+
+    st.markdown("---")
+    st.subheader("Reset Database")
+    st.warning("Warning: This will replace all existing data with the sample entries.")
+    if "reset_message" in st.session_state:
+        st.success(st.session_state.pop("reset_message"))
     if st.button("Initialize/Reset Database with Sample Data"):
-        # Close the existing connection before deleting the file
-        st.session_state.db.close()
-        
-        # Now, initialize the database (which includes deleting the old file)
-        initialize_database()
-        
-        # Re-establish the connection and store the new object in the session state
-        st.session_state.db = University(DB_FILE)
-        st.success("Database has been reset and initialized with sample data!")
-        st.info("Application reconnected to the new database. Refreshing...")
+        # Enrollments and grades still queued are written first, not on top of the sample data
+        data.get_writer().flush()
+
+        # The sample template is copied over the database in place: every session keeps its
+        # connection, and the write listener clears the cached loaders
+        result = db.restore_from(sample_template())
+
+        for key in [k for k in st.session_state if k.endswith("_cursors")]:
+            del st.session_state[key]
+        st.session_state["reset_message"] = (f"Database has been reset with the sample data "
+                                             f"({result['seconds'] * 1000:.1f} ms).")
         st.rerun()
 
+# --- Debug panel ---
+# a checkbox rather than an expander: an expander's body runs (and builds its tables) even when collapsed
+data.end_rerun(rerun_started, page)
+if st.sidebar.checkbox("Debug: cache and rerun timings"):
+    db = data.get_university()
+    debug = data.debug_stats()
+    reruns = debug["reruns"]
+    if reruns:
+        st.caption(f"Last rerun: {reruns[-1]['ms']:.1f} ms ({reruns[-1]['page']}), "
+                   f"mean of the last {len(reruns)}: {sum(r['ms'] for r in reruns) / len(reruns):.1f} ms")
+    if debug["loaders"]:
+        df_loaders = frame(list(debug["loaders"].values()), index=list(debug["loaders"]))
+        st.dataframe(df_loaders[["calls", "hits", "hit_rate", "last_ms", "mean_ms"]].round(3),
+                     use_container_width=True)
+    db_cache = db.cache_stats()
+    st.caption(f"Query cache: {db_cache['hits']} hits, {db_cache['misses']} misses, "
+               f"{db_cache['entries']} entries")
+    id_cache = db.id_cache_stats()
+    st.caption(f"Id cache: {id_cache['hit_rate']:.0%} hit rate ({id_cache['hits']} hits, "
+               f"{id_cache['misses']} misses), {id_cache['entries']} entries")
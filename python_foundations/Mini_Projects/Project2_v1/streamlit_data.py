@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Cached data access for the Streamlit app.
+
+Every Streamlit interaction reruns streamlit_app.py from the top. The loaders
+below keep their results in st.cache_data (shared by all sessions, expiring
+after a TTL), so a rerun only reads what changed since the previous one:
+
+- one University instance is shared by every session (st.cache_resource;
+  the connection pool already gives each thread its own connection);
+- its write listener clears the loaders that depend on what a write touched,
+  using the same tags as the read cache (see University.add_write_listener);
+- enrollments and grades go through one WriteBatcher (see db_writer.py), so
+  the sessions writing at the same time share group commits;
+- the TTL bounds how stale a result can get when another process writes to
+  the database.
+
+Each loader call is timed and recorded as a hit or a miss for the current
+session; debug_stats() returns those numbers for the debug panel.
+"""
+import collections
+import functools
+import threading
+import time
+
+import streamlit as st
+
+from db_logic import DB_FILE, University
+from db_writer import WriteBatcher
+
+DEFAULT_TTL = 300          # seconds a cached result may be served without a write through this app
+RERUN_HISTORY = 20         # reruns kept for the debug panel
+
+# tag kind -> loaders to clear when a write touches it ("*": every write)
+_LOADERS_BY_KIND = collections.defaultdict(list)
+_ALL_LOADERS = []
+_local = threading.local()
+
+
+def _invalidate(tags):
+    """Write listener registered on the shared University."""
+    if tags is None:
+        clear_all()
+        return
+    loaders = set(_LOADERS_BY_KIND["*"])
+    for tag in tags:
+        loaders.update(_LOADERS_BY_KIND[tag[0]])
+    for loader in loaders:
+        loader.clear()
+
+
+@st.cache_resource
+def get_university():
+    """The University shared by every session, created on first use."""
+    db = University(DB_FILE)
+    db.add_write_listener(_invalidate)
+    return db
+
+
+@st.cache_resource
+def get_writer():
+    """The WriteBatcher shared by every session, writing to get_university()."""
+    return WriteBatcher(get_university())
+
+
+def clear_all():
+    for loader in _ALL_LOADERS:
+        loader.clear()
+
+
+def _session_stats():
+    try:
+        return st.session_state.setdefault("_data_stats", {
+            "loaders": collections.defaultdict(lambda: {"calls": 0, "hits": 0, "total_ms": 0.0, "last_ms": 0.0}),
+            "reruns": collections.deque(maxlen=RERUN_HISTORY),
+        })
+    except Exception:
+        # called outside of a script run (no session state): nothing to record
+        return None
+
+
+def cached_loader(*kinds, ttl=DEFAULT_TTL):
+    """
+    Caches a loader with st.cache_data. `kinds` are the cache tag kinds (the first
+    element of a tag, e.g. "people" or "courses") whose writes make its results
+    stale; "*" means every write.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def compute(*args):
+            _local.missed = True   # only runs on a cache miss
+            return func(*args)
+
+        cached = st.cache_data(ttl=ttl, show_spinner=False)(compute)
+
+        @functools.wraps(func)
+        def loader(*args):
+            _local.missed = False
+            start = time.perf_counter()
+            result = cached(*args)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            stats = _session_stats()
+            if stats is not None:
+                entry = stats["loaders"][func.__name__]
+                entry["calls"] += 1
+                entry["hits"] += not _local.missed
+                entry["total_ms"] += elapsed_ms
+                entry["last_ms"] = elapsed_ms
+            return result
+
+        loader.clear = cached.clear
+        _ALL_LOADERS.append(loader)
+        for kind in kinds:
+            _LOADERS_BY_KIND[kind].append(loader)
+        return loader
+    return decorator
+
+
+# --- Loaders ---
+# Analytics come from the trigger-maintained summary tables, which almost every
+# write updates, hence "*".
+
+@cached_loader("*")
+def load_totals():
+    return get_university().get_totals()
+
+
+@cached_loader("*")
+def load_course_enrollment_counts():
+    return get_university().get_course_enrollment_counts()
+
+
+@cached_loader("*")
+def load_professor_load():
+    return get_university().get_professor_load()
+
+
+@cached_loader("courses")
+def load_courses():
+    return get_university().get_courses()
+
+
+@cached_loader("people")
+def load_people(role):
+    return get_university().get_people(role)
+
+
+@cached_loader("people")
+def load_people_page(role, page_size, cursor):
+    return get_university().get_people_page(role, page_size, cursor)
+
+
+@cached_loader("people")
+def load_people_search(text, role, limit):
+    return get_university().search_people(text, role, limit)
+
+
+@cached_loader("courses")
+def load_course_search(text, limit):
+    return get_university().search_courses(text, limit)
+
+
+@cached_loader("course_summary")
+def load_course_summary_page(course_code, page_size, cursor):
+    return get_university().get_course_summary_page(course_code, page_size, cursor)
+
+
+@cached_loader("course_summary", "student_grades", "courses", "analytics")
+def load_course_stats(course_code):
+    return get_university().get_course_stats(course_code)
+
+
+@cached_loader("student_grades", "analytics")
+def load_student_gpa(student_id):
+    return get_university().get_student_gpa(student_id)
+
+
+# --- Rerun timing ---
+
+def start_rerun():
+    """Call at the top of the script; returns the start time to pass to end_rerun."""
+    return time.perf_counter()
+
+
+def end_rerun(started, page):
+    stats = _session_stats()
+    if stats is not None:
+        stats["reruns"].append({"page": page, "ms": (time.perf_counter() - started) * 1000})
+
+
+def debug_stats():
+    """
+    Returns {"loaders": {name: {calls, hits, hit_rate, total_ms, mean_ms, last_ms}},
+    "reruns": [{page, ms}, ...]} for the current session.
+    """
+    stats = _session_stats()
+    if stats is None:
+        return {"loaders": {}, "reruns": []}
+    loaders = {
+        name: {**entry, "hit_rate": entry["hits"] / entry["calls"], "mean_ms": entry["total_ms"] / entry["calls"]}
+        for name, entry in stats["loaders"].items() if entry["calls"]
+    }
+    return {"loaders": loaders, "reruns": list(stats["reruns"])}
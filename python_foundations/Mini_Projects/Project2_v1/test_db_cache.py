@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the read cache and the id cache seeing commits made by another process.
+
+Run with: python -m unittest test_db_cache (or pytest) from this directory.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from db_logic import University
+
+# commits through a connection of another process, as db_generate or a second app would
+EXTERNAL_SQL = """
+import sqlite3, sys
+conn = sqlite3.connect(sys.argv[1])
+conn.executescript(sys.argv[2])
+conn.close()
+"""
+
+
+def write_from_other_process(db_path, script):
+    subprocess.run([sys.executable, "-c", EXTERNAL_SQL, db_path, script], check=True)
+
+
+def in_new_thread(func):
+    """Calls func() on a new thread (so on a connection the pool has not handed out yet)."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", func()))
+    thread.start()
+    thread.join()
+    return result["value"]
+
+
+class ExternalWritesTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp.name, "university.db")
+        self.db = University(self.db_path)
+
+    def tearDown(self):
+        self.db.close()
+        self._tmp.cleanup()
+
+    def test_query_cache_new_thread_sees_other_process_commit(self):
+        self.db.add_student("a", 20, "S1")
+        self.assertEqual(self.db.get_people("student"), [("a", 20, "S1")])
+
+        write_from_other_process(
+            self.db_path, "INSERT INTO persons (name, age, role, university_id) VALUES ('b', 21, 'student', 'S2');")
+
+        self.assertEqual(in_new_thread(lambda: self.db.get_people("student")), [("a", 20, "S1"), ("b", 21, "S2")])
+        self.assertEqual(self.db.get_people("student"), [("a", 20, "S1"), ("b", 21, "S2")])
+
+    def test_id_cache_new_thread_sees_other_process_rewrite(self):
+        self.db.add_students_bulk([("a", 20, "S1"), ("b", 21, "S2")])
+        self.db.add_courses_bulk([("Course 0", "C0"), ("Course 1", "C1")])
+        # caches S1 -> its persons.id
+        self.db.enroll_student_in_course("S1", "C0")
+
+        # the other process rebuilds persons with the two ids swapped
+        write_from_other_process(self.db_path, """
+            DELETE FROM enrollments;
+            DELETE FROM persons;
+            INSERT INTO persons (id, name, age, role, university_id) VALUES (1, 'b', 21, 'student', 'S2');
+            INSERT INTO persons (id, name, age, role, university_id) VALUES (2, 'a', 20, 'student', 'S1');
+        """)
+
+        in_new_thread(lambda: self.db.enroll_student_in_course("S1", "C1"))
+        self.assertEqual(self.db.get_course_summary("C1"), [("a", "S1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the in-memory enrollment graph following the writes of its University:
+after enrollments, deletions and re-grades, and after compact(), its answers must
+match the SQL queries.
+
+Run with: python -m unittest test_db_graph (or pytest) from this directory.
+"""
+import os
+import tempfile
+import unittest
+
+from db_graph import EnrollmentGraph
+from db_logic import University
+
+
+class EnrollmentGraphSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db = University(os.path.join(self._tmp.name, "university.db"))
+        self.db.add_students_bulk([("a", 20, "S1"), ("b", 21, "S2"), ("c", 22, "S3")])
+        self.db.add_courses_bulk([("Course 0", "C0"), ("Course 1", "C1")])
+        self.db.enroll_students_bulk([("S1", "C0"), ("S2", "C0")])
+        self.db.assign_grade("S1", "C0", "B")
+        self.graph = self.db.enrollment_graph()
+
+    def tearDown(self):
+        self.db.close()
+        self._tmp.cleanup()
+
+    def assert_matches_database(self):
+        for code in ("C0", "C1"):
+            self.assertEqual(self.graph.roster(code), self.db.get_course_summary(code))
+        for student in ("S1", "S2", "S3"):
+            self.assertEqual(self.graph.transcript(student), self.db.get_student_grades(student))
+
+    def test_enroll(self):
+        self.db.enroll_student_in_course("S3", "C0")
+        self.db.enroll_students_bulk([("S3", "C1"), ("S1", "C1")])
+
+        self.assertEqual(self.graph.roster("C0"), [("a", "S1"), ("b", "S2"), ("c", "S3")])
+        self.assertEqual(self.graph.courses_of("S3"), ["C0", "C1"])
+        self.assertEqual(self.graph.shared_courses("S1", "S3"), ["C0", "C1"])
+        self.assertIsNotNone(self.graph.check_enrollment("S3", "C1"))
+        self.assert_matches_database()
+
+    def test_regrade(self):
+        self.db.assign_grade("S1", "C0", "A")
+        self.db.assign_grades_bulk([("S2", "C0", "A+")])
+
+        self.assertEqual(self.graph.transcript("S1"), [("Course 0", "C0", "A")])
+        self.assertEqual(self.graph.transcript("S2"), [("Course 0", "C0", "A+")])
+        self.assert_matches_database()
+
+    def test_delete_seen_at_the_next_write_of_the_student(self):
+        # no University method deletes an enrollment: raw SQL, then a write touching the student
+        with self.db.conn:
+            self.db.conn.execute(
+                "DELETE FROM enrollments WHERE student_id = (SELECT id FROM persons WHERE university_id = 'S2')")
+        self.db.enroll_student_in_course("S2", "C1")
+
+        self.assertEqual(self.graph.roster("C0"), [("a", "S1")])
+        self.assertEqual(self.graph.courses_of("S2"), ["C1"])
+        self.assert_matches_database()
+
+    def test_delete_by_replacing_the_table(self):
+        kept = self.db.conn.execute(
+            "SELECT student_id, course_id FROM enrollments ORDER BY student_id LIMIT 1").fetchall()
+        self.db.load_table_rows("enrollments", ["student_id", "course_id"], [kept], replace=True)
+
+        self.assertEqual(self.graph.roster("C0"), [("a", "S1")])
+        self.assert_matches_database()
+
+    def test_compact_keeps_the_edits_and_drops_unused_grades(self):
+        self.db.enroll_student_in_course("S3", "C1")
+        self.db.assign_grade("S3", "C1", "C")
+        self.db.assign_grade("S1", "C0", "A")
+        self.graph.compact()
+
+        self.assertEqual(self.graph.stats()["overrides"], 0)
+        self.assertEqual(sorted(self.graph._grade_letters), ["A", "C"])
+        self.assert_matches_database()
+
+    def test_more_distinct_grades_than_a_byte(self):
+        grades = [f"G{i}" for i in range(300)]
+        for grade in grades:
+            self.db.assign_grade("S1", "C0", grade)
+        self.assertEqual(self.graph.transcript("S1"), [("Course 0", "C0", grades[-1])])
+        graph = EnrollmentGraph(self.db)
+        graph.reload()
+        self.assertEqual(graph.transcript("S1"), [("Course 0", "C0", grades[-1])])
+
+
+if __name__ == "__main__":
+    unittest.main()
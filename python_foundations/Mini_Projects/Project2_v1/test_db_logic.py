@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the retried writes of University: a write that hits a busy database
+once is run again, with the same rows, and commits them (bulk writes and the
+columnar import).
+
+Run with: python -m unittest test_db_logic (or pytest) from this directory.
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import db_columnar
+from db_logic import University
+
+
+def busy_once(func):
+    """Wraps func so that its first call raises the error SQLite gives on a locked database."""
+    calls = []
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return func(*args, **kwargs)
+    wrapper.calls = calls
+    return wrapper
+
+
+class RetryOnBusyTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db = University(os.path.join(self._tmp.name, "university.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self._tmp.cleanup()
+
+    def test_bulk_write_of_a_generator_is_retried_with_every_row(self):
+        self.db.add_students_bulk([("a", 20, "S1"), ("b", 21, "S2")])
+        self.db.add_courses_bulk([("Course 0", "C0")])
+        existing = busy_once(self.db._existing_enrollments)
+
+        with mock.patch.object(self.db, "_existing_enrollments", existing):
+            messages = self.db.enroll_students_bulk((student, "C0") for student in ("S1", "S2"))
+
+        self.assertEqual(len(existing.calls), 2)
+        self.assertEqual(messages, ["Student 'S1' enrolled in course 'C0'.", "Student 'S2' enrolled in course 'C0'."])
+        self.assertEqual(self.db.get_course_summary("C0"), [("a", "S1"), ("b", "S2")])
+
+    def test_bulk_add_of_a_generator_is_retried_with_every_row(self):
+        lookup = busy_once(self.db._lookup)
+
+        with mock.patch.object(self.db, "_lookup", lookup):
+            self.db.add_students_bulk(row for row in [("a", 20, "S1"), ("b", 21, "S2")])
+
+        self.assertEqual(len(lookup.calls), 2)
+        self.assertEqual(self.db.get_people("student"), [("a", 20, "S1"), ("b", 21, "S2")])
+
+    def test_import_retried_after_a_busy_error_reads_every_file_again(self):
+        self.db.add_students_bulk([("a", 20, "S1"), ("b", 21, "S2")])
+        self.db.add_courses_bulk([("Course 0", "C0")])
+        self.db.enroll_students_bulk([("S1", "C0"), ("S2", "C0")])
+        self.db.assign_grades_bulk([("S1", "C0", "A")])
+        export_dir = os.path.join(self._tmp.name, "export")
+        db_columnar.export_database(self.db, export_dir)
+        target = University(os.path.join(self._tmp.name, "target.db"))
+        self.addCleanup(target.close)
+        target.add_students_bulk([("old", 30, "S9")])
+        row_batches = db_columnar._row_batches
+        attempts = []
+
+        def busy_after_persons(table, path):
+            # first attempt: persons is loaded, then the database turns busy
+            if table == "persons":
+                attempts.append(table)
+            elif len(attempts) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            return row_batches(table, path)
+
+        with mock.patch.object(db_columnar, "_row_batches", busy_after_persons):
+            counts = db_columnar.import_database(target, export_dir, replace=True)
+
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(counts, {"persons": 2, "courses": 1, "enrollments": 2, "grades": 1})
+        self.assertEqual(target.get_people("student"), [("a", 20, "S1"), ("b", 21, "S2")])
+        self.assertEqual(target.get_course_summary("C0"), [("a", "S1"), ("b", "S2")])
+        self.assertEqual(target.get_student_grades("S1"), self.db.get_student_grades("S1"))
+
+    def test_load_refuses_one_shot_batches(self):
+        with self.assertRaises(TypeError):
+            self.db.load_table_rows("courses", ["name", "code"], iter([[("Course 0", "C0")]]))
+        self.assertEqual(self.db.load_table_rows("courses", ["name", "code"], [[("Course 0", "C0")]]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the slow-query log of db_metrics: an entry is written once the query is
+finished, with the time and rows of every fetch, like the per-method totals.
+
+Run with: python -m unittest test_db_metrics (or pytest) from this directory.
+"""
+import sqlite3
+import unittest
+
+from db_metrics import InstrumentedCursor, QueryMetrics
+
+
+class SlowQueryLogTest(unittest.TestCase):
+
+    def setUp(self):
+        conn = sqlite3.connect(":memory:")
+        self.addCleanup(conn.close)
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(10)])
+        # threshold 0: every query counts as slow
+        self.metrics = QueryMetrics(slow_query_threshold=0.0)
+        self.cursor = InstrumentedCursor(conn.cursor(), self.metrics)
+
+    def snapshot(self):
+        snapshot = self.metrics.snapshot()
+        return snapshot["slow_queries"], snapshot["methods"]["?"]
+
+    def test_entry_written_after_the_last_fetch(self):
+        self.cursor.execute("SELECT x FROM t WHERE x >= ?", (3,))
+        self.assertEqual(self.cursor.fetchmany(4), [(3,), (4,), (5,), (6,)])
+        self.assertEqual(self.snapshot()[0], [])   # still running
+
+        self.cursor.fetchmany(4)
+        slow, totals = self.snapshot()
+        self.assertEqual(len(slow), 1)
+        self.assertEqual(slow[0]["rows"], 7)
+        self.assertEqual(slow[0]["params"], "(3,)")
+        self.assertEqual(slow[0]["rows"], totals["rows"])
+        self.assertAlmostEqual(slow[0]["ms"], totals["total_ms"])
+
+    def test_unfinished_query_logged_at_the_next_statement(self):
+        self.cursor.execute("SELECT x FROM t")
+        self.cursor.fetchone()
+        self.cursor.fetchone()
+        self.cursor.execute("UPDATE t SET x = x + 1")
+        slow, totals = self.snapshot()
+        self.assertEqual([(entry["sql"], entry["rows"]) for entry in slow],
+                         [("SELECT x FROM t", 2), ("UPDATE t SET x = x + 1", 10)])
+        self.assertEqual(sum(entry["rows"] for entry in slow), totals["rows"])
+
+
+if __name__ == "__main__":
+    unittest.main()
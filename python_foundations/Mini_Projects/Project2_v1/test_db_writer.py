@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the write batcher: how a batch is split into groups written one kind
+after the other, and the row-by-row replay of a bulk write that hit an
+IntegrityError.
+
+Run with: python -m unittest test_db_writer (or pytest) from this directory.
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+from db_logic import University
+from db_writer import WriteBatcher
+
+
+def request(kind, *args):
+    return kind, args, Future()
+
+
+def kinds(segments):
+    return [{kind: [args for _, args, _ in run] for kind, run in segment.items()} for segment in segments]
+
+
+class SegmentsTest(unittest.TestCase):
+
+    def test_other_pairs_share_a_segment(self):
+        batch = [request("enroll", "S1", "C0"), request("grade", "S2", "C0", "A"), request("enroll", "S3", "C0")]
+        self.assertEqual(kinds(WriteBatcher._segments(batch)),
+                         [{"enroll": [("S1", "C0"), ("S3", "C0")], "grade": [("S2", "C0", "A")]}])
+
+    def test_same_pair_of_the_other_kind_starts_a_segment(self):
+        batch = [request("enroll", "S1", "C0"), request("grade", "S1", "C0", "A"),
+                 request("grade", "S1", "C0", "B"), request("enroll", "S1", "C0")]
+        self.assertEqual(kinds(WriteBatcher._segments(batch)), [
+            {"enroll": [("S1", "C0")]},
+            {"grade": [("S1", "C0", "A"), ("S1", "C0", "B")]},
+            {"enroll": [("S1", "C0")]},
+        ])
+
+    def test_flush_ends_its_segment(self):
+        batch = [request("enroll", "S1", "C0"), request("flush"), request("enroll", "S2", "C0")]
+        self.assertEqual(kinds(WriteBatcher._segments(batch)),
+                         [{"enroll": [("S1", "C0")], "flush": [()]}, {"enroll": [("S2", "C0")]}])
+
+
+class WriteBatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db = University(os.path.join(self._tmp.name, "university.db"))
+        self.db.add_students_bulk([("a", 20, "S1"), ("b", 21, "S2")])
+        self.db.add_courses_bulk([("Course 0", "C0")])
+
+    def tearDown(self):
+        self.db.close()
+        self._tmp.cleanup()
+
+    def test_enrollment_committed_before_a_later_grade_of_the_same_pair(self):
+        # a long window: every request below lands in the same batch
+        with WriteBatcher(self.db, max_delay=0.5) as writer:
+            early_grade = writer.assign_grade("S1", "C0", "B")
+            enrollment = writer.enroll_student_in_course("S1", "C0")
+            grade = writer.assign_grade("S1", "C0", "A")
+            writer.flush()
+            stats = writer.stats()
+
+        self.assertEqual(early_grade.result(), "Error: Student 'S1' is not enrolled in course 'C0'.")
+        self.assertEqual(enrollment.result(), "Student 'S1' enrolled in course 'C0'.")
+        self.assertEqual(grade.result(), "Grade 'A' assigned to student 'S1' for course 'C0'.")
+        self.assertEqual((stats["batches"], stats["commits"]), (1, 3))
+        self.assertEqual(self.db.get_student_grades("S1"), [("Course 0", "C0", "A")])
+
+    def test_bulk_integrity_error_replays_the_rows_one_by_one(self):
+        bulk = mock.patch.object(self.db, "enroll_students_bulk", side_effect=sqlite3.IntegrityError("UNIQUE"))
+        with bulk, WriteBatcher(self.db, max_delay=0.5) as writer:
+            futures = [writer.enroll_student_in_course(student, "C0") for student in ("S1", "S2", "S1")]
+            writer.flush()
+
+        self.assertEqual([future.result() for future in futures], [
+            "Student 'S1' enrolled in course 'C0'.",
+            "Student 'S2' enrolled in course 'C0'.",
+            "Error: Student 'S1' is already enrolled in 'C0'.",
+        ])
+        self.assertEqual(self.db.get_course_summary("C0"), [("a", "S1"), ("b", "S2")])
+
+
+if __name__ == "__main__":
+    unittest.main()